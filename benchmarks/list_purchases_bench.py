@@ -0,0 +1,113 @@
+"""Regression benchmark for PurchaseModel.list_purchases().
+
+Seeds a throwaway SQLite database with a fixed number of purchase orders and
+a growing number of line items per order, then times list_purchases() next
+to the old LEFT JOIN purchase_items + GROUP BY query. With item_count kept on
+purchases the listing cost should stay flat as purchase_items grows, while
+the aggregate query grows with it.
+
+Usage (from the project root, without the mariadb driver installed):
+    python benchmarks/list_purchases_bench.py [--orders 2000] [--lines 1 10 50] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import database  # noqa: E402
+
+LEGACY_SQL = """
+    SELECT p.id, p.supplier_id, p.expected_date, p.total_amount, p.status, p.created_at,
+           p.created_by, s.name as supplier_name, s.contact_name as supplier_contact,
+           COUNT(pi.id) as item_count
+    FROM purchases p
+    LEFT JOIN suppliers s ON p.supplier_id = s.id
+    LEFT JOIN purchase_items pi ON p.id = pi.purchase_id
+    GROUP BY p.id, p.supplier_id, p.expected_date, p.total_amount, p.status, p.created_at,
+             p.created_by, s.name, s.contact_name
+    ORDER BY p.created_at DESC
+"""
+
+
+def seed(orders, lines):
+    """Create the tables and insert ``orders`` purchases with ``lines`` items each."""
+    with database.transaction() as conn:
+        conn.executescript("""
+            CREATE TABLE suppliers (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, contact_name TEXT);
+            CREATE TABLE purchases (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, supplier_id INTEGER, expected_date TEXT,
+                total_amount REAL DEFAULT 0, status TEXT DEFAULT 'pending', created_by TEXT,
+                created_at TEXT, item_count INTEGER
+            );
+            CREATE TABLE purchase_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, purchase_id INTEGER, item_id INTEGER,
+                item_name TEXT, quantity INTEGER, unit_price REAL, total REAL
+            );
+            CREATE INDEX idx_purchase_items_purchase ON purchase_items (purchase_id);
+        """)
+        conn.execute("INSERT INTO suppliers (name, contact_name) VALUES ('Supplier', 'Contact')")
+        start = datetime(2020, 1, 1)
+        conn.executemany(
+            "INSERT INTO purchases (supplier_id, total_amount, status, created_by, created_at, item_count) "
+            "VALUES (1, 0, 'pending', 'bench', ?, ?)",
+            [(start + timedelta(hours=i), lines) for i in range(orders)]
+        )
+        conn.executemany(
+            "INSERT INTO purchase_items (purchase_id, item_id, item_name, quantity, unit_price, total) "
+            "VALUES (?, ?, ?, 1, 1.0, 1.0)",
+            [(p, n, f"item{n}") for p in range(1, orders + 1) for n in range(lines)]
+        )
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def legacy_list():
+    with database.connection() as conn:
+        return conn.execute(LEGACY_SQL).fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--lines', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if database.DB_DRIVER != 'sqlite':
+        print("This benchmark seeds a throwaway SQLite database; run it without the mariadb driver installed.")
+        return 1
+
+    from models.purchase import PurchaseModel
+    import models.purchase as purchase_module
+
+    print(f"{'lines/order':>12} {'purchase_items':>15} {'list_purchases':>15} {'join+group by':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for lines in args.lines:
+            database.get_pool().dispose()
+            database.DB_PATH = os.path.join(tmp, f"bench_{lines}.db")
+            purchase_module._purchase_schema_ready = False
+            seed(args.orders, lines)
+
+            rows = PurchaseModel.list_purchases()
+            assert len(rows) == args.orders and all(r['items_count'] == lines for r in rows)
+
+            current = best_of(PurchaseModel.list_purchases, args.repeat)
+            legacy = best_of(legacy_list, args.repeat)
+            print(f"{lines:>12} {args.orders * lines:>15} {current:>12.1f} ms {legacy:>11.1f} ms")
+        database.get_pool().dispose()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Startup-time benchmark for the GUI.
+
+Each sample runs in a fresh interpreter (cold imports, like a kiosk boot)
+with Qt's offscreen platform and measures:
+
+- login:      importing main's modules and showing the LoginWindow
+- dashboard:  building DashboardWindow after login (sidebar + KPI page only)
+- <PAGE>:     first visit of each page (its imports, widgets and controller)
+- all pages:  building every page up front, i.e. the old eager start-up
+
+Usage (from the project root):
+    python benchmarks/startup_bench.py [--repeat 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = ["TRANS HISTORY", "DEPT OVERVIEW", "PURCHASE", "INVENTORY", "REQUESTS", "REPORTS", "MESSAGES"]
+
+
+def _child(mode):
+    """Take one sample in this (fresh) process and print it as JSON."""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    timings = {}
+
+    started = time.perf_counter()
+    from PyQt6.QtWidgets import QApplication
+    from views.login import LoginWindow
+    from controllers.login import LoginController  # noqa: F401
+    app = QApplication([])
+    login = LoginWindow()
+    login.show()
+    app.processEvents()
+    timings['login'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    from views.dashboard import DashboardWindow
+    dashboard = DashboardWindow()
+    timings['dashboard'] = time.perf_counter() - started
+
+    if mode == 'eager':
+        started = time.perf_counter()
+        for title in PAGES:
+            dashboard._ensure_page(title)
+        timings['all pages'] = time.perf_counter() - started
+    else:
+        for title in PAGES:
+            started = time.perf_counter()
+            dashboard._ensure_page(title)
+            timings[title] = time.perf_counter() - started
+
+    print(json.dumps(timings))
+    sys.stdout.flush()
+    # Skip teardown: controllers may have queued background loads
+    os._exit(0)
+
+
+def _sample(mode):
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode],
+        capture_output=True, text=True, env=env, cwd=ROOT
+    )
+    for line in reversed(out.stdout.splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+    raise RuntimeError(f"benchmark child failed:\n{out.stderr}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--child', choices=['lazy', 'eager'], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(args.child)
+        return 0
+
+    samples = {}
+    for mode in ('lazy', 'eager'):
+        for _ in range(args.repeat):
+            for name, seconds in _sample(mode).items():
+                samples.setdefault((mode, name), []).append(seconds * 1000)
+
+    print(f"{'step':<28} {'median':>10} {'min':>10}")
+    for (mode, name), values in samples.items():
+        if mode == 'eager' and name != 'all pages':
+            continue
+        label = name if name in ('login', 'dashboard', 'all pages') else f"first visit: {name}"
+        print(f"{label:<28} {statistics.median(values):>7.1f} ms {min(values):>7.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
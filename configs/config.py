@@ -5,3 +5,9 @@ DB_CONFIG = {
     'password': 'admin123',   # Your MariaDB password
     'database': 'hotel_db'    # The name we created earlier
 }
+
+DB_POOL = {
+    'size': 5,             # Max open connections shared by the whole app
+    'timeout': 10,         # Seconds to wait for a free connection
+    'ping_interval': 30    # Idle seconds before a connection is health-checked
+}
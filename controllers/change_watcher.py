@@ -0,0 +1,83 @@
+"""Live change notifications for the GUI.
+
+Every model write bumps its table's counter in table_versions (see
+models.database). ChangeWatcher polls those counters on the query executor -
+one small primary-key read - and emits a signal per table group whose
+counter moved, whether the write came from this window, another running
+copy of the app or the hms command line:
+
+    watcher = ChangeWatcher(parent)
+    watcher.requests_changed.connect(self.requests_ctrl.refresh_requests)
+    watcher.start()
+
+Signals carry no payload; receivers reload what they show. Nothing is
+emitted for the first poll after start(), it only records where counters are.
+"""
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from models.database import get_table_versions
+from controllers.query_executor import get_executor
+
+# How often the counters are read
+POLL_INTERVAL_MS = 3000
+
+WATCHED_TABLES = ('items', 'damages', 'purchases', 'purchase_items', 'suppliers', 'requests', 'messages')
+
+
+class ChangeWatcher(QObject):
+    items_changed = pyqtSignal()
+    damages_changed = pyqtSignal()
+    purchases_changed = pyqtSignal()   # purchases or their line items
+    suppliers_changed = pyqtSignal()
+    requests_changed = pyqtSignal()
+    messages_changed = pyqtSignal()
+    tables_changed = pyqtSignal(list)  # names of every table that changed
+
+    # Table -> signal emitted when its counter moves
+    SIGNALS = {
+        'items': 'items_changed',
+        'damages': 'damages_changed',
+        'purchases': 'purchases_changed',
+        'purchase_items': 'purchases_changed',
+        'suppliers': 'suppliers_changed',
+        'requests': 'requests_changed',
+        'messages': 'messages_changed',
+    }
+
+    def __init__(self, parent=None, interval_ms=POLL_INTERVAL_MS):
+        super().__init__(parent)
+        self._versions = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.poll)
+
+    def start(self):
+        """Start polling (again, after stop()) from the current counters."""
+        self._versions = None
+        self.poll()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        get_executor().cancel('changes.poll')
+
+    def poll(self):
+        """Read the counters in the background; emits when some moved."""
+        # A poll still in flight just picks up this call too
+        get_executor().submit(
+            'changes.poll', get_table_versions, WATCHED_TABLES,
+            on_result=self._compare,
+            on_error=self._poll_failed
+        )
+
+    def _compare(self, versions):
+        previous, self._versions = self._versions, versions
+        if previous is None or previous == versions:
+            return
+        changed = [table for table, old, new in zip(WATCHED_TABLES, previous, versions) if old != new]
+        for name in dict.fromkeys(self.SIGNALS[table] for table in changed):
+            getattr(self, name).emit()
+        self.tables_changed.emit(changed)
+
+    def _poll_failed(self, error, tb):
+        print(f"[CHANGES] Could not read table versions: {error}")
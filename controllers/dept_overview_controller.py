@@ -1,5 +1,6 @@
 """Controller for Department Overview functionality."""
 from models.purchase import DashboardModel, ItemModel
+from controllers.query_executor import get_executor
 
 
 class DeptOverviewController:
@@ -58,32 +59,50 @@ class DeptOverviewController:
     def load_department_data(self, department_name):
         """Load and display data for the selected department.
         
+        KPIs and top items are fetched in the background; the KPI cards show
+        placeholders until they arrive.
+        
         Args:
             department_name: Name of the department to display data for
         """
-        try:
-            # Get department-specific data
-            if department_name == "All Departments":
-                dept_filter = None
-            else:
-                dept_filter = department_name
-            
-            # Get KPI values
-            kpis = self.dashboard_model.get_department_kpis(dept_filter)
-            
-            # Update KPI cards
-            self.view.update_kpis(
-                inventory_value=kpis.get('inventory_value', '₱0.00'),
-                inventory_items=kpis.get('inventory_items', 0),
-                wastages=kpis.get('wastages', 0)
-            )
-            
-            # Get top items for chart
-            items_data = self.dashboard_model.get_department_top_items(dept_filter)
-            self.view.update_chart(items_data)
-            
-        except Exception as e:
-            print(f"Error loading department data: {e}")
-            # Set default values on error
-            self.view.update_kpis("₱0.00", 0, 0)
-            self.view.update_chart([])
+        # Get department-specific data
+        if department_name == "All Departments":
+            dept_filter = None
+        else:
+            dept_filter = department_name
+        
+        self.view.update_kpis("…", "…", "…")
+        get_executor().submit(
+            'dept_overview.data', self.fetch_department_data, dept_filter,
+            on_result=self.show_department_data,
+            on_error=self._load_failed,
+            group='page'
+        )
+    
+    def fetch_department_data(self, dept_filter):
+        """Query KPI values and top items for a department (runs off the GUI thread)."""
+        return {
+            'kpis': self.dashboard_model.get_department_kpis(dept_filter),
+            'top_items': self.dashboard_model.get_department_top_items(dept_filter)
+        }
+    
+    def show_department_data(self, data):
+        """Update the KPI cards and chart with loaded department data."""
+        kpis = data['kpis']
+        
+        # Update KPI cards
+        self.view.update_kpis(
+            inventory_value=f"₱{kpis.get('inventory_value', 0.0):,.2f}",
+            inventory_items=kpis.get('inventory_items', 0),
+            wastages=kpis.get('wastages', 0)
+        )
+        
+        # Top items for chart
+        self.view.update_chart(data['top_items'])
+    
+    def _load_failed(self, error, tb):
+        print(f"Error loading department data: {error}")
+        print(tb)
+        # Set default values on error
+        self.view.update_kpis("₱0.00", 0, 0)
+        self.view.update_chart([])
@@ -0,0 +1,281 @@
+"""Streaming CSV / Excel / PDF writers for reports and history exports.
+
+Every exporter consumes ``rows`` as an iterator and writes as it goes, so a
+full history table can be exported without holding it in memory:
+
+- CSV is written row by row.
+- Excel uses openpyxl's write-only workbook; column widths come from the
+  first SAMPLE_ROWS rows instead of a second pass over the sheet.
+- PDF lays the rows out in tables of PDF_CHUNK_ROWS rows, each repeating the
+  header on every page, instead of one giant Table.
+
+``ticket`` is an optional QueryTicket (see controllers.query_executor): the
+exporters report ``(rows_written, total)`` through ticket.report_progress()
+and stop with ExportCancelled once ticket.cancelled is set. The writers
+don't touch Qt, so they run on a worker thread; start_export() submits one
+to the QueryExecutor behind a cancellable progress dialog.
+"""
+import csv
+import itertools
+import os
+from datetime import datetime
+
+FORMATS = ("CSV", "Excel", "PDF")
+
+# Rows inspected to size Excel columns
+SAMPLE_ROWS = 200
+MAX_COLUMN_WIDTH = 50
+
+# Rows per PDF Table flowable
+PDF_CHUNK_ROWS = 500
+
+# Report progress every this many rows
+PROGRESS_EVERY = 500
+
+
+class ExportCancelled(Exception):
+    """Raised inside an export when its ticket was cancelled."""
+
+
+class _Progress:
+    def __init__(self, ticket, total):
+        self.ticket = ticket
+        self.total = total
+        self.done = 0
+
+    def step(self, count=1):
+        self.done += count
+        if self.ticket is None:
+            return
+        if self.ticket.cancelled:
+            raise ExportCancelled()
+        if self.done % PROGRESS_EVERY < count:
+            self.ticket.report_progress((self.done, self.total))
+
+    def finish(self):
+        if self.ticket is not None:
+            self.ticket.report_progress((self.done, self.total))
+
+
+def export_rows(file_path, format_type, title, headers, rows, total=None, ticket=None):
+    """Write ``headers`` + ``rows`` to ``file_path`` in ``format_type``.
+
+    Args:
+        format_type: One of FORMATS
+        title: Report title written above the table
+        rows: Iterable of row sequences; consumed once
+        total: Expected number of rows, for progress reporting (optional)
+        ticket: QueryTicket for progress/cancellation (optional)
+
+    Returns:
+        Number of rows written
+
+    Raises:
+        ExportCancelled: the ticket was cancelled (the partial file is removed)
+    """
+    writers = {"CSV": export_csv, "Excel": export_excel, "PDF": export_pdf}
+    if format_type not in writers:
+        raise ValueError(f"Unsupported export format: {format_type}")
+    try:
+        return writers[format_type](file_path, title, headers, rows, total, ticket)
+    except ExportCancelled:
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+        raise
+
+
+def export_csv(file_path, title, headers, rows, total=None, ticket=None):
+    progress = _Progress(ticket, total)
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        # Write title and metadata
+        writer.writerow([f"Report Type: {title}"])
+        writer.writerow([f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"])
+        writer.writerow([])  # Empty row
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow(row)
+            progress.step()
+    progress.finish()
+    return progress.done
+
+
+def _cell_value(value):
+    # openpyxl can't store tz-aware datetimes or arbitrary objects
+    if value is None or isinstance(value, (int, float, str, datetime)):
+        return value
+    return str(value)
+
+
+def export_excel(file_path, title, headers, rows, total=None, ticket=None):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill, Alignment
+    from openpyxl.utils import get_column_letter
+
+    progress = _Progress(ticket, total)
+    rows = iter(rows)
+    sample = list(itertools.islice(rows, SAMPLE_ROWS))
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Report")
+
+    # Widths must be set before the first row is written in write-only mode
+    widths = [len(str(h)) for h in headers]
+    for row in sample:
+        for col, value in enumerate(row[:len(widths)]):
+            widths[col] = max(widths[col], len(str(value)) if value is not None else 0)
+    for col, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = min(width + 2, MAX_COLUMN_WIDTH)
+
+    title_cell = WriteOnlyCell(ws, value=f"Report Type: {title}")
+    title_cell.font = Font(bold=True, size=14)
+    ws.append([title_cell])
+    generated = WriteOnlyCell(ws, value=f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    generated.font = Font(size=10, italic=True)
+    ws.append([generated])
+    ws.append([])
+
+    header_fill = PatternFill(start_color="0056b3", end_color="0056b3", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF")
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    for row in itertools.chain(sample, rows):
+        ws.append([_cell_value(v) for v in row])
+        progress.step()
+
+    wb.save(file_path)
+    progress.finish()
+    return progress.done
+
+
+def export_pdf(file_path, title, headers, rows, total=None, ticket=None):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+    progress = _Progress(ticket, total)
+    doc = SimpleDocTemplate(file_path, pagesize=letter)
+    styles = getSampleStyleSheet()
+    table_style = TableStyle([
+        # Header row style
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0056b3')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        # Data rows style
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
+        ('TOPPADDING', (0, 1), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+    ])
+
+    elements = [
+        Paragraph(f"<b>{title}</b>", styles['Title']),
+        Spacer(1, 0.2 * inch),
+        Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']),
+        Spacer(1, 0.3 * inch),
+    ]
+
+    # Fixed-size tables split across pages cheaply; repeatRows keeps the
+    # header at the top of every page a table spills onto
+    rows = iter(rows)
+    while True:
+        chunk = [["" if v is None else str(v) for v in row] for row in itertools.islice(rows, PDF_CHUNK_ROWS)]
+        if not chunk:
+            break
+        table = Table([list(headers)] + chunk, repeatRows=1)
+        table.setStyle(table_style)
+        elements.append(table)
+        progress.step(len(chunk))
+
+    if len(elements) == 4:
+        elements.append(Table([list(headers)], repeatRows=1, style=table_style))
+    doc.build(elements)
+    progress.finish()
+    return progress.done
+
+
+def _export_job(file_path, format_type, title, source, total_fn, ticket=None):
+    # Runs on the worker thread: the row query and the file writing both
+    # stay off the GUI thread
+    total = total_fn() if total_fn is not None else None
+    if ticket is not None:
+        ticket.report_progress((0, total))
+    headers, rows = source()
+    return export_rows(file_path, format_type, title, headers, rows, total, ticket)
+
+
+def start_export(parent, key, file_path, format_type, title, source, total_fn=None):
+    """Export in the background with a progress dialog.
+
+    Args:
+        parent: Widget owning the progress/result dialogs
+        key: QueryExecutor key; a second export under the same key replaces the first
+        source: Called on the worker thread, returns (headers, row iterable)
+        total_fn: Called on the worker thread, returns the row count (optional)
+    """
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QMessageBox, QProgressDialog
+    from controllers.query_executor import get_executor
+
+    executor = get_executor()
+    progress = QProgressDialog(f"Exporting {title}...", "Cancel", 0, 0, parent)
+    progress.setWindowTitle("Export")
+    progress.setWindowModality(Qt.WindowModality.WindowModal)
+    progress.setAutoClose(False)
+    progress.setAutoReset(False)
+    progress.setStyleSheet("QLabel { color: #000000; }")
+
+    def on_progress(value):
+        done, total = value
+        if total:
+            progress.setMaximum(total)
+            progress.setValue(min(done, total))
+            progress.setLabelText(f"Exporting {title}... {done:,} of {total:,} rows")
+        else:
+            progress.setLabelText(f"Exporting {title}... {done:,} rows")
+
+    def show_message(icon, window_title, text):
+        msg = QMessageBox(parent)
+        msg.setIcon(icon)
+        msg.setWindowTitle(window_title)
+        msg.setText(text)
+        msg.setStyleSheet("QLabel { color: #000000; }")
+        msg.exec()
+
+    def on_result(count):
+        progress.close()
+        show_message(QMessageBox.Icon.Information, "Success",
+                     f"Report exported successfully to {format_type}!\n\n"
+                     f"{count:,} rows saved to:\n{file_path}")
+
+    def on_error(error, tb):
+        progress.close()
+        print(f"[EXPORT] {title} export failed: {error}")
+        print(tb)
+        show_message(QMessageBox.Icon.Critical, "Error", f"Failed to export report:\n{error}")
+
+    # Cancelling marks the ticket; the writer stops at its next row and
+    # removes the partial file
+    progress.canceled.connect(lambda: executor.cancel(key))
+    executor.submit(
+        key, _export_job, file_path, format_type, title, source, total_fn,
+        on_result=on_result, on_error=on_error, on_progress=on_progress, pass_ticket=True
+    )
+    progress.show()
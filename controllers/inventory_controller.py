@@ -1,10 +1,12 @@
-from PyQt6.QtWidgets import QMessageBox, QPushButton, QFrame, QHBoxLayout
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QBrush, QColor
-from views.inventory import AddStockDialog, create_edit_icon, create_more_icon
-from models.purchase import ItemModel
+from datetime import datetime
+from PyQt6.QtWidgets import QMessageBox, QFileDialog
+from views.inventory import AddStockDialog
+from models.purchase import ItemModel, InsufficientStockError, DuplicateItemNameError
+from models.inventory_history import PAGE_SIZE, list_history, iter_history, count_history
+from controllers.query_executor import get_executor
+from controllers.exporters import start_export
 
-STYLE_BLUE = "#0056b3"
+HISTORY_EXPORT_HEADERS = ["Date & Time", "Item", "Type", "Quantity", "By User", "Department", "Notes"]
 
 
 class InventoryController:
@@ -20,6 +22,10 @@ class InventoryController:
         self.view.btn_stock_request.clicked.connect(self.handle_stock_requests)
         self.view.btn_history.clicked.connect(self.handle_history)
         
+        # Row actions are painted by the table's delegate
+        self.view.actions_delegate.edit_requested.connect(self.handle_edit_item)
+        self.view.actions_delegate.delete_requested.connect(self.handle_delete_item)
+        
         # Connect filters
         self.view.category_filter.currentTextChanged.connect(self.handle_category_filter_change)
         self.view.dept_filter.currentTextChanged.connect(self.handle_dept_filter_change)
@@ -50,27 +56,28 @@ class InventoryController:
     def refresh_inventory(self):
         """Reload inventory items from database and populate table."""
         try:
-            # Get all items
-            all_items = ItemModel.list_items()
-            
-            # Apply filters
-            filtered_items = all_items
-            
-            # First apply department filter if set
+            # Department filter takes precedence over the category filter;
+            # filtering happens in SQL rather than on the full item list
+            department = None
+            category = None
             if self.current_dept_filter != "All Departments":
-                filtered_items = [
-                    item for item in filtered_items 
-                    if item.get('category', '').lower() == self.current_dept_filter.lower()
-                ]
-            
-            # Then apply category filter if set (and dept filter is "All Departments")
+                department = self.current_dept_filter
             elif self.current_category_filter != "All Categories":
-                filtered_items = [
-                    item for item in filtered_items 
-                    if item.get('category', '').lower() == self.current_category_filter.lower()
-                ]
-            
-            self.populate_table(filtered_items)
+                category = self.current_category_filter
+            
+            def fetch(offset, limit):
+                return ItemModel.query_items(category=category, department=department, limit=limit, offset=offset)
+            
+            # First page loads in the background. Same filters -> diff the loaded
+            # rows in place; new filters -> reload. Further pages are fetched by
+            # the model as the table scrolls.
+            key = (department, category)
+            get_executor().submit(
+                'inventory.items', fetch, 0, self.view.table_model.refresh_size(key),
+                on_result=lambda rows: self.view.table_model.set_source(fetch, key=key, rows=rows),
+                on_error=self._load_failed,
+                group='page'
+            )
         except Exception as e:
             msg = QMessageBox(self.view)
             msg.setIcon(QMessageBox.Icon.Critical)
@@ -79,100 +86,19 @@ class InventoryController:
             msg.setStyleSheet("QLabel { color: #000000; }")
             msg.exec()
     
+    def _load_failed(self, error, tb):
+        print(f"Error loading inventory: {error}")
+        print(tb)
+        msg = QMessageBox(self.view)
+        msg.setIcon(QMessageBox.Icon.Critical)
+        msg.setWindowTitle("Error")
+        msg.setText(f"Failed to load inventory:\n{error}")
+        msg.setStyleSheet("QLabel { color: #000000; }")
+        msg.exec()
+    
     def populate_table(self, items):
-        """Populate inventory table with items."""
-        self.view.table.setRowCount(len(items))
-        
-        for r_idx, item in enumerate(items):
-            # Set row height
-            self.view.table.setRowHeight(r_idx, 45)
-            
-            # Item Name
-            from PyQt6.QtWidgets import QTableWidgetItem
-            name_item = QTableWidgetItem(item.get('name', ''))
-            name_item.setData(Qt.ItemDataRole.UserRole, item.get('id'))
-            self.view.table.setItem(r_idx, 0, name_item)
-            
-            # Unit
-            unit_item = QTableWidgetItem(item.get('unit', '-'))
-            self.view.table.setItem(r_idx, 1, unit_item)
-            
-            # Stock Level
-            stock_qty = int(item.get('stock_qty', 0))
-            stock_item = QTableWidgetItem(str(stock_qty))
-            self.view.table.setItem(r_idx, 2, stock_item)
-            
-            # Status (based on stock level vs minimum stock)
-            min_stock = int(item.get('min_stock', 0))
-            if stock_qty == 0:
-                status_text = "OUT OF STOCK"
-                status_color = QColor("#ef4444")  # Red
-            elif stock_qty <= min_stock:
-                status_text = "LOW STOCK"
-                status_color = QColor("#f59e0b")  # Orange
-            else:
-                status_text = "IN STOCK"
-                status_color = QColor("#10b981")  # Green
-            
-            status_item = QTableWidgetItem(status_text)
-            status_item.setForeground(QBrush(status_color))
-            status_item.setData(Qt.ItemDataRole.UserRole, {'stock_qty': stock_qty, 'min_stock': min_stock})
-            self.view.table.setItem(r_idx, 3, status_item)
-            
-            # Action Buttons
-            action_widget = QFrame()
-            action_layout = QHBoxLayout(action_widget)
-            action_layout.setContentsMargins(2, 2, 2, 2)
-            action_layout.setSpacing(6)
-            
-            # Edit button with icon (shown for all roles)
-            edit_btn = QPushButton()
-            edit_btn.setIcon(create_edit_icon(16))
-            edit_btn.setFixedSize(32, 32)
-            edit_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            edit_btn.setToolTip("Edit Item")
-            edit_btn.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {STYLE_BLUE};
-                    color: white;
-                    border: none;
-                    border-radius: 4px;
-                    padding: 4px;
-                }}
-                QPushButton:hover {{ 
-                    background-color: #003d82;
-                    border: 2px solid #ffffff;
-                }}
-            """)
-            edit_btn.clicked.connect(lambda checked, i=item: self.handle_edit_item(i))
-            action_layout.addWidget(edit_btn)
-            
-            # Delete button (only show for non-Department roles)
-            if self.view.current_role != "Department":
-                # More button with icon
-                more_btn = QPushButton()
-                more_btn.setIcon(create_more_icon(16))
-                more_btn.setFixedSize(32, 32)
-                more_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-                more_btn.setToolTip("Delete Item")
-                more_btn.setStyleSheet(f"""
-                    QPushButton {{
-                        background-color: #ef4444;
-                        color: white;
-                        border: none;
-                        border-radius: 4px;
-                        padding: 4px;
-                    }}
-                    QPushButton:hover {{ 
-                        background-color: #dc2626;
-                        border: 2px solid #ffffff;
-                    }}
-                """)
-                more_btn.clicked.connect(lambda checked, i=item: self.handle_delete_item(i))
-                action_layout.addWidget(more_btn)
-            
-            action_layout.addStretch()
-            self.view.table.setCellWidget(r_idx, 4, action_widget)
+        """Populate inventory table with a fixed list of items."""
+        self.view.table_model.set_items(items)
     
     def handle_distribute_stocks(self):
         """Handle distributing stocks to departments."""
@@ -198,31 +124,11 @@ class InventoryController:
             return
         
         try:
-            from models.purchase import ItemModel
-            from models.database import get_conn, _paramstyle
-            
-            conn = get_conn()
-            cur = conn.cursor()
-            
-            # Create a distribution record and update inventory
             user_name = self.view.current_user if hasattr(self.view, 'current_user') else 'System'
             
-            for item in items:
-                # Deduct from inventory
-                ItemModel.adjust_stock(item['item_id'], -item['quantity'])
-                
-                # Log the distribution activity
-                self.log_inventory_activity(
-                    item_name=item['item_name'],
-                    movement_type='distributed',
-                    quantity=item['quantity'],
-                    user_name=user_name,
-                    notes=f"Distributed to {department}",
-                    department=department
-                )
-                
-            conn.commit()
-            conn.close()
+            # All decrements and history rows are written in one transaction;
+            # nothing changes if any item is short
+            ItemModel.distribute_stock(items, department, user_name)
             
             msg = QMessageBox(dialog)
             msg.setIcon(QMessageBox.Icon.Information)
@@ -234,6 +140,17 @@ class InventoryController:
             dialog.accept()
             self.refresh_inventory()
             
+        except InsufficientStockError as e:
+            lines = "\n".join(
+                f"- {s['item_name']}: requested {s['requested']}, available {s['available']}" for s in e.shortages
+            )
+            msg = QMessageBox(dialog)
+            msg.setIcon(QMessageBox.Icon.Warning)
+            msg.setWindowTitle("Insufficient Stock")
+            msg.setText(f"Nothing was distributed. Not enough stock for:\n{lines}")
+            msg.setStyleSheet("QLabel { color: #000000; }")
+            msg.exec()
+            self.refresh_inventory()
         except Exception as e:
             msg = QMessageBox(dialog)
             msg.setIcon(QMessageBox.Icon.Critical)
@@ -359,102 +276,27 @@ class InventoryController:
             return
         
         try:
-            from models.database import get_conn, _paramstyle
-            conn = get_conn()
-            cur = conn.cursor()
-            
-            # Check if item_id already exists in inventory
-            item_id = data.get('item_id')
-            qty_to_add = data['stock_qty']
-            
-            if item_id:
-                # Item exists - update the quantity
-                if _paramstyle == 'qmark':
-                    sql = """
-                        UPDATE items 
-                        SET stock_qty = stock_qty + ?
-                        WHERE id = ?
-                    """
-                    cur.execute(sql, (qty_to_add, item_id))
-                else:
-                    sql = """
-                        UPDATE items 
-                        SET stock_qty = stock_qty + %s
-                        WHERE id = %s
-                    """
-                    cur.execute(sql, (qty_to_add, item_id))
-                
-                conn.commit()
-                success_msg = f"Added {qty_to_add} units to existing item!"
-            else:
-                # Item doesn't exist yet - create new entry
-                result = ItemModel.add_item(
-                    name=data['name'],
-                    category=data['category'],
-                    unit=data['unit'],
-                    unit_cost=data['unit_cost'],
-                    stock_qty=qty_to_add,
-                    min_stock=data.get('min_stock', 10)
-                )
-                
-                if not result:
-                    raise Exception("Failed to create new inventory item")
-                
-                success_msg = "Item added to inventory successfully!"
-            
-            # Update the purchase_items table to track how much was added
-            purchase_item_id = data.get('purchase_item_id')
-            if purchase_item_id:
-                if _paramstyle == 'qmark':
-                    # Increment qty_added_to_inventory
-                    sql = """
-                        UPDATE purchase_items 
-                        SET qty_added_to_inventory = COALESCE(qty_added_to_inventory, 0) + ?
-                        WHERE id = ?
-                    """
-                    cur.execute(sql, (qty_to_add, purchase_item_id))
-                    
-                    # Check if fully added, if so mark in_inventory = 1
-                    sql = """
-                        UPDATE purchase_items 
-                        SET in_inventory = 1
-                        WHERE id = ? 
-                        AND quantity <= COALESCE(qty_added_to_inventory, 0)
-                    """
-                    cur.execute(sql, (purchase_item_id,))
-                else:
-                    # Increment qty_added_to_inventory
-                    sql = """
-                        UPDATE purchase_items 
-                        SET qty_added_to_inventory = COALESCE(qty_added_to_inventory, 0) + %s
-                        WHERE id = %s
-                    """
-                    cur.execute(sql, (qty_to_add, purchase_item_id))
-                    
-                    # Check if fully added, if so mark in_inventory = 1
-                    sql = """
-                        UPDATE purchase_items 
-                        SET in_inventory = 1
-                        WHERE id = %s 
-                        AND quantity <= COALESCE(qty_added_to_inventory, 0)
-                    """
-                    cur.execute(sql, (purchase_item_id,))
-                    
-                conn.commit()
-            
-            conn.close()
-            
-            # Log the activity
+            # Stock, the purchase line's received quantity and the history
+            # row are written in one transaction
             user_name = self.view.current_user if hasattr(self.view, 'current_user') else 'Purchase Admin'
-            self.log_inventory_activity(
-                item_name=data['name'],
-                movement_type='stock_in',
+            qty_to_add = data['stock_qty']
+            _, created = ItemModel.receive_stock(
+                name=data['name'],
                 quantity=qty_to_add,
                 user_name=user_name,
-                notes='Added from purchase order',
-                department=data.get('category')
+                item_id=data.get('item_id'),
+                purchase_item_id=data.get('purchase_item_id'),
+                category=data['category'],
+                unit=data['unit'],
+                unit_cost=data['unit_cost'],
+                min_stock=data.get('min_stock', 10)
             )
             
+            if created:
+                success_msg = "Item added to inventory successfully!"
+            else:
+                success_msg = f"Added {qty_to_add} units to existing item!"
+            
             msg = QMessageBox(dialog)
             msg.setIcon(QMessageBox.Icon.Information)
             msg.setWindowTitle("Success")
@@ -524,6 +366,13 @@ class InventoryController:
                 msg.setText("Failed to update item.")
                 msg.setStyleSheet("QLabel { color: #000000; }")
                 msg.exec()
+        except DuplicateItemNameError as e:
+            msg = QMessageBox(dialog)
+            msg.setIcon(QMessageBox.Icon.Warning)
+            msg.setWindowTitle("Duplicate Item")
+            msg.setText(f"{e}. Please choose a different name.")
+            msg.setStyleSheet("QLabel { color: #000000; }")
+            msg.exec()
         except Exception as e:
             msg = QMessageBox(dialog)
             msg.setIcon(QMessageBox.Icon.Critical)
@@ -579,13 +428,13 @@ class InventoryController:
         
         # Get all pending requests
         try:
-            requests = RequestModel.get_all_requests(include_archived=False)
-            # Filter only pending requests
-            pending_requests = [r for r in requests if r['status'] == 'Pending']
+            pending_requests = RequestModel.query_requests(status='Pending')
             
             dialog = StockRequestsDialog(self.view, controller=self)
             dialog.load_requests(pending_requests)
             dialog.refresh_btn.clicked.connect(lambda: self.refresh_requests_dialog(dialog))
+            dialog.bulk_approve_btn.clicked.connect(lambda: self.handle_bulk_approve(dialog))
+            dialog.bulk_reject_btn.clicked.connect(lambda: self.handle_bulk_reject(dialog))
             dialog.exec()
         except Exception as e:
             msg = QMessageBox(self.view)
@@ -600,9 +449,7 @@ class InventoryController:
         from models.request import RequestModel
         
         try:
-            requests = RequestModel.get_all_requests(include_archived=False)
-            pending_requests = [r for r in requests if r['status'] == 'Pending']
-            dialog.load_requests(pending_requests)
+            dialog.load_requests(RequestModel.query_requests(status='Pending'))
         except Exception as e:
             msg = QMessageBox(dialog)
             msg.setIcon(QMessageBox.Icon.Critical)
@@ -630,15 +477,13 @@ class InventoryController:
         notes = data['notes']
         
         try:
-            # Check if item exists in inventory
-            items = ItemModel.list_items()
-            matching_item = None
-            for item in items:
-                if item['name'].lower() == request['item_name'].lower():
-                    matching_item = item
-                    break
-            
-            if not matching_item:
+            from models.request import RequestModel
+            from models.purchase import ItemNotFoundError
+            user_name = self.view.current_user if hasattr(self.view, 'current_user') else 'System'
+            try:
+                # Stock check, decrement and status change happen in one transaction
+                RequestModel.approve_and_distribute(request, distributed_qty, user_name, notes)
+            except ItemNotFoundError:
                 msg = QMessageBox(distribute_dialog)
                 msg.setIcon(QMessageBox.Icon.Warning)
                 msg.setWindowTitle("Item Not Found")
@@ -646,25 +491,16 @@ class InventoryController:
                 msg.setStyleSheet("QLabel { color: #000000; }")
                 msg.exec()
                 return
-            
-            # Check if enough stock
-            current_stock = matching_item.get('stock_qty', 0)
-            if current_stock < distributed_qty:
+            except InsufficientStockError as e:
+                current_stock = e.shortages[0]['available'] if e.shortages else 0
                 msg = QMessageBox(distribute_dialog)
                 msg.setIcon(QMessageBox.Icon.Warning)
                 msg.setWindowTitle("Insufficient Stock")
-                msg.setText(f"Insufficient stock. Available: {current_stock} {matching_item['unit']}, Requested: {distributed_qty} {request['unit']}")
+                msg.setText(f"Insufficient stock. Available: {current_stock} {request['unit']}, Requested: {distributed_qty} {request['unit']}")
                 msg.setStyleSheet("QLabel { color: #000000; }")
                 msg.exec()
                 return
             
-            # Deduct stock
-            from models.request import RequestModel
-            ItemModel.adjust_stock(matching_item['id'], -distributed_qty)
-            
-            # Update request status
-            RequestModel.approve_request(request['id'], distributed_qty, notes)
-            
             # Close distribute dialog
             distribute_dialog.accept()
             
@@ -724,19 +560,118 @@ class InventoryController:
                 msg.setStyleSheet("QLabel { color: #000000; }")
                 msg.exec()
     
+    def handle_bulk_approve(self, dialog):
+        """Approve every checked request in the stock requests dialog at once."""
+        from models.request import RequestModel
+        
+        request_ids = dialog.selected_request_ids()
+        if not request_ids:
+            return
+        confirm = QMessageBox(dialog)
+        confirm.setIcon(QMessageBox.Icon.Question)
+        confirm.setWindowTitle("Approve Requests")
+        confirm.setText(f"Approve {len(request_ids)} request(s) and distribute their stock?\n"
+                        f"When stock runs short: {dialog.policy_combo.currentText()}.")
+        confirm.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        confirm.setStyleSheet("QLabel { color: #000000; }")
+        if confirm.exec() != QMessageBox.StandardButton.Yes:
+            return
+        
+        try:
+            user_name = self.view.current_user if hasattr(self.view, 'current_user') else 'System'
+            result = RequestModel.bulk_approve(request_ids, user_name, dialog.fill_policy())
+        except InsufficientStockError as e:
+            details = "\n".join(
+                f"• {s['item_name']}: requested {s['requested']}, available {s['available']}" for s in e.shortages
+            )
+            msg = QMessageBox(dialog)
+            msg.setIcon(QMessageBox.Icon.Warning)
+            msg.setWindowTitle("Insufficient Stock")
+            msg.setText(f"Nothing was approved. Not enough stock for:\n{details}")
+            msg.setStyleSheet("QLabel { color: #000000; }")
+            msg.exec()
+            return
+        except Exception as e:
+            msg = QMessageBox(dialog)
+            msg.setIcon(QMessageBox.Icon.Critical)
+            msg.setWindowTitle("Error")
+            msg.setText(f"Failed to approve requests:\n{e}")
+            msg.setStyleSheet("QLabel { color: #000000; }")
+            msg.exec()
+            return
+        
+        lines = [f"{len(result['approved'])} request(s) approved."]
+        partial = [r for r in result['approved'] if r['quantity'] < r['requested']]
+        for r in partial:
+            lines.append(f"• #{r['id']} {r['item_name']}: {r['quantity']} of {r['requested']} {r['unit']} distributed")
+        if result['skipped']:
+            lines.append(f"{len(result['skipped'])} left pending (not enough stock):")
+            lines.extend(f"• #{r['id']} {r['item_name']}: requested {r['requested']}, available {r['available']} {r['unit']}"
+                         for r in result['skipped'])
+        if result['not_found']:
+            lines.append(f"{len(result['not_found'])} left pending (item not in inventory):")
+            lines.extend(f"• #{r['id']} {r['item_name']}" for r in result['not_found'])
+        if result['not_pending']:
+            lines.append(f"{len(result['not_pending'])} were already handled by someone else.")
+        
+        msg = QMessageBox(dialog)
+        msg.setIcon(QMessageBox.Icon.Information if len(lines) == 1 else QMessageBox.Icon.Warning)
+        msg.setWindowTitle("Requests Approved")
+        msg.setText("\n".join(lines))
+        msg.setStyleSheet("QLabel { color: #000000; }")
+        msg.exec()
+        
+        self.refresh_requests_dialog(dialog)
+        if result['approved']:
+            self.refresh_inventory()
+    
+    def handle_bulk_reject(self, dialog):
+        """Reject every checked request in the stock requests dialog at once."""
+        from PyQt6.QtWidgets import QInputDialog
+        from models.request import RequestModel
+        
+        request_ids = dialog.selected_request_ids()
+        if not request_ids:
+            return
+        reason, ok = QInputDialog.getText(
+            dialog,
+            "Reject Requests",
+            f"Reason for rejecting {len(request_ids)} request(s) (optional):",
+        )
+        if not ok:
+            return
+        
+        try:
+            rejected = RequestModel.bulk_reject(request_ids, reason if reason else None)
+            
+            msg = QMessageBox(dialog)
+            msg.setIcon(QMessageBox.Icon.Information)
+            msg.setWindowTitle("Success")
+            msg.setText(f"{rejected} request(s) rejected.")
+            msg.setStyleSheet("QLabel { color: #000000; }")
+            msg.exec()
+            
+            self.refresh_requests_dialog(dialog)
+        except Exception as e:
+            msg = QMessageBox(dialog)
+            msg.setIcon(QMessageBox.Icon.Critical)
+            msg.setWindowTitle("Error")
+            msg.setText(f"Failed to reject requests:\n{e}")
+            msg.setStyleSheet("QLabel { color: #000000; }")
+            msg.exec()
+    
     def handle_history(self):
         """Handle showing stock history dialog."""
         from views.inventory import StockHistoryDialog
-        from datetime import datetime
-        from models.database import get_conn
         
         try:
-            # Fetch real inventory history from database
-            history_data = self.get_inventory_history()
-            
             dialog = StockHistoryDialog(self.view)
-            dialog.load_history(history_data)
+            dialog.filters_changed.connect(lambda filters: self.load_history(dialog, filters))
+            dialog.export_btn.clicked.connect(lambda: self.export_history(dialog))
+            self.load_history(dialog, dialog.current_filters())
             dialog.exec()
+            get_executor().cancel('inventory.history')
+            dialog.history_model.cancel_fetches()
         except Exception as e:
             msg = QMessageBox(self.view)
             msg.setIcon(QMessageBox.Icon.Critical)
@@ -747,141 +682,112 @@ class InventoryController:
             import traceback
             traceback.print_exc()
     
-    def get_inventory_history(self):
-        """Fetch inventory history from database."""
-        from models.database import get_conn
-        from datetime import datetime
+    def load_history(self, dialog, filters):
+        """Load the first history page for ``filters`` in the background.
         
-        try:
-            conn = get_conn()
-            cur = conn.cursor()
-            
-            # Query to get inventory movements
-            # This includes: items added from purchases, distributions to departments, adjustments
-            sql = """
-                SELECT 
-                    created_at,
-                    item_name,
-                    movement_type,
-                    quantity,
-                    user_name,
-                    notes,
-                    department
-                FROM inventory_history
-                ORDER BY created_at DESC
-                LIMIT 100
-            """
-            
-            cur.execute(sql)
-            rows = cur.fetchall()
-            conn.close()
-            
-            history_data = []
-            for row in rows:
-                try:
-                    row_dict = dict(row)
-                except:
-                    row_dict = {
-                        'created_at': row[0],
-                        'item_name': row[1],
-                        'movement_type': row[2],
-                        'quantity': row[3],
-                        'user_name': row[4],
-                        'notes': row[5],
-                        'department': row[6] if len(row) > 6 else None
-                    }
-                
-                # Format the data for display
-                timestamp = row_dict.get('created_at')
-                if timestamp:
-                    try:
-                        if isinstance(timestamp, str):
-                            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                        else:
-                            dt = timestamp
-                        formatted_time = dt.strftime('%Y-%m-%d %I:%M %p')
-                    except:
-                        formatted_time = str(timestamp)
-                else:
-                    formatted_time = 'Unknown'
-                
-                movement_type = row_dict.get('movement_type', 'Unknown')
-                # Map movement types to display names
-                type_mapping = {
-                    'stock_in': 'Stock In',
-                    'stock_out': 'Stock Out',
-                    'distributed': 'Stock Out',
-                    'adjustment': 'Adjustment',
-                    'damage': 'Adjustment',
-                    'added': 'Stock In'
-                }
-                display_type = type_mapping.get(movement_type.lower(), movement_type)
-                
-                quantity = row_dict.get('quantity', 0)
-                # Add + or - prefix
-                if display_type == 'Stock In':
-                    qty_display = f"+{quantity}"
-                elif display_type == 'Stock Out':
-                    qty_display = f"-{quantity}"
-                else:
-                    qty_display = str(quantity)
-                
-                notes = row_dict.get('notes', '-')
-                department = row_dict.get('department')
-                if department and 'department' not in notes.lower():
-                    notes = f"{notes} ({department})" if notes != '-' else department
-                
-                history_data.append({
-                    'timestamp': formatted_time,
-                    'item_name': row_dict.get('item_name', 'Unknown'),
-                    'type': display_type,
-                    'quantity': qty_display,
-                    'user': row_dict.get('user_name', 'System'),
-                    'notes': notes
-                })
-            
-            return history_data
-            
-        except Exception as e:
-            print(f"Error fetching inventory history: {e}")
-            import traceback
-            traceback.print_exc()
-            # Return empty list if table doesn't exist yet
-            return []
+        Older/newer pages are fetched by the dialog's model as the table
+        scrolls, using the (created_at, id) cursor of the rows it holds.
+        """
+        def fetch(before=None, after=None, limit=PAGE_SIZE):
+            return self.get_inventory_history(before=before, after=after, limit=limit, **filters)
+        
+        dialog.show_loading()
+        get_executor().submit(
+            'inventory.history', fetch,
+            on_result=lambda rows: dialog.history_model.set_source(fetch, rows=rows),
+            on_error=lambda error, tb: self._history_load_failed(dialog, error, tb)
+        )
     
-    @staticmethod
-    def log_inventory_activity(item_name, movement_type, quantity, user_name, notes='', department=None):
-        """Log an inventory activity to the history table."""
-        from models.database import get_conn, _paramstyle
-        from datetime import datetime
+    def export_history(self, dialog):
+        """Export every history row matching the dialog's filters.
         
-        try:
-            conn = get_conn()
-            cur = conn.cursor()
-            
-            if _paramstyle == 'qmark':
-                sql = """
-                    INSERT INTO inventory_history 
-                    (item_name, movement_type, quantity, user_name, notes, department, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """
-                cur.execute(sql, (item_name, movement_type, quantity, user_name, notes, department, datetime.now()))
+        Rows are streamed from the database page by page into the file on a
+        worker thread, so exporting the full table doesn't load it in memory.
+        """
+        filters = dialog.current_filters()
+        default_filename = f"Stock_History_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            dialog,
+            "Export Stock History",
+            default_filename,
+            "CSV Files (*.csv);;Excel Files (*.xlsx);;PDF Files (*.pdf)"
+        )
+        if not file_path:
+            return
+        
+        if file_path.lower().endswith('.xlsx') or selected_filter.startswith("Excel"):
+            format_type = "Excel"
+        elif file_path.lower().endswith('.pdf') or selected_filter.startswith("PDF"):
+            format_type = "PDF"
+        else:
+            format_type = "CSV"
+        
+        def history_rows():
+            # Raw values: quantities stay numeric and timestamps sortable in spreadsheets
+            rows = (
+                [row['created_at'], row['item_name'], row['movement_type'], row['quantity'],
+                 row['user_name'] or 'System', row['department'] or '', row['notes'] or '']
+                for row in iter_history(**filters)
+            )
+            return HISTORY_EXPORT_HEADERS, rows
+        
+        start_export(dialog, 'inventory.history.export', file_path, format_type,
+                     "Stock History", history_rows, lambda: count_history(**filters))
+    
+    def _history_load_failed(self, dialog, error, tb):
+        print(f"Error fetching inventory history: {error}")
+        print(tb)
+        dialog.history_model.set_source(None, rows=[])
+    
+    def get_inventory_history(self, item=None, movement_types=None, department=None, user=None,
+                              start=None, end=None, before=None, after=None, limit=PAGE_SIZE):
+        """Fetch one page of inventory history formatted for display.
+        
+        Filters and paging are applied in SQL (see inventory_history.list_history);
+        each row keeps its raw created_at/id so the next page can continue from it.
+        """
+        type_mapping = {
+            'stock_in': 'Stock In',
+            'stock_out': 'Stock Out',
+            'distributed': 'Stock Out',
+            'adjustment': 'Adjustment',
+            'damage': 'Adjustment',
+            'added': 'Stock In'
+        }
+        
+        rows = list_history(
+            item=item, movement_types=movement_types, department=department, user=user,
+            start=start, end=end, before=before, after=after, limit=limit
+        )
+        
+        history_data = []
+        for row in rows:
+            movement_type = row.get('movement_type') or 'Unknown'
+            display_type = type_mapping.get(movement_type.lower(), movement_type)
+            
+            quantity = row.get('quantity', 0)
+            # Add + or - prefix
+            if display_type == 'Stock In':
+                qty_display = f"+{quantity}"
+            elif display_type == 'Stock Out':
+                qty_display = f"-{quantity}"
             else:
-                sql = """
-                    INSERT INTO inventory_history 
-                    (item_name, movement_type, quantity, user_name, notes, department, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """
-                cur.execute(sql, (item_name, movement_type, quantity, user_name, notes, department, datetime.now()))
-            
-            conn.commit()
-            conn.close()
-            return True
-            
-        except Exception as e:
-            print(f"Error logging inventory activity: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
-
-
+                qty_display = str(quantity)
+            
+            notes = row.get('notes') or '-'
+            department_name = row.get('department')
+            if department_name and 'department' not in notes.lower():
+                notes = f"{notes} ({department_name})" if notes != '-' else department_name
+            
+            history_data.append({
+                'id': row.get('id'),
+                'created_at': row.get('created_at'),
+                'timestamp': row.get('display_time') or 'Unknown',
+                'item_name': row.get('item_name', 'Unknown'),
+                'type': display_type,
+                'quantity': qty_display,
+                'user': row.get('user_name') or 'System',
+                'notes': notes
+            })
+        
+        return history_data
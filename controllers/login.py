@@ -1,12 +1,13 @@
 from PyQt6.QtWidgets import QMessageBox, QPushButton
-from models.purchase import create_tables
 
 
 class LoginController:
-    def __init__(self, view, model, dashboard_view):
+    def __init__(self, view, model, dashboard_view=None, dashboard_factory=None):
+        """dashboard_factory, when given, builds the dashboard on the first successful login."""
         self.view = view
         self.model = model
         self.dashboard_view = dashboard_view
+        self.dashboard_factory = dashboard_factory
         
         # Connect the view's login button to our logic
         btn = self.view.findChild(QPushButton, "LoginBtn")
@@ -26,13 +27,9 @@ class LoginController:
             full_name, role, department = user_data
             print(f"Login successful for {full_name}")
 
-            # Initialize database tables
-            try:
-                create_tables()
-            except Exception as e:
-                print(f"Error initializing database tables: {e}")
-
             # Switch Windows and update UI based on role
+            if self.dashboard_view is None:
+                self.dashboard_view = self.dashboard_factory()
             self.view.hide()
             self.dashboard_view.update_ui_for_role(full_name, role, department)
             self.dashboard_view.showMaximized()
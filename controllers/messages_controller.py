@@ -2,9 +2,13 @@ from PyQt6.QtWidgets import QMessageBox
 from views.messages import ComposeMessageDialog
 from models.purchase import MessageModel
 from models.user import UserModel
-from configs.config import DB_CONFIG
+from controllers.query_executor import get_executor
 from datetime import datetime
 
+# Messages shown on a full load; a refresh that finds this many new ones
+# replaces the list instead of merging
+INBOX_LIMIT = 200
+
 
 class MessagesController:
     def __init__(self, view, model, dashboard):
@@ -12,8 +16,8 @@ class MessagesController:
         self.model = model
         self.dashboard = dashboard
         
-        # Initialize user model with database config
-        self.user_model = UserModel(DB_CONFIG)
+        # User lookups go through the shared, cached user directory
+        self.user_model = UserModel()
         
         # Get current user ID
         self.current_user_id = self.get_current_user_id()
@@ -21,8 +25,16 @@ class MessagesController:
         # Connect action buttons
         self.view.btn_compose.clicked.connect(self.handle_compose)
         
-        # Set delete callback
+        # Set delete / open callbacks
         self.view.delete_message = self.handle_delete_message
+        self.view.message_opened = self.handle_message_opened
+        
+        # Inbox already shown: whose it is and the newest / oldest message
+        # id in it. Later refreshes only fetch messages after the newest and
+        # check which of the loaded ones still exist (and are read).
+        self._loaded_user_id = None
+        self._last_id = None
+        self._first_id = None
         
         # Don't load messages here - they will be loaded when the user switches to the messages page
     
@@ -40,19 +52,64 @@ class MessagesController:
             print(f"Error getting current user ID: {e}")
             return 1
     
-    def refresh_messages(self):
-        """Refresh the messages list from database."""
+    def refresh_messages(self, full=False):
+        """Fetch new messages and the unread count (in the background).
+
+        The first load (or any load after the user changed, or with
+        full=True) fetches the most recent messages; later ones only fetch
+        messages newer than those already shown and merge them in, and drop
+        or redraw shown messages that were deleted or read meanwhile.
+        """
+        user_id = self.current_user_id
+        if full or user_id != self._loaded_user_id:
+            after_id = None
+        else:
+            after_id = self._last_id
+        get_executor().submit(
+            'messages.list', self.model.sync_inbox, user_id, after_id, INBOX_LIMIT, self._first_id,
+            on_result=lambda inbox: self.show_messages(inbox, user_id, after_id),
+            on_error=self._load_failed,
+            group='page'
+        )
+    
+    def show_messages(self, inbox, user_id, after_id=None):
+        """Display loaded messages, unless the user changed in the meantime."""
+        if user_id != self.current_user_id:
+            return
         try:
-            messages = self.model.list_messages(self.current_user_id)
+            messages = inbox['messages']
+            if after_id is not None and after_id != self._last_id:
+                # Another refresh was merged first; start over
+                self.refresh_messages(full=True)
+                return
             # Add current_user_id to each message for display logic
             for msg in messages:
-                msg['current_user_id'] = self.current_user_id
-            self.view.populate_messages(messages)
+                msg['current_user_id'] = user_id
+            if after_id is None or len(messages) >= INBOX_LIMIT:
+                # First load, or too many new ones to merge - show the latest page
+                self.view.populate_messages(messages)
+                self._first_id = messages[-1]['id'] if messages else None
+            else:
+                if inbox.get('states') is not None:
+                    self.view.sync_states(inbox['states'])
+                self.view.prepend_messages(messages)
+                if self._first_id is None and messages:
+                    self._first_id = messages[-1]['id']
+            if messages:
+                self._last_id = messages[0]['id']
+            elif after_id is None:
+                self._last_id = 0
+            self._loaded_user_id = user_id
+            self.view.set_unread_count(inbox['unread'])
         except Exception as e:
             print(f"Error loading messages: {e}")
             import traceback
             traceback.print_exc()
     
+    def _load_failed(self, error, tb):
+        print(f"Error loading messages: {error}")
+        print(tb)
+    
     def handle_compose(self):
         """Handle composing a new message."""
         try:
@@ -116,6 +173,18 @@ class MessagesController:
             import traceback
             traceback.print_exc()
     
+    def handle_message_opened(self, message_id):
+        """Mark a received message as read once it has been opened."""
+        msg = self.view.message_data.get(message_id)
+        if not msg or msg.get('is_read') or msg.get('recipient_id') != self.current_user_id:
+            return
+        self.view.mark_message_read(message_id)
+        get_executor().submit(
+            f'messages.read.{message_id}', self.model.mark_as_read, message_id,
+            on_result=lambda _: self.refresh_messages(),
+            on_error=self._load_failed
+        )
+    
     def handle_delete_message(self, message_id):
         """Handle deleting a message."""
         try:
@@ -131,7 +200,8 @@ class MessagesController:
                 # Delete from database
                 self.model.delete_message(message_id)
                 
-                # Refresh messages list
+                # Drop it from the list and refresh the unread count
+                self.view.remove_message(message_id)
                 self.refresh_messages()
                 
                 # Show success message
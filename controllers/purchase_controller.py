@@ -2,6 +2,7 @@ from PyQt6.QtWidgets import QDialog, QTableWidgetItem, QPushButton, QMessageBox
 from PyQt6.QtCore import Qt
 from views.order_stocks import OrderStocksDialog, AddItemDialog
 from views.purchase_detail_dialog import PurchaseDetailDialog
+from controllers.query_executor import get_executor
 
 class PurchaseController:
     def __init__(self, view, model, dashboard=None):
@@ -156,8 +157,8 @@ class PurchaseController:
             supplier_id = None
             expected_date = None
 
-        # Collect items and ensure they exist in the items table
-        from models.purchase import ItemModel
+        # Collect items; the model resolves names to items (creating new
+        # ones) in one pass inside the purchase transaction
         items = []
         for r in range(dlg.table.rowCount()):
             try:
@@ -168,11 +169,10 @@ class PurchaseController:
                 price_txt = dlg.table.item(r, 4).text().replace("₱", "").replace(",", "").strip()
                 unit_price = float(price_txt) if price_txt else 0.0
                 
-                # Create or find item in items table
-                item_id = self.get_or_create_item(name, unit, unit_price, category)
-                
                 items.append({ 
-                    'item_id': item_id, 
+                    'name': name, 
+                    'category': category or 'General', 
+                    'unit': unit, 
                     'quantity': quantity, 
                     'unit_price': unit_price 
                 })
@@ -200,40 +200,10 @@ class PurchaseController:
         except Exception as e:
             QMessageBox.critical(dlg, "Error", f"Failed to create purchase order:\n{e}")
 
-    def get_or_create_item(self, name, unit, unit_cost, category='General'):
-        """Check if item exists by name, if not create it. Return item_id."""
-        from models.purchase import ItemModel
-        from models.database import get_conn, DB_DRIVER
-        
-        conn = get_conn()
-        try:
-            cur = conn.cursor()
-            param = "%s" if DB_DRIVER == 'mariadb' else "?"
-            
-            # Check if item exists
-            cur.execute(f"SELECT id FROM items WHERE name = {param}", (name,))
-            row = cur.fetchone()
-            
-            if row:
-                return row[0]
-            
-            # Create new item
-            cur.execute(
-                f"INSERT INTO items (name, unit, unit_cost, category, stock_qty) VALUES ({param}, {param}, {param}, {param}, 0)",
-                (name, unit, unit_cost, category)
-            )
-            conn.commit()
-            
-            # Get the newly created item_id
-            if DB_DRIVER == 'mariadb':
-                return cur.lastrowid
-            else:
-                return conn.execute('SELECT last_insert_rowid()').fetchone()[0]
-                
-        finally:
-            conn.close()
-
     def refresh_table(self):
-        """Updates the main Purchase Page history list."""
-        data = self.model.list_purchases()
-        self.view.load_history(data)
\ No newline at end of file
+        """Updates the main Purchase Page history list (loaded in the background)."""
+        get_executor().submit(
+            'purchase.history', self.model.list_purchases,
+            on_result=self.view.load_history,
+            group='page'
+        )
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""Run database work off the Qt GUI thread.
+
+Controllers submit a callable (usually a model method) under a key and get
+the result back through a callback that always runs on the GUI thread:
+
+    get_executor().submit(
+        'requests.list', RequestModel.get_all_requests,
+        on_result=self.show_requests, group='page'
+    )
+
+- Submitting a key that is already in flight with the same call attaches
+  the callback to the running load instead of starting a duplicate one.
+- Submitting a key with different arguments supersedes the older load.
+- cancel(key) / cancel_group(group) drop loads the user no longer needs:
+  queued work is removed from the pool, running work finishes but its
+  result is discarded (a DB call can't be interrupted safely mid-query).
+"""
+import itertools
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from models.database import DB_POOL
+
+
+class _WorkerSignals(QObject):
+    finished = pyqtSignal(object, object)   # ticket id, result
+    failed = pyqtSignal(object, object, str)  # ticket id, exception, traceback
+    progress = pyqtSignal(object, object)   # ticket id, progress value
+
+
+class QueryTicket:
+    """Handle for one submitted load."""
+
+    def __init__(self, ticket_id, key, signature, group):
+        self.id = ticket_id
+        self.key = key
+        self.signature = signature
+        self.group = group
+        self.cancelled = False
+        self.done = False
+        self.callbacks = []  # (on_result, on_error, on_progress)
+        self.runnable = None
+        self.signals = None
+
+    def report_progress(self, value):
+        """Emit progress from inside the worker (delivered on the GUI thread)."""
+        if not self.cancelled and self.signals is not None:
+            self.signals.progress.emit(self.id, value)
+
+
+class _QueryWorker(QRunnable):
+    def __init__(self, ticket, fn, args, kwargs, pass_ticket):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.ticket = ticket
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.pass_ticket = pass_ticket
+
+    def run(self):
+        ticket = self.ticket
+        if ticket.cancelled:
+            return
+        try:
+            if self.pass_ticket:
+                result = self.fn(*self.args, ticket=ticket, **self.kwargs)
+            else:
+                result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            ticket.signals.failed.emit(ticket.id, e, traceback.format_exc())
+            return
+        ticket.signals.finished.emit(ticket.id, result)
+
+
+class QueryExecutor(QObject):
+    """Thread-pool backed executor for database loads with GUI-thread callbacks."""
+
+    def __init__(self, parent=None, max_threads=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_threads is None:
+            # Leave at least one pooled DB connection free for the GUI thread
+            max_threads = max(1, min(4, int(DB_POOL.get('size', 5)) - 1))
+        self.pool.setMaxThreadCount(max_threads)
+        self._ids = itertools.count(1)
+        self._tickets = {}  # ticket id -> ticket
+        self._by_key = {}   # key -> ticket id of the current load
+
+    def submit(self, key, fn, *args, on_result=None, on_error=None, on_progress=None,
+               group=None, pass_ticket=False, **kwargs):
+        """Run ``fn(*args, **kwargs)`` on a worker thread.
+
+        Args:
+            key: Identifies the load for coalescing/cancellation
+            fn: Callable doing the (blocking) database work
+            on_result: Called on the GUI thread with fn's return value
+            on_error: Called on the GUI thread with (exception, traceback text)
+            on_progress: Called on the GUI thread with values passed to
+                ticket.report_progress()
+            group: Optional group name for cancel_group(), e.g. 'page'
+            pass_ticket: Pass the QueryTicket to fn as ``ticket=`` so it can
+                report progress or check ``ticket.cancelled``
+
+        Returns:
+            QueryTicket for the (possibly shared) load
+        """
+        signature = (fn, args, tuple(sorted(kwargs.items())), pass_ticket)
+        callbacks = (on_result, on_error, on_progress)
+
+        current = self._tickets.get(self._by_key.get(key))
+        if current is not None and not current.cancelled and not current.done:
+            if self._same_call(current.signature, signature):
+                # Same load already running - share its result
+                current.callbacks.append(callbacks)
+                if group and not current.group:
+                    current.group = group
+                return current
+            # Arguments changed (e.g. new filter) - the old result is stale
+            self._cancel_ticket(current)
+
+        ticket = QueryTicket(next(self._ids), key, signature, group)
+        ticket.callbacks.append(callbacks)
+        ticket.signals = _WorkerSignals()
+        ticket.signals.finished.connect(self._on_finished)
+        ticket.signals.failed.connect(self._on_failed)
+        ticket.signals.progress.connect(self._on_progress)
+        ticket.runnable = _QueryWorker(ticket, fn, args, kwargs, pass_ticket)
+
+        self._tickets[ticket.id] = ticket
+        self._by_key[key] = ticket.id
+        self.pool.start(ticket.runnable)
+        return ticket
+
+    def cancel(self, key):
+        """Cancel the load registered under ``key`` (if any)."""
+        ticket = self._tickets.get(self._by_key.get(key))
+        if ticket is not None:
+            self._cancel_ticket(ticket)
+
+    def cancel_group(self, group):
+        """Cancel every load submitted with ``group``."""
+        for ticket in list(self._tickets.values()):
+            if ticket.group == group:
+                self._cancel_ticket(ticket)
+
+    def is_pending(self, key):
+        ticket = self._tickets.get(self._by_key.get(key))
+        return ticket is not None and not ticket.cancelled and not ticket.done
+
+    def shutdown(self, msecs=5000):
+        """Drop queued loads and wait for running ones (call on application exit)."""
+        for ticket in list(self._tickets.values()):
+            self._cancel_ticket(ticket)
+        self.pool.waitForDone(msecs)
+
+    @staticmethod
+    def _same_call(a, b):
+        try:
+            return a == b
+        except Exception:
+            # Unorderable/uncomparable arguments: treat as a different call
+            return False
+
+    def _cancel_ticket(self, ticket):
+        ticket.cancelled = True
+        try:
+            # Still queued: take it out of the pool so it never runs
+            self.pool.tryTake(ticket.runnable)
+        except Exception:
+            pass
+        self._forget(ticket)
+
+    def _forget(self, ticket):
+        self._tickets.pop(ticket.id, None)
+        if self._by_key.get(ticket.key) == ticket.id:
+            del self._by_key[ticket.key]
+
+    def _on_finished(self, ticket_id, result):
+        ticket = self._tickets.get(ticket_id)
+        if ticket is None or ticket.cancelled:
+            return
+        ticket.done = True
+        self._forget(ticket)
+        for on_result, _, _ in ticket.callbacks:
+            if on_result is not None:
+                try:
+                    on_result(result)
+                except Exception as e:
+                    print(f"[QUERY EXECUTOR] Result handler for '{ticket.key}' failed: {e}")
+                    traceback.print_exc()
+
+    def _on_failed(self, ticket_id, error, tb):
+        ticket = self._tickets.get(ticket_id)
+        if ticket is None or ticket.cancelled:
+            return
+        ticket.done = True
+        self._forget(ticket)
+        handled = False
+        for _, on_error, _ in ticket.callbacks:
+            if on_error is not None:
+                handled = True
+                try:
+                    on_error(error, tb)
+                except Exception as e:
+                    print(f"[QUERY EXECUTOR] Error handler for '{ticket.key}' failed: {e}")
+        if not handled:
+            print(f"[QUERY EXECUTOR] Load '{ticket.key}' failed: {error}")
+            print(tb)
+
+    def _on_progress(self, ticket_id, value):
+        ticket = self._tickets.get(ticket_id)
+        if ticket is None or ticket.cancelled:
+            return
+        for _, _, on_progress in ticket.callbacks:
+            if on_progress is not None:
+                on_progress(value)
+
+
+_executor = None
+
+
+def get_executor():
+    """Return the process-wide QueryExecutor (create it on the GUI thread)."""
+    global _executor
+    if _executor is None:
+        _executor = QueryExecutor()
+    return _executor
@@ -1,16 +1,10 @@
 """Controller for Requests page."""
 
-from PyQt6.QtWidgets import QMessageBox, QFrame, QHBoxLayout, QLabel, QPushButton, QVBoxLayout
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont
+from PyQt6.QtWidgets import QMessageBox
 from views.requests import SendRequestDialog
 from models.request import RequestModel
-from models.purchase import ItemModel
-
-STYLE_NAVY = "#111827"
-STYLE_BLUE = "#0056b3"
-STYLE_BORDER = "#d1d5db"
-STYLE_BG_LIGHT = "#f9fafb"
+from models.purchase import ItemNotFoundError, InsufficientStockError
+from controllers.query_executor import get_executor
 
 
 class RequestsController:
@@ -24,6 +18,11 @@ class RequestsController:
         self.view.btn_archive.clicked.connect(self.handle_toggle_archive)
         self.view.btn_sort.clicked.connect(self.handle_sort)
         
+        # Card buttons are painted by the list's delegate
+        self.view.request_delegate.approve_requested.connect(self.handle_approve_request)
+        self.view.request_delegate.reject_requested.connect(lambda request: self.handle_reject_request(request['id']))
+        self.view.request_delegate.delete_requested.connect(lambda request: self.handle_delete_request(request['id']))
+        
         # Create table if doesn't exist
         RequestModel.create_table()
     
@@ -37,6 +36,9 @@ class RequestsController:
         self.user_role = user_role
         self.user_department = department
         
+        # Purchase Admin/Owner approve or reject pending requests
+        self.view.request_delegate.can_approve = user_role in ["Purchase Admin", "Owner"]
+        
         # Hide Send Request button for Purchase Admin/Owner
         if user_role in ["Purchase Admin", "Owner"]:
             self.view.btn_send_request.hide()
@@ -196,173 +198,83 @@ class RequestsController:
         msg.exec()
     
     def refresh_requests(self):
-        """Reload and display requests."""
-        try:
-            # Clear existing requests
-            while self.view.requests_layout.count() > 1:  # Keep the stretch
-                item = self.view.requests_layout.takeAt(0)
-                if item.widget():
-                    item.widget().deleteLater()
-            
-            # Get requests based on role
-            if self.view.current_role == "Department":
-                requests = RequestModel.get_requests_by_department(
-                    self.view.current_department,
-                    include_archived=self.view.show_archived
-                )
-            else:
-                # Purchase Admin or Owner sees all requests
-                requests = RequestModel.get_all_requests(
-                    include_archived=self.view.show_archived
-                )
-            
-            # Display requests
-            if not requests:
-                no_requests_label = QLabel("No requests found.")
-                no_requests_label.setStyleSheet("color: #6b7280; font-size: 14px; border: none;")
-                no_requests_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.view.requests_layout.insertWidget(0, no_requests_label)
-            else:
-                for request in requests:
-                    request_card = self.create_request_card(request)
-                    self.view.requests_layout.insertWidget(
-                        self.view.requests_layout.count() - 1,  # Before stretch
-                        request_card
-                    )
-        
-        except Exception as e:
-            msg = QMessageBox(self.view)
-            msg.setIcon(QMessageBox.Icon.Critical)
-            msg.setWindowTitle("Error")
-            msg.setText(f"Failed to load requests:\n{e}")
-            msg.setStyleSheet("""
-                QMessageBox { background-color: white; }
-                QLabel { color: #111827; font-size: 13px; }
-                QPushButton { 
-                    background-color: #ef4444; 
-                    color: white; 
-                    border: none; 
-                    padding: 8px 20px; 
-                    border-radius: 4px;
-                    font-weight: bold;
-                }
-                QPushButton:hover { background-color: #dc2626; }
-            """)
-            msg.exec()
-    
-    def create_request_card(self, request):
-        """Create a card widget for a request."""
-        card = QFrame()
-        card.setStyleSheet(f"""
-            QFrame {{
-                background-color: white;
-                border: 1px solid {STYLE_BORDER};
-                border-radius: 6px;
-            }}
-            QFrame:hover {{
-                border-color: {STYLE_BLUE};
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-        """)
-        card.setMinimumHeight(85)
-        card.setMaximumHeight(85)
-        
-        card_layout = QHBoxLayout(card)
-        card_layout.setContentsMargins(16, 12, 16, 12)
-        card_layout.setSpacing(16)
-        
-        # Request info
-        info_layout = QVBoxLayout()
-        info_layout.setSpacing(4)
-        
-        # Item name and quantity
-        item_label = QLabel(f"{request['item_name']} - {request['quantity']} {request['unit']}")
-        item_label.setFont(QFont("Arial", 13, QFont.Weight.Bold))
-        item_label.setStyleSheet(f"color: {STYLE_NAVY}; border: none;")
-        info_layout.addWidget(item_label)
-        
-        # Department and requester
-        details_label = QLabel(f"{request['department']} • Requested by {request['requested_by']}")
-        details_label.setStyleSheet("color: #6b7280; font-size: 12px; border: none;")
-        info_layout.addWidget(details_label)
-        
-        # Status and date
-        status_text = request['status']
-        status_color = "#10b981" if status_text == "Approved" else "#f59e0b" if status_text == "Pending" else "#6b7280"
+        """Reload and display requests.
         
-        created_at = request['created_at'].strftime("%b %d, %Y") if hasattr(request['created_at'], 'strftime') else str(request['created_at'])
-        status_label = QLabel(f"Status: <span style='color: {status_color}; font-weight: bold;'>{status_text}</span> • {created_at}")
-        status_label.setStyleSheet("color: #6b7280; font-size: 11px; border: none;")
-        info_layout.addWidget(status_label)
+        The first page is loaded in the background. Reloading the same list
+        (same user, same archive filter) updates the cards already shown in
+        place; otherwise a placeholder is shown until the new list arrives.
+        Further pages are fetched by the list model as it scrolls.
+        """
+        # Department users only see their own department's requests;
+        # Purchase Admin or Owner sees all requests
+        department = None
+        if self.view.current_role == "Department":
+            department = self.view.current_department
+        include_archived = self.view.show_archived
         
-        card_layout.addLayout(info_layout)
-        card_layout.addStretch()
+        def fetch(offset, limit):
+            return RequestModel.query_requests(department=department, include_archived=include_archived,
+                                               offset=offset, limit=limit)
         
-        # Show different buttons based on role and status
-        if self.user_role in ["Purchase Admin", "Owner"] and request['status'] == 'Pending':
-            # Approve button for Purchase Admin/Owner
-            approve_btn = QPushButton("✓ APPROVE")
-            approve_btn.setFixedSize(100, 42)
-            approve_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            approve_btn.setToolTip("Approve and distribute stock")
-            approve_btn.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: #10b981;
-                    color: white;
-                    border: none;
-                    border-radius: 6px;
-                    font-size: 12px;
-                    font-weight: bold;
-                }}
-                QPushButton:hover {{ 
-                    background-color: #059669;
-                }}
-            """)
-            approve_btn.clicked.connect(lambda: self.handle_approve_request(request))
-            card_layout.addWidget(approve_btn)
-            
-            # Reject button
-            reject_btn = QPushButton("✗ REJECT")
-            reject_btn.setFixedSize(90, 42)
-            reject_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            reject_btn.setToolTip("Reject request")
-            reject_btn.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: #ef4444;
-                    color: white;
-                    border: none;
-                    border-radius: 6px;
-                    font-size: 12px;
-                    font-weight: bold;
-                }}
-                QPushButton:hover {{ 
-                    background-color: #dc2626;
-                }}
-            """)
-            reject_btn.clicked.connect(lambda: self.handle_reject_request(request['id']))
-            card_layout.addWidget(reject_btn)
+        model = self.view.request_model
+        key = (self.view.current_role, department, include_archived)
+        if not model.is_current(key):
+            model.set_source(None)
+            self.view.show_placeholder("Loading requests...")
+        get_executor().submit(
+            'requests.list', fetch, 0, model.refresh_size(key),
+            on_result=lambda rows: self.show_requests(fetch, key, rows),
+            on_error=self._load_failed,
+            group='page'
+        )
+    
+    def show_requests(self, fetch, key, rows):
+        """Display the loaded first page of requests."""
+        self.view.request_model.set_source(fetch, key=key, rows=rows)
+        self._update_placeholder()
+    
+    def _update_placeholder(self):
+        if self.view.request_model.rowCount() == 0:
+            self.view.show_placeholder("No requests found.")
         else:
-            # Delete button (trash icon) - for department users or completed requests
-            delete_btn = QPushButton("🗑")
-            delete_btn.setFixedSize(42, 42)
-            delete_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            delete_btn.setToolTip("Delete request")
-            delete_btn.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: #ef4444;
-                    color: white;
-                    border: none;
-                    border-radius: 6px;
-                    font-size: 18px;
-                }}
-                QPushButton:hover {{ 
-                    background-color: #dc2626;
-                }}
-            """)
-            delete_btn.clicked.connect(lambda: self.handle_delete_request(request['id']))
-            card_layout.addWidget(delete_btn)
+            self.view.show_placeholder(None)
+    
+    def _reload_request(self, request_id):
+        """Redraw one request after its status changed (others stay as they are)."""
+        def loaded(request):
+            if request is not None and request['status'] == 'Archived' and not self.view.show_archived:
+                request = None
+            self.view.request_model.update_row(request_id, request)
+            self._update_placeholder()
         
-        return card
+        get_executor().submit(
+            f'requests.item.{request_id}', RequestModel.get_request, request_id,
+            on_result=loaded,
+            on_error=self._load_failed
+        )
+    
+    def _load_failed(self, error, tb):
+        print(f"Error loading requests: {error}")
+        print(tb)
+        self.view.show_placeholder(None)
+        msg = QMessageBox(self.view)
+        msg.setIcon(QMessageBox.Icon.Critical)
+        msg.setWindowTitle("Error")
+        msg.setText(f"Failed to load requests:\n{error}")
+        msg.setStyleSheet("""
+            QMessageBox { background-color: white; }
+            QLabel { color: #111827; font-size: 13px; }
+            QPushButton { 
+                background-color: #ef4444; 
+                color: white; 
+                border: none; 
+                padding: 8px 20px; 
+                border-radius: 4px;
+                font-weight: bold;
+            }
+            QPushButton:hover { background-color: #dc2626; }
+        """)
+        msg.exec()
     
     def handle_delete_request(self, request_id):
         """Handle deleting a request."""
@@ -410,7 +322,8 @@ class RequestsController:
                 """)
                 success_msg.exec()
                 
-                self.refresh_requests()
+                self.view.request_model.remove_row(request_id)
+                self._update_placeholder()
             except Exception as e:
                 error_msg = QMessageBox(self.view)
                 error_msg.setIcon(QMessageBox.Icon.Critical)
@@ -446,16 +359,11 @@ class RequestsController:
         distributed_qty = data['quantity']
         notes = data['notes']
         
-        # Check if item exists in inventory
         try:
-            items = ItemModel.list_items()
-            matching_item = None
-            for item in items:
-                if item['name'].lower() == request['item_name'].lower():
-                    matching_item = item
-                    break
-            
-            if not matching_item:
+            try:
+                # Stock check, decrement and status change happen in one transaction
+                RequestModel.approve_and_distribute(request, distributed_qty, self.view.current_user or 'System', notes)
+            except ItemNotFoundError:
                 error_msg = QMessageBox(dialog)
                 error_msg.setIcon(QMessageBox.Icon.Warning)
                 error_msg.setWindowTitle("Item Not Found")
@@ -475,14 +383,12 @@ class RequestsController:
                 """)
                 error_msg.exec()
                 return
-            
-            # Check if enough stock
-            current_stock = matching_item.get('stock_qty', 0)
-            if current_stock < distributed_qty:
+            except InsufficientStockError as e:
+                current_stock = e.shortages[0]['available'] if e.shortages else 0
                 error_msg = QMessageBox(dialog)
                 error_msg.setIcon(QMessageBox.Icon.Warning)
                 error_msg.setWindowTitle("Insufficient Stock")
-                error_msg.setText(f"Insufficient stock. Available: {current_stock} {matching_item['unit']}, Requested: {distributed_qty} {request['unit']}")
+                error_msg.setText(f"Insufficient stock. Available: {current_stock} {request['unit']}, Requested: {distributed_qty} {request['unit']}")
                 error_msg.setStyleSheet("""
                     QMessageBox { background-color: white; }
                     QLabel { color: #111827; font-size: 13px; }
@@ -499,12 +405,6 @@ class RequestsController:
                 error_msg.exec()
                 return
             
-            # Deduct stock
-            ItemModel.adjust_stock(matching_item['id'], -distributed_qty)
-            
-            # Update request status
-            RequestModel.approve_request(request['id'], distributed_qty, notes)
-            
             # Close dialog
             dialog.accept()
             
@@ -528,8 +428,8 @@ class RequestsController:
             """)
             success_msg.exec()
             
-            # Refresh requests
-            self.refresh_requests()
+            # Redraw just this request
+            self._reload_request(request['id'])
             
         except Exception as e:
             error_msg = QMessageBox(dialog)
@@ -585,7 +485,7 @@ class RequestsController:
                 """)
                 success_msg.exec()
                 
-                self.refresh_requests()
+                self._reload_request(request_id)
             except Exception as e:
                 error_msg = QMessageBox(self.view)
                 error_msg.setIcon(QMessageBox.Icon.Critical)
@@ -4,11 +4,17 @@ Displays all purchase transactions with filtering capabilities.
 """
 
 from PyQt6.QtWidgets import QMessageBox
+from controllers.query_executor import get_executor
 
 
 class TransactionHistoryController:
     """Controller for managing transaction history view."""
     
+    MONTHS = [
+        "January", "February", "March", "April", "May", "June",
+        "July", "August", "September", "October", "November", "December"
+    ]
+    
     def __init__(self, view, model):
         self.view = view
         self.model = model
@@ -18,69 +24,86 @@ class TransactionHistoryController:
         self.view.month_filter.currentTextChanged.connect(self.refresh_transactions)
         
         # Load initial data
+        self.load_periods()
         self.refresh_transactions()
     
+    def load_periods(self):
+        """Fill the year filter with the years that actually have purchases."""
+        get_executor().submit(
+            'trans_history.periods', self.model.list_purchase_periods,
+            on_result=self.show_periods,
+            on_error=self._load_failed
+        )
+    
+    def show_periods(self, periods):
+        """Replace the year choices, keeping the current selection where possible."""
+        from datetime import datetime
+        
+        years = [str(year) for year in periods]
+        current_year = str(datetime.now().year)
+        if current_year not in years:
+            years.insert(0, current_year)
+        
+        selected = self.view.year_filter.currentText()
+        self.view.year_filter.blockSignals(True)
+        self.view.year_filter.clear()
+        self.view.year_filter.addItems(years)
+        self.view.year_filter.setCurrentText(selected if selected in years else current_year)
+        self.view.year_filter.blockSignals(False)
+        
+        if self.view.year_filter.currentText() != selected:
+            self.refresh_transactions()
+    
     def refresh_transactions(self):
-        """Refresh the transaction history table with filters applied."""
+        """Refresh the transaction history table with filters applied.
+        
+        The selected year/month become a created_at range evaluated in SQL;
+        purchases are loaded in the background and the table keeps its
+        current rows until they arrive.
+        """
+        start, end = self.date_range(
+            self.view.year_filter.currentText(),
+            self.view.month_filter.currentText()
+        )
+        get_executor().submit(
+            'trans_history.purchases', self.model.list_purchases,
+            start=start, end=end,
+            on_result=self.show_transactions,
+            on_error=self._load_failed,
+            group='page'
+        )
+    
+    def show_transactions(self, purchases):
+        """Show the purchases loaded for the selected year/month."""
         try:
-            # Get filter values
-            selected_year = self.view.year_filter.currentText()
-            selected_month = self.view.month_filter.currentText()
-            
-            # Get all purchases from model
-            purchases = self.model.list_purchases()
-            
-            # Apply filters
-            filtered_purchases = self.apply_filters(purchases, selected_year, selected_month)
-            
-            # Populate the table
-            self.view.populate_table(filtered_purchases)
-            
+            self.view.populate_table(purchases)
         except Exception as e:
             print(f"Error refreshing transactions: {e}")
             import traceback
             traceback.print_exc()
     
-    def apply_filters(self, purchases, year, month):
-        """Apply year and month filters to purchase data."""
-        filtered = []
+    def _load_failed(self, error, tb):
+        print(f"Error refreshing transactions: {error}")
+        print(tb)
+    
+    def date_range(self, year, month):
+        """Return the [start, end) datetimes covering ``year`` and ``month``.
         
-        for purchase in purchases:
-            # Get purchase date
-            created_at = purchase.get('created_at')
-            if not created_at:
-                continue
-            
-            # Parse date
-            try:
-                if isinstance(created_at, str):
-                    # Format: "YYYY-MM-DD HH:MM:SS" or "YYYY-MM-DD"
-                    date_parts = created_at.split(' ')[0].split('-')
-                    purchase_year = date_parts[0]
-                    purchase_month = int(date_parts[1])
-                else:
-                    # datetime object
-                    purchase_year = str(created_at.year)
-                    purchase_month = created_at.month
-            except Exception as e:
-                print(f"Error parsing date: {e}")
-                continue
-            
-            # Apply year filter
-            if purchase_year != year:
-                continue
-            
-            # Apply month filter
-            if month != "All Months":
-                month_map = {
-                    "January": 1, "February": 2, "March": 3, "April": 4,
-                    "May": 5, "June": 6, "July": 7, "August": 8,
-                    "September": 9, "October": 10, "November": 11, "December": 12
-                }
-                selected_month_num = month_map.get(month)
-                if selected_month_num and purchase_month != selected_month_num:
-                    continue
-            
-            filtered.append(purchase)
+        "All Months" covers the whole year; an unparsable year means no
+        date filter at all.
+        """
+        from datetime import datetime
+        
+        try:
+            year = int(year)
+        except (TypeError, ValueError):
+            return None, None
         
-        return filtered
+        if month in self.MONTHS:
+            month_num = self.MONTHS.index(month) + 1
+            start = datetime(year, month_num, 1)
+            end = datetime(year + 1, 1, 1) if month_num == 12 else datetime(year, month_num + 1, 1)
+        else:
+            start = datetime(year, 1, 1)
+            end = datetime(year + 1, 1, 1)
+        return start, end
@@ -1,6 +1,7 @@
 -- Create inventory_history table to track all inventory movements
 CREATE TABLE IF NOT EXISTS inventory_history (
     id INT AUTO_INCREMENT PRIMARY KEY,
+    event_key VARCHAR(64) NULL COMMENT 'idempotency key; duplicate keys are ignored',
     item_name VARCHAR(255) NOT NULL,
     movement_type VARCHAR(50) NOT NULL COMMENT 'stock_in, stock_out, distributed, adjustment, damage',
     quantity INT NOT NULL,
@@ -10,5 +11,6 @@ CREATE TABLE IF NOT EXISTS inventory_history (
     created_at DATETIME NOT NULL,
     INDEX idx_created_at (created_at),
     INDEX idx_item_name (item_name),
-    INDEX idx_movement_type (movement_type)
+    INDEX idx_movement_type (movement_type),
+    UNIQUE KEY uq_event_key (event_key)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
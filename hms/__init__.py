@@ -0,0 +1,9 @@
+"""Headless entry points for HMS: a service layer and a command line.
+
+hms.services wraps the models for scripts and scheduled jobs, raising
+ServiceError instead of showing message boxes; hms.cli exposes them as
+
+    python -m hms --help
+
+Nothing in this package imports PyQt6.
+"""
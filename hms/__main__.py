@@ -0,0 +1,5 @@
+import sys
+
+from hms.cli import main
+
+sys.exit(main())
@@ -0,0 +1,172 @@
+"""Command line for HMS batch jobs.
+
+    python -m hms migrate
+    python -m hms stock adjust "Bath Towel" 25 --user "Night Audit" --notes "Cycle count"
+    python -m hms stock list --department Housekeeping --low
+    python -m hms import items towels.csv --user "Purchase Admin"
+    python -m hms report "Stock Summary" --format excel --out stock.xlsx
+    python -m hms kpi snapshot --department Kitchen
+    python -m hms kpi verify --fix
+
+Commands exit with 0 on success and 1 on failure. Models are imported only
+by the command that needs them, so --help and argument errors are instant.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+
+
+def _cmd_migrate(args):
+    from hms import services
+
+    from models.migrations import LATEST_VERSION
+
+    applied = services.migrate()
+    for step in applied:
+        print(f"ok  {step}")
+    if not applied:
+        print(f"Schema is up to date (version {LATEST_VERSION})")
+    return 0
+
+
+def _cmd_stock_adjust(args):
+    from hms import services
+
+    item = services.adjust_stock(args.item, args.delta, args.user, args.notes)
+    print(f"{item['name']}: {args.delta:+d} -> {item['stock_qty']} in stock")
+    return 0
+
+
+def _cmd_stock_list(args):
+    from models.purchase import ItemModel
+
+    items = ItemModel.query_items(department=args.department, low_stock_only=args.low, search=args.search)
+    print(f"{'ID':>6}  {'Item':<32} {'Category':<16} {'Stock':>7} {'Min':>5}")
+    for item in items:
+        print(f"{item['id']:>6}  {str(item['name'])[:32]:<32} {str(item.get('category') or '')[:16]:<16} "
+              f"{item.get('stock_qty') or 0:>7} {item.get('min_stock') or 0:>5}")
+    print(f"{len(items)} item(s)")
+    return 0
+
+
+def _cmd_import_items(args):
+    from hms import services
+
+    if args.dry_run:
+        lines = services.read_import_file(args.file)
+        print(f"{args.file}: {len(lines)} item(s), {sum(l['quantity'] for l in lines)} unit(s) - nothing written")
+        return 0
+    result = services.import_items(args.file, args.user, args.notes)
+    print(f"Imported {result['items']} item(s), {result['units']} unit(s) added")
+    return 0
+
+
+def _cmd_report(args):
+    from hms import services
+
+    out = args.out
+    if not out:
+        _, ext = services.REPORT_FORMATS[args.format]
+        out = f"{args.report_type.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{ext}"
+    result, count = services.generate_report(args.report_type, out, args.format, args.department)
+    print(f"{result.title}: {count} row(s) written to {out}")
+    for label, value in result.summary.items():
+        print(f"  {label}: {value}")
+    return 0
+
+
+def _cmd_kpi_snapshot(args):
+    from hms import services
+
+    kpis = services.kpi_snapshot(args.department)
+    if args.json:
+        print(json.dumps({'department': args.department, 'taken_at': datetime.now().isoformat(timespec='seconds'),
+                          **kpis}, default=str))
+    else:
+        print(f"KPIs for {args.department or 'all departments'}:")
+        print(f"  Inventory value: ₱{float(kpis['inventory_value']):,.2f}")
+        print(f"  Inventory items: {kpis['inventory_items']}")
+        print(f"  Low stocks:      {kpis['low_stocks']}")
+        print(f"  Wastages:        {kpis['wastages']}")
+    return 0
+
+
+def _cmd_kpi_maintenance(args):
+    from models import kpi
+
+    argv = [args.kpi_command] + (['--fix'] if getattr(args, 'fix', False) else [])
+    return kpi.main(argv)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m hms', description="HMS command line (no GUI).")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+
+    p = commands.add_parser('migrate', help="bring the database schema up to date")
+    p.set_defaults(func=_cmd_migrate)
+
+    stock = commands.add_parser('stock', help="inspect or adjust stock levels")
+    stock_commands = stock.add_subparsers(dest='stock_command', required=True, metavar='ACTION')
+    p = stock_commands.add_parser('adjust', help="add or remove stock for one item")
+    p.add_argument('item', help="item id or exact name")
+    p.add_argument('delta', type=int, help="units to add (negative to remove)")
+    p.add_argument('--user', default='System', help="name recorded in the stock history")
+    p.add_argument('--notes', help="note recorded in the stock history")
+    p.set_defaults(func=_cmd_stock_adjust)
+    p = stock_commands.add_parser('list', help="list items")
+    p.add_argument('--department', help="only items of this department/category")
+    p.add_argument('--low', action='store_true', help="only items at or below their minimum stock")
+    p.add_argument('--search', help="name or SKU contains this text")
+    p.set_defaults(func=_cmd_stock_list)
+
+    imports = commands.add_parser('import', help="bulk import data from a file")
+    import_commands = imports.add_subparsers(dest='import_command', required=True, metavar='KIND')
+    p = import_commands.add_parser(
+        'items', help="import items from CSV (columns: name, category, unit, unit_cost, stock_qty, min_stock)")
+    p.add_argument('file')
+    p.add_argument('--user', default='System', help="name recorded in the stock history")
+    p.add_argument('--notes', default='Bulk import', help="note recorded in the stock history")
+    p.add_argument('--dry-run', action='store_true', help="validate the file without writing anything")
+    p.set_defaults(func=_cmd_import_items)
+
+    p = commands.add_parser('report', help="generate a report file")
+    p.add_argument('report_type', help='e.g. "Stock Summary", "Usage Data", "Low Stock Alert"')
+    p.add_argument('--format', choices=['csv', 'excel', 'pdf'], default='csv')
+    p.add_argument('--out', help="output file (default: <report>_<timestamp>.<ext>)")
+    p.add_argument('--department', help="scope department reports to one department")
+    p.set_defaults(func=_cmd_report)
+
+    kpi = commands.add_parser('kpi', help="dashboard KPI snapshot and maintenance")
+    kpi_commands = kpi.add_subparsers(dest='kpi_command', required=True, metavar='ACTION')
+    p = kpi_commands.add_parser('snapshot', help="print the current KPIs")
+    p.add_argument('--department')
+    p.add_argument('--json', action='store_true', help="one JSON line (for logs / cron)")
+    p.set_defaults(func=_cmd_kpi_snapshot)
+    p = kpi_commands.add_parser('verify', help="compare kpi_summary with the live tables")
+    p.add_argument('--fix', action='store_true', help="rebuild when drift is found")
+    p.set_defaults(func=_cmd_kpi_maintenance)
+    p = kpi_commands.add_parser('rebuild', help="recompute kpi_summary from scratch")
+    p.set_defaults(func=_cmd_kpi_maintenance)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    from hms import services
+    from hms.services import ServiceError
+
+    try:
+        if args.func is not _cmd_migrate:
+            # Item lookups rely on the items.name_norm column (migration 11)
+            services.migrate()
+        return args.func(args)
+    except ServiceError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"error: {e}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        return 1
@@ -0,0 +1,201 @@
+"""Qt-free operations shared by the CLI and batch jobs.
+
+Each function does one job end to end on top of the models and reports
+problems by raising ServiceError with a message fit for a terminal.
+"""
+import csv
+import os
+
+from models.database import get_conn, transaction, _paramstyle, bump_table_versions
+from models.purchase import ItemModel, InsufficientStockError
+
+# Columns read by import_items(); only name is required
+IMPORT_COLUMNS = ('name', 'category', 'unit', 'unit_cost', 'stock_qty', 'min_stock')
+
+REPORT_FORMATS = {'csv': ('CSV', '.csv'), 'excel': ('Excel', '.xlsx'), 'pdf': ('PDF', '.pdf')}
+
+
+class ServiceError(Exception):
+    """An operation failed for a reason the user can act on."""
+
+
+def find_item(ref):
+    """Return {id, name, stock_qty, category} for an item id or exact name.
+
+    Names are matched case-insensitively, like the rest of the app.
+    """
+    ref = str(ref).strip()
+    if not ref.isdigit():
+        item = ItemModel.get_item_by_name(ref)
+        if item is None:
+            raise ServiceError(f"No item matches '{ref}'")
+        return {'id': item['id'], 'name': item['name'], 'stock_qty': item['stock_qty'] or 0,
+                'category': item['category']}
+
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(f"SELECT id, name, stock_qty, category FROM items WHERE id = {_paramstyle()}", (int(ref),))
+        row = cur.fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        raise ServiceError(f"No item matches '{ref}'")
+    return {'id': row[0], 'name': row[1], 'stock_qty': row[2] or 0, 'category': row[3]}
+
+
+def adjust_stock(ref, delta, user_name='System', notes=None):
+    """Add (or with a negative delta, remove) stock and log the movement.
+
+    Returns:
+        The item dict with its new stock_qty
+    """
+    item = find_item(ref)
+    try:
+        ItemModel.record_adjustment(item['id'], delta, user_name, notes)
+    except (InsufficientStockError, ValueError) as e:
+        raise ServiceError(str(e)) from None
+    return find_item(item['id'])
+
+
+def _int_field(row, field, line, default=None):
+    value = (row.get(field) or '').strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ServiceError(f"Line {line}: {field} must be a whole number, got '{value}'") from None
+
+
+def read_import_file(path):
+    """Parse an items CSV into combined import lines (one per item name).
+
+    Rows naming the same item (case-insensitively) have their stock_qty
+    added together; the first row supplies the other fields.
+    """
+    if not os.path.exists(path):
+        raise ServiceError(f"File not found: {path}")
+
+    lines = {}
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or 'name' not in [h.strip().lower() for h in reader.fieldnames]:
+            raise ServiceError(f"{path}: header must include a 'name' column ({', '.join(IMPORT_COLUMNS)})")
+        for number, raw in enumerate(reader, start=2):
+            row = {(k or '').strip().lower(): (v or '') for k, v in raw.items()}
+            name = row.get('name', '').strip()
+            if not name:
+                continue
+            qty = _int_field(row, 'stock_qty', number, 0)
+            if qty < 0:
+                raise ServiceError(f"Line {number}: stock_qty can't be negative")
+            cost = (row.get('unit_cost') or '').strip()
+            try:
+                cost = float(cost) if cost else None
+            except ValueError:
+                raise ServiceError(f"Line {number}: unit_cost must be a number, got '{cost}'") from None
+
+            line = lines.get(name.casefold())
+            if line is None:
+                lines[name.casefold()] = {
+                    'name': name,
+                    'category': row.get('category', '').strip() or None,
+                    'unit': row.get('unit', '').strip(),
+                    'unit_price': cost,
+                    'min_stock': _int_field(row, 'min_stock', number),
+                    'quantity': qty,
+                }
+            else:
+                line['quantity'] += qty
+    return list(lines.values())
+
+
+def import_items(path, user_name='System', notes='Bulk import'):
+    """Import an items CSV in one transaction.
+
+    Unknown items are created; every row's stock_qty is added to the item's
+    stock and logged as stock in, and min_stock (when given) is set. If any
+    row fails nothing is imported.
+
+    Returns:
+        {'items': rows imported, 'units': total stock added}
+    """
+    from models import inventory_history
+    from models.inventory_history import MovementType
+    from models.kpi import KpiSummaryModel
+
+    lines = read_import_file(path)
+    if not lines:
+        return {'items': 0, 'units': 0}
+
+    # DDL must run before the write transaction opens
+    inventory_history.ensure_table()
+    param = _paramstyle()
+    with transaction() as conn:
+        cur = conn.cursor()
+        ids = ItemModel.resolve_items(cur, lines)
+        item_ids = [ids[line['name']] for line in lines]
+        before = KpiSummaryModel.capture_many(cur, item_ids)
+        cur.executemany(
+            f"UPDATE items SET stock_qty = COALESCE(stock_qty,0) + {param}, "
+            f"min_stock = COALESCE({param}, min_stock) WHERE id = {param}",
+            [(line['quantity'], line['min_stock'], ids[line['name']]) for line in lines]
+        )
+        # Log against the stored name/category, not the CSV spelling
+        stored = {}
+        for start in range(0, len(item_ids), 500):
+            chunk = sorted(set(item_ids[start:start + 500]))
+            cur.execute(f"SELECT id, name, category FROM items WHERE id IN ({', '.join([param] * len(chunk))})",
+                        tuple(chunk))
+            stored.update({r[0]: (r[1], r[2]) for r in cur.fetchall()})
+        events = []
+        for line in lines:
+            if line['quantity'] > 0:
+                name, category = stored[ids[line['name']]]
+                events.append(inventory_history.make_event(name, MovementType.STOCK_IN, line['quantity'],
+                                                           user_name, notes, category))
+        inventory_history.write_events(cur, events)
+        after = KpiSummaryModel.capture_many(cur, item_ids)
+        KpiSummaryModel.apply_item_changes(cur, [(before.get(i), after.get(i)) for i in item_ids])
+        bump_table_versions(cur, 'items')
+    return {'items': len(lines), 'units': sum(line['quantity'] for line in lines)}
+
+
+def generate_report(report_type, out_path, fmt='csv', department=None):
+    """Compute ``report_type`` and write it to ``out_path``.
+
+    Returns:
+        (ReportResult, rows written)
+    """
+    from models.reports import ReportModel, REPORT_TYPES
+    from controllers.exporters import export_rows
+
+    matches = [t for t in REPORT_TYPES if t.casefold() == report_type.casefold()]
+    if not matches:
+        raise ServiceError(f"Unknown report '{report_type}' (choose from: {', '.join(REPORT_TYPES)})")
+    format_type, _ = REPORT_FORMATS[fmt]
+    result = ReportModel.build(matches[0], department)
+    count = export_rows(out_path, format_type, result.title, result.headers,
+                        result.iter_rows(formatted=(format_type == "PDF")))
+    return result, count
+
+
+def kpi_snapshot(department=None):
+    """Current dashboard KPIs (materialized counters) for a department or everything."""
+    from models.purchase import DashboardModel
+    return DashboardModel.get_kpi_snapshot(department)
+
+
+def migrate():
+    """Apply pending schema migrations (see models.migrations).
+
+    Returns:
+        Names of the migrations that ran ([] when already current)
+    """
+    from models import migrations
+
+    try:
+        return migrations.migrate()
+    except Exception as e:
+        raise ServiceError(f"Migration failed: {e}") from e
@@ -41,6 +41,7 @@ CREATE TABLE IF NOT EXISTS suppliers (
 CREATE TABLE IF NOT EXISTS items (
     id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
+    name_norm VARCHAR(255) DEFAULT NULL,
     sku VARCHAR(100) DEFAULT NULL,
     unit VARCHAR(50) NOT NULL,
     unit_cost DECIMAL(12,2) DEFAULT 0.00,
@@ -49,9 +50,11 @@ CREATE TABLE IF NOT EXISTS items (
     category VARCHAR(100) DEFAULT 'General',
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE INDEX idx_name_norm (name_norm),
     INDEX idx_name (name),
     INDEX idx_category (category),
-    INDEX idx_stock (stock_qty)
+    INDEX idx_stock (stock_qty),
+    INDEX idx_stock_min (stock_qty, min_stock)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- =====================================================
@@ -62,6 +65,7 @@ CREATE TABLE IF NOT EXISTS purchases (
     supplier_id INT,
     expected_date DATE,
     total_amount DECIMAL(12,2) DEFAULT 0.00,
+    item_count INT NULL,
     status VARCHAR(32) DEFAULT 'pending',
     created_by VARCHAR(255),
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
@@ -69,7 +73,8 @@ CREATE TABLE IF NOT EXISTS purchases (
     FOREIGN KEY (supplier_id) REFERENCES suppliers(id) ON DELETE SET NULL,
     INDEX idx_supplier (supplier_id),
     INDEX idx_status (status),
-    INDEX idx_created_at (created_at)
+    INDEX idx_created_at (created_at),
+    INDEX idx_status_created (status, created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- =====================================================
@@ -81,9 +86,13 @@ CREATE TABLE IF NOT EXISTS purchase_items (
     item_name VARCHAR(255),
     item_id INT,
     quantity INT NOT NULL,
-    price DECIMAL(12,2) NOT NULL,
-    total DECIMAL(12,2) NOT NULL,
+    price DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    unit_price DECIMAL(12,2) DEFAULT 0.00,
+    total DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    qty_added_to_inventory INT DEFAULT 0,
+    in_inventory TINYINT DEFAULT 0,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (purchase_id) REFERENCES purchases(id) ON DELETE CASCADE,
     FOREIGN KEY (item_id) REFERENCES items(id) ON DELETE SET NULL,
     INDEX idx_purchase (purchase_id),
@@ -95,9 +104,12 @@ CREATE TABLE IF NOT EXISTS purchase_items (
 -- =====================================================
 CREATE TABLE IF NOT EXISTS damages (
     id INT AUTO_INCREMENT PRIMARY KEY,
+    purchase_id INT,
     item_id INT,
+    category VARCHAR(100),
     quantity INT NOT NULL,
     reason TEXT,
+    status VARCHAR(32) DEFAULT 'Reported',
     created_by VARCHAR(255),
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (item_id) REFERENCES items(id) ON DELETE SET NULL,
@@ -123,6 +135,7 @@ CREATE TABLE IF NOT EXISTS messages (
     INDEX idx_sender (sender_id),
     INDEX idx_recipient (recipient_id),
     INDEX idx_is_read (is_read),
+    INDEX idx_recipient_read (recipient_id, is_read),
     INDEX idx_created_at (created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -143,9 +156,48 @@ CREATE TABLE IF NOT EXISTS requests (
     notes TEXT,
     INDEX idx_department (department),
     INDEX idx_status (status),
+    INDEX idx_department_created (department, created_at),
     INDEX idx_created_at (created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- =====================================================
+-- 9. KPI SUMMARY TABLE (Materialized dashboard KPIs)
+-- =====================================================
+-- One row for everything (scope '__all__') plus one per category.
+-- Filled on first dashboard load; check/rebuild with:
+--   python -m models.kpi verify --fix
+CREATE TABLE IF NOT EXISTS kpi_summary (
+    scope VARCHAR(255) PRIMARY KEY,
+    inventory_value DECIMAL(14,2) DEFAULT 0,
+    inventory_items INT DEFAULT 0,
+    low_stocks INT DEFAULT 0,
+    wastages INT DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- =====================================================
+-- 10. TABLE VERSIONS (Change counters for cached reports)
+-- =====================================================
+-- Bumped by the app on every write to items, purchases, purchase_items,
+-- damages and suppliers; cached reports are rebuilt when a counter moves.
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+) ENGINE=InnoDB;
+
+-- =====================================================
+-- 11. SCHEMA VERSION (Applied migrations)
+-- =====================================================
+-- One row per entry of models/migrations.py MIGRATIONS. Left empty here:
+-- the app applies them on first start (they only add what is missing) and
+-- afterwards just checks MAX(version). Run them by hand with:
+--   python -m hms migrate
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    applied_at DATETIME NOT NULL
+) ENGINE=InnoDB;
+
 -- =====================================================
 -- INSERT DEFAULT USERS
 -- =====================================================
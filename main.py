@@ -4,20 +4,18 @@ from PyQt6.QtGui import QFont, QIcon, QPixmap
 from PyQt6.QtCore import Qt
 
 from views.login import LoginWindow
-from views.dashboard import DashboardWindow
 
 from controllers.login import LoginController
 from models.user import UserModel
-from models.purchase import PurchaseModel
-
-from configs.config import DB_CONFIG
+from models.migrations import migrate
 
 
 def main():
-    # Run database migrations
+    # Schema migrations: a single version check when already up to date
     try:
-        PurchaseModel.init_tables()
-        print("Database migrations completed successfully")
+        applied = migrate()
+        if applied:
+            print(f"Database migrations applied: {', '.join(applied)}")
     except Exception as e:
         print(f"Warning: Migration error - {e}")
     
@@ -37,24 +35,33 @@ def main():
     app.setFont(font)
     
     login_view = LoginWindow()
-    dashboard_view = DashboardWindow()
-
-    user_model = UserModel(DB_CONFIG)
 
-    controller = LoginController(login_view, user_model, dashboard_view)
+    user_model = UserModel()
     
     # Set logout callback to show login window again
-    def on_logout():
+    def on_logout(dashboard_view):
         dashboard_view.close()
         login_view.email_input.clear()
         login_view.pass_input.clear()
         login_view.hide()
         login_view.showMaximized()
     
-    dashboard_view.on_logout = on_logout
+    # The dashboard (and every page module behind it) is only built once
+    # someone logs in, so the login window appears as soon as possible
+    def create_dashboard():
+        from views.dashboard import DashboardWindow
+        dashboard_view = DashboardWindow()
+        dashboard_view.on_logout = lambda: on_logout(dashboard_view)
+        return dashboard_view
+
+    controller = LoginController(login_view, user_model, dashboard_factory=create_dashboard)
     
     login_view.showMaximized()
     
+    # Let in-flight background loads finish before the DB pool goes away
+    from controllers.query_executor import get_executor
+    app.aboutToQuit.connect(get_executor().shutdown)
+    
     sys.exit(app.exec())
 
 
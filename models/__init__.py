@@ -2,5 +2,8 @@
 from . import database
 from . import purchase
 from . import user
+from . import kpi
+from . import inventory_history
+from . import reports
 
-__all__ = ['database', 'purchase', 'user']
+__all__ = ['database', 'purchase', 'user', 'kpi', 'inventory_history', 'reports']
@@ -1,5 +1,10 @@
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 
+from configs import config as _config
 from configs.config import DB_CONFIG
 
 DB_DRIVER = None
@@ -12,13 +17,17 @@ except Exception:
 
 DB_PATH = os.path.join(os.path.dirname(__file__), 'hms.db')
 
+# Pool settings can be overridden with a DB_POOL dict in configs/config.py
+DB_POOL = getattr(_config, 'DB_POOL', {})
+
 
 def _paramstyle():
     """Return the appropriate parameter placeholder for the current DB driver."""
     return "%s" if DB_DRIVER == 'mariadb' else "?"
 
 
-def get_conn():
+def _connect():
+    """Open a brand new connection for the current DB driver."""
     if DB_DRIVER == 'mariadb':
         return mariadb.connect(
             host=DB_CONFIG.get('host', '127.0.0.1'),
@@ -34,8 +43,305 @@ def get_conn():
         return conn
 
 
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes free within the checkout timeout."""
+
+
+class PooledConnection:
+    """Thin proxy around a raw connection checked out of a ConnectionPool.
+
+    Everything except close() is forwarded to the raw connection, so existing
+    ``conn = get_conn() ... conn.close()`` code keeps working unchanged;
+    close() simply hands the session back to the pool.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get('_raw')
+        if raw is None:
+            raise AttributeError(f"'{name}' is not available: connection was returned to the pool")
+        return getattr(raw, name)
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._release(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __del__(self):
+        # Safety net for call sites that forget to close their connection
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Bounded pool of reusable DB connections.
+
+    Args:
+        connect: Callable returning a new raw connection
+        size: Maximum number of connections open at the same time
+        timeout: Seconds acquire() waits for a free connection before giving up
+        ping_interval: Connections idle for longer than this are health-checked
+            before being handed out again
+    """
+
+    def __init__(self, connect, size=5, timeout=10.0, ping_interval=30.0):
+        self._connect = connect
+        self.size = max(1, int(size))
+        self.timeout = float(timeout)
+        self.ping_interval = float(ping_interval)
+        # LIFO keeps the most recently used (warm) connections in rotation
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+
+    def acquire(self, timeout=None):
+        """Check out a connection, opening a new one while below the size limit."""
+        wait = self.timeout if timeout is None else float(timeout)
+        deadline = time.monotonic() + wait
+
+        while True:
+            try:
+                raw, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                if self._reserve_slot():
+                    try:
+                        raw = self._connect()
+                    except Exception:
+                        self._free_slot()
+                        raise
+                    return PooledConnection(self, raw)
+
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        raise queue.Empty
+                    raw, last_used = self._idle.get(timeout=remaining)
+                except queue.Empty:
+                    raise PoolTimeoutError(
+                        f"No database connection available after {wait:.1f}s "
+                        f"(pool size {self.size})"
+                    )
+
+            if time.monotonic() - last_used >= self.ping_interval and not self._is_alive(raw):
+                self._discard(raw)
+                continue
+            return PooledConnection(self, raw)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def stats(self):
+        """Return a snapshot of pool usage for diagnostics."""
+        with self._lock:
+            opened = self._opened
+        idle = self._idle.qsize()
+        return {'size': self.size, 'open': opened, 'idle': idle, 'in_use': opened - idle}
+
+    def dispose(self):
+        """Close every idle connection; in-use ones are closed when released."""
+        while True:
+            try:
+                raw, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(raw)
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                return True
+            return False
+
+    def _free_slot(self):
+        with self._lock:
+            self._opened = max(0, self._opened - 1)
+
+    def _release(self, raw):
+        # Drop whatever the borrower left uncommitted so the next user starts clean
+        try:
+            raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+        self._idle.put((raw, time.monotonic()))
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        self._free_slot()
+
+    @staticmethod
+    def _is_alive(raw):
+        try:
+            if hasattr(raw, 'ping'):
+                raw.ping()
+            else:
+                cur = raw.cursor()
+                cur.execute("SELECT 1")
+                cur.fetchall()
+                cur.close()
+            return True
+        except Exception:
+            return False
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    _connect,
+                    size=DB_POOL.get('size', 5),
+                    timeout=DB_POOL.get('timeout', 10),
+                    ping_interval=DB_POOL.get('ping_interval', 30),
+                )
+    return _pool
+
+
+def get_conn():
+    """Check a connection out of the shared pool.
+
+    conn.close() returns it to the pool instead of closing the session.
+    """
+    return get_pool().acquire()
+
+
+@contextmanager
+def connection():
+    """Context manager yielding a pooled connection that is always released."""
+    conn = get_conn()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def transaction():
+    """Context manager yielding a pooled connection inside one transaction.
+
+    Commits when the block finishes, rolls back if it raises.
+    """
+    conn = get_conn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise
+    finally:
+        conn.close()
+
+
 def dict_from_row(row):
     try:
         return dict(row)
     except Exception:
         return dict(row)
+
+
+# --- Table change counters ----------------------------------------------
+# table_versions holds one counter per data table. Writers bump it inside
+# their own transaction, so readers that cache derived data (e.g. reports)
+# can tell with one primary-key lookup whether anything changed - including
+# changes made by other running copies of the app. The GUI's ChangeWatcher
+# (controllers/change_watcher.py) polls the same counters to refresh
+# whatever page is showing.
+
+_versions_ready = False
+
+
+def ensure_table_versions():
+    """Create the table_versions table if needed (once per process)."""
+    global _versions_ready
+    if _versions_ready:
+        return
+    with connection() as conn:
+        cur = conn.cursor()
+        if DB_DRIVER == 'mariadb':
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS table_versions (
+                    table_name VARCHAR(64) PRIMARY KEY,
+                    version BIGINT NOT NULL DEFAULT 0
+                ) ENGINE=InnoDB
+            """)
+        else:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS table_versions (
+                    table_name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+        conn.commit()
+    _versions_ready = True
+
+
+def bump_table_versions(cur, *tables):
+    """Increment the change counter of ``tables`` using the caller's cursor.
+
+    Runs no DDL, so it is safe inside an open transaction; if table_versions
+    doesn't exist yet the bump is skipped (readers create it and start from 0).
+    """
+    if not tables:
+        return
+    param = _paramstyle()
+    if DB_DRIVER == 'mariadb':
+        sql = (f"INSERT INTO table_versions (table_name, version) VALUES ({param}, 1) "
+               "ON DUPLICATE KEY UPDATE version = version + 1")
+    else:
+        sql = (f"INSERT INTO table_versions (table_name, version) VALUES ({param}, 1) "
+               "ON CONFLICT(table_name) DO UPDATE SET version = version + 1")
+    try:
+        cur.executemany(sql, [(t,) for t in sorted(set(tables))])
+    except Exception as e:
+        print(f"[TABLE VERSIONS] Could not bump {', '.join(tables)}: {e}")
+
+
+def get_table_versions(tables):
+    """Return a tuple with the current counter of each table in ``tables`` (0 if never written)."""
+    ensure_table_versions()
+    tables = list(tables)
+    if not tables:
+        return ()
+    param = _paramstyle()
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            f"SELECT table_name, version FROM table_versions WHERE table_name IN ({','.join([param] * len(tables))})",
+            tuple(tables)
+        )
+        found = {row[0]: int(row[1]) for row in cur.fetchall()}
+    return tuple(found.get(t, 0) for t in tables)
@@ -0,0 +1,288 @@
+"""Inventory movement journal (the inventory_history table).
+
+Movements are append-only events, written with write_events(cur, events)
+inside the transaction that changes the stock, so the movement and the
+stock change commit (or roll back) together: receiving, distributions,
+request approvals, adjustments and damage reports.
+
+Every event carries an event_key; the column is unique and inserts ignore
+duplicates, so re-sending the same key never produces a second history row.
+
+list_history() reads the journal back a page at a time (keyset pagination on
+(created_at, id)) with optional server-side filters; iter_history() walks
+every matching row page by page.
+"""
+import threading
+import uuid
+from datetime import datetime
+from enum import Enum
+
+from .database import get_conn, DB_DRIVER, _paramstyle
+
+# Default history page size
+PAGE_SIZE = 100
+
+_table_ready = False
+_table_lock = threading.Lock()
+
+
+class MovementType(str, Enum):
+    """Allowed inventory_history.movement_type values."""
+    STOCK_IN = 'stock_in'
+    STOCK_OUT = 'stock_out'
+    DISTRIBUTED = 'distributed'
+    ADJUSTMENT = 'adjustment'
+    DAMAGE = 'damage'
+
+
+# Movement types behind each history filter ('added' is a legacy stock-in type)
+MOVEMENT_GROUPS = {
+    'Stock In': (MovementType.STOCK_IN.value, 'added'),
+    'Stock Out': (MovementType.STOCK_OUT.value, MovementType.DISTRIBUTED.value),
+    'Adjustments': (MovementType.ADJUSTMENT.value, MovementType.DAMAGE.value),
+}
+
+
+def make_event(item_name, movement_type, quantity, user_name, notes='', department=None,
+               event_key=None, created_at=None):
+    """Build a validated movement event dict.
+
+    Raises:
+        ValueError: movement_type is not a MovementType value
+    """
+    return {
+        'event_key': event_key or uuid.uuid4().hex,
+        'item_name': item_name,
+        'movement_type': MovementType(movement_type).value,
+        'quantity': int(quantity),
+        'user_name': user_name or 'System',
+        'notes': notes or '',
+        'department': department,
+        'created_at': created_at or datetime.now()
+    }
+
+
+def ensure_table():
+    """Create inventory_history / add the event_key column if needed (once per process).
+
+    Must not be called while the current thread holds an open write
+    transaction: DDL commits it on MariaDB and would wait on it on SQLite.
+    """
+    global _table_ready
+    if _table_ready:
+        return
+    with _table_lock:
+        if _table_ready:
+            return
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            if DB_DRIVER == 'mariadb':
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS inventory_history (
+                        id INT AUTO_INCREMENT PRIMARY KEY,
+                        event_key VARCHAR(64) NULL,
+                        item_name VARCHAR(255) NOT NULL,
+                        movement_type VARCHAR(50) NOT NULL,
+                        quantity INT NOT NULL,
+                        user_name VARCHAR(100) NOT NULL,
+                        notes TEXT,
+                        department VARCHAR(100),
+                        created_at DATETIME NOT NULL,
+                        INDEX idx_created_at (created_at),
+                        INDEX idx_item_name (item_name),
+                        INDEX idx_movement_type (movement_type)
+                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+                """)
+                cur.execute("ALTER TABLE inventory_history ADD COLUMN IF NOT EXISTS event_key VARCHAR(64) NULL AFTER id")
+                cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_event_key ON inventory_history (event_key)")
+            else:
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS inventory_history (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        event_key TEXT,
+                        item_name TEXT NOT NULL,
+                        movement_type TEXT NOT NULL,
+                        quantity INTEGER NOT NULL,
+                        user_name TEXT NOT NULL,
+                        notes TEXT,
+                        department TEXT,
+                        created_at TEXT NOT NULL
+                    );
+                """)
+                cur.execute("PRAGMA table_info(inventory_history)")
+                if 'event_key' not in [row[1] for row in cur.fetchall()]:
+                    cur.execute("ALTER TABLE inventory_history ADD COLUMN event_key TEXT")
+                cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_inventory_history_event_key ON inventory_history (event_key)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_inventory_history_created_at ON inventory_history (created_at)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_inventory_history_item_name ON inventory_history (item_name)")
+            conn.commit()
+            _table_ready = True
+        finally:
+            conn.close()
+
+
+def write_events(cur, events):
+    """Insert movement events using the caller's cursor/transaction.
+
+    Duplicate event_keys are skipped. Call ensure_table() before opening
+    the transaction.
+
+    Returns:
+        Number of events handed to the database
+    """
+    if not events:
+        return 0
+    param = _paramstyle()
+    ignore = "INSERT IGNORE" if DB_DRIVER == 'mariadb' else "INSERT OR IGNORE"
+    cur.executemany(
+        f"{ignore} INTO inventory_history "
+        f"(event_key, item_name, movement_type, quantity, user_name, notes, department, created_at) "
+        f"VALUES ({param},{param},{param},{param},{param},{param},{param},{param})",
+        [(e['event_key'], e['item_name'], e['movement_type'], e['quantity'], e['user_name'],
+          e['notes'], e['department'], e['created_at']) for e in events]
+    )
+    return len(events)
+
+
+def _display_time_sql():
+    """SQL expression rendering created_at as 'YYYY-MM-DD HH:MM AM'."""
+    if DB_DRIVER == 'mariadb':
+        return "DATE_FORMAT(created_at, '%Y-%m-%d %h:%i %p')"
+    return ("strftime('%Y-%m-%d ', created_at) || "
+            "printf('%02d', (CAST(strftime('%H', created_at) AS INTEGER) + 11) % 12 + 1) || "
+            "strftime(':%M ', created_at) || "
+            "CASE WHEN CAST(strftime('%H', created_at) AS INTEGER) < 12 THEN 'AM' ELSE 'PM' END")
+
+
+def _history_filters(item=None, movement_types=None, department=None, user=None, start=None, end=None):
+    """WHERE conditions/params shared by list_history() and count_history()."""
+    param = _paramstyle()
+    where = []
+    params = []
+
+    if item:
+        escaped = item.replace('!', '!!').replace('%', '!%').replace('_', '!_')
+        where.append(f"item_name LIKE {param} ESCAPE '!'")
+        params.append(escaped + '%')
+    if movement_types:
+        types = list(movement_types)
+        where.append(f"movement_type IN ({','.join([param] * len(types))})")
+        params.extend(types)
+    if department:
+        where.append(f"department = {param}")
+        params.append(department)
+    if user:
+        where.append(f"user_name = {param}")
+        params.append(user)
+    if start is not None:
+        where.append(f"created_at >= {param}")
+        params.append(start)
+    if end is not None:
+        where.append(f"created_at < {param}")
+        params.append(end)
+    return where, params
+
+
+def list_history(item=None, movement_types=None, department=None, user=None,
+                 start=None, end=None, before=None, after=None, limit=PAGE_SIZE):
+    """Return one page of movements, newest first.
+
+    Pages are keyset-paginated on (created_at, id): pass the cursor of the
+    last row of a page as ``before`` for the next (older) page, or the cursor
+    of the first row as ``after`` for the previous (newer) one. Each page is
+    an index range scan on idx_created_at no matter how deep the user
+    scrolls, unlike LIMIT/OFFSET.
+
+    Args:
+        item: Item name prefix (uses idx_item_name)
+        movement_types: Iterable of movement_type values
+        department: Exact department
+        user: Exact user_name
+        start: Only movements at or after this date/datetime
+        end: Only movements before this date/datetime (exclusive)
+        before: (created_at, id) cursor - rows older than it
+        after: (created_at, id) cursor - rows newer than it
+        limit: Page size
+
+    Returns:
+        List of row dicts (id, created_at, display_time, item_name,
+        movement_type, quantity, user_name, notes, department)
+    """
+    ensure_table()
+    param = _paramstyle()
+    where, params = _history_filters(item, movement_types, department, user, start, end)
+
+    order = "DESC"
+    if before is not None:
+        where.append(f"(created_at < {param} OR (created_at = {param} AND id < {param}))")
+        params.extend([before[0], before[0], before[1]])
+    elif after is not None:
+        where.append(f"(created_at > {param} OR (created_at = {param} AND id > {param}))")
+        params.extend([after[0], after[0], after[1]])
+        order = "ASC"
+
+    sql = f"""
+        SELECT id, created_at, {_display_time_sql()} AS display_time, item_name,
+               movement_type, quantity, user_name, notes, department
+        FROM inventory_history
+        {'WHERE ' + ' AND '.join(where) if where else ''}
+        ORDER BY created_at {order}, id {order}
+        LIMIT {int(limit)}
+    """
+
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    columns = ('id', 'created_at', 'display_time', 'item_name', 'movement_type',
+               'quantity', 'user_name', 'notes', 'department')
+    result = []
+    for row in rows:
+        try:
+            result.append(dict(row))
+        except Exception:
+            result.append(dict(zip(columns, row)))
+    if order == "ASC":
+        result.reverse()
+    return result
+
+
+def cursor_of(row):
+    """Keyset cursor (created_at, id) of a list_history() row."""
+    return (row['created_at'], row['id'])
+
+
+def count_history(item=None, movement_types=None, department=None, user=None, start=None, end=None):
+    """Number of movements matching the list_history() filters."""
+    ensure_table()
+    where, params = _history_filters(item, movement_types, department, user, start, end)
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            f"SELECT COUNT(*) FROM inventory_history {'WHERE ' + ' AND '.join(where) if where else ''}",
+            params
+        )
+        return int(cur.fetchone()[0])
+    finally:
+        conn.close()
+
+
+def iter_history(page_size=1000, **filters):
+    """Yield every movement matching ``filters`` (see list_history), newest first.
+
+    Rows are read one keyset page at a time, so walking the whole table
+    (e.g. for an export) holds at most ``page_size`` rows in memory.
+    """
+    before = None
+    while True:
+        page = list_history(before=before, limit=page_size, **filters)
+        yield from page
+        if len(page) < page_size:
+            return
+        before = cursor_of(page[-1])
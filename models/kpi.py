@@ -0,0 +1,402 @@
+"""Materialized dashboard KPI counters.
+
+The kpi_summary table keeps one row of running totals for the whole
+inventory (scope '__all__') and one per item category/department, so the
+dashboards can read their KPIs with a primary-key lookup instead of
+aggregating items and damages on every page switch.
+
+Write paths keep the counters current by calling capture() before and
+after changing an item and apply_item_change() / apply_damage() inside the
+same transaction. rebuild() recomputes everything from scratch and
+verify() reports drift; both are also available from the command line:
+
+    python -m models.kpi verify
+    python -m models.kpi rebuild
+"""
+import threading
+from datetime import datetime
+
+from .database import get_conn, DB_DRIVER, _paramstyle
+
+GLOBAL_SCOPE = '__all__'
+
+_FIELDS = ('inventory_value', 'inventory_items', 'low_stocks', 'wastages')
+
+_table_ready = False
+_table_lock = threading.Lock()
+
+
+def _empty_kpis():
+    return {
+        'inventory_value': 0.0,
+        'inventory_items': 0,
+        'low_stocks': 0,
+        'wastages': 0
+    }
+
+
+class KpiSummaryModel:
+    @staticmethod
+    def ensure_table(conn=None):
+        """Create the kpi_summary table if it does not exist yet (once per process)."""
+        global _table_ready
+        if _table_ready:
+            return
+        with _table_lock:
+            if _table_ready:
+                return
+            own_conn = conn is None
+            if own_conn:
+                conn = get_conn()
+            try:
+                cur = conn.cursor()
+                if DB_DRIVER == 'mariadb':
+                    cur.execute("""
+                        CREATE TABLE IF NOT EXISTS kpi_summary (
+                            scope VARCHAR(255) PRIMARY KEY,
+                            inventory_value DECIMAL(14,2) DEFAULT 0,
+                            inventory_items INT DEFAULT 0,
+                            low_stocks INT DEFAULT 0,
+                            wastages INT DEFAULT 0,
+                            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                        ) ENGINE=InnoDB;
+                    """)
+                else:
+                    cur.execute("""
+                        CREATE TABLE IF NOT EXISTS kpi_summary (
+                            scope TEXT PRIMARY KEY,
+                            inventory_value REAL DEFAULT 0,
+                            inventory_items INTEGER DEFAULT 0,
+                            low_stocks INTEGER DEFAULT 0,
+                            wastages INTEGER DEFAULT 0,
+                            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+                        );
+                    """)
+                if own_conn:
+                    conn.commit()
+                _table_ready = True
+            finally:
+                if own_conn:
+                    conn.close()
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance (called inside the writer's transaction)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def capture(cur, item_id):
+        """Return the KPI contribution of one item, or None if it doesn't exist.
+
+        On MariaDB the item row is locked until the caller's transaction ends,
+        so concurrent writers can't interleave between capture and apply.
+        """
+        if not item_id:
+            return None
+        return next(iter(KpiSummaryModel.capture_many(cur, [item_id]).values()), None)
+
+    @staticmethod
+    def capture_many(cur, item_ids):
+        """capture() for several items in one query; returns {item_id: contribution}."""
+        ids = sorted({i for i in item_ids if i})
+        if not ids:
+            return {}
+        param = _paramstyle()
+        sql = f"""
+            SELECT i.id, i.category, i.unit_cost, i.stock_qty, i.min_stock,
+                   (SELECT COALESCE(SUM(d.quantity), 0) FROM damages d WHERE d.item_id = i.id)
+            FROM items i
+            WHERE i.id IN ({", ".join([param] * len(ids))})
+        """
+        if DB_DRIVER == 'mariadb':
+            sql += " FOR UPDATE"
+        cur.execute(sql, tuple(ids))
+        result = {}
+        for row in cur.fetchall():
+            item_id, category, unit_cost, stock_qty, min_stock, wastages = (row[0], row[1], row[2], row[3], row[4], row[5])
+            low = stock_qty is not None and min_stock is not None and stock_qty <= min_stock
+            result[item_id] = {
+                'category': category,
+                'inventory_value': round(float(unit_cost or 0) * float(stock_qty or 0), 2),
+                'inventory_items': 1,
+                'low_stocks': 1 if low else 0,
+                'wastages': int(wastages or 0)
+            }
+        return result
+
+    @staticmethod
+    def apply_item_change(cur, before, after):
+        """Apply the difference between two capture() results to the counters.
+
+        Pass before=None for a new item and after=None for a deleted one.
+        Damages stay in the global wastage total when their item is deleted
+        (item_id is set to NULL), but leave the category's total.
+        """
+        KpiSummaryModel.apply_item_changes(cur, [(before, after)])
+
+    @staticmethod
+    def apply_item_changes(cur, changes):
+        """apply_item_change() for a batch of (before, after) pairs in one upsert."""
+        deltas = {}
+
+        def add(scope, contribution, sign, include_wastage):
+            if scope is None:
+                return
+            totals = deltas.setdefault(scope, [0.0, 0, 0, 0])
+            totals[0] += sign * contribution['inventory_value']
+            totals[1] += sign * contribution['inventory_items']
+            totals[2] += sign * contribution['low_stocks']
+            if include_wastage:
+                totals[3] += sign * contribution['wastages']
+
+        for before, after in changes:
+            if before:
+                add(GLOBAL_SCOPE, before, -1, False)
+                add(before['category'], before, -1, True)
+            if after:
+                add(GLOBAL_SCOPE, after, 1, False)
+                add(after['category'], after, 1, True)
+
+        KpiSummaryModel._apply_deltas(cur, deltas)
+
+    @staticmethod
+    def apply_damage(cur, item_id, quantity):
+        """Count newly logged damage against the global and the item's category totals."""
+        quantity = int(quantity or 0)
+        if not quantity:
+            return
+        deltas = {GLOBAL_SCOPE: [0.0, 0, 0, quantity]}
+        if item_id:
+            cur.execute(f"SELECT category FROM items WHERE id = {_paramstyle()}", (item_id,))
+            row = cur.fetchone()
+            if row and row[0] is not None:
+                deltas.setdefault(row[0], [0.0, 0, 0, 0])[3] += quantity
+        KpiSummaryModel._apply_deltas(cur, deltas)
+
+    @staticmethod
+    def _apply_deltas(cur, deltas):
+        deltas = {scope: d for scope, d in deltas.items() if any(d)}
+        if not deltas:
+            return
+        param = _paramstyle()
+
+        # Counters are only maintained once a baseline exists; until then
+        # reads fall back to the aggregate query and the first read rebuilds.
+        # (No DDL here: on MariaDB it would commit the caller's transaction.)
+        try:
+            cur.execute(f"SELECT 1 FROM kpi_summary WHERE scope = {param}", (GLOBAL_SCOPE,))
+            if not cur.fetchone():
+                return
+        except Exception:
+            return
+
+        if DB_DRIVER == 'mariadb':
+            sql = f"""
+                INSERT INTO kpi_summary (scope, inventory_value, inventory_items, low_stocks, wastages, updated_at)
+                VALUES ({param},{param},{param},{param},{param},{param})
+                ON DUPLICATE KEY UPDATE
+                    inventory_value = inventory_value + VALUES(inventory_value),
+                    inventory_items = inventory_items + VALUES(inventory_items),
+                    low_stocks = low_stocks + VALUES(low_stocks),
+                    wastages = wastages + VALUES(wastages),
+                    updated_at = VALUES(updated_at)
+            """
+        else:
+            sql = f"""
+                INSERT INTO kpi_summary (scope, inventory_value, inventory_items, low_stocks, wastages, updated_at)
+                VALUES ({param},{param},{param},{param},{param},{param})
+                ON CONFLICT(scope) DO UPDATE SET
+                    inventory_value = inventory_value + excluded.inventory_value,
+                    inventory_items = inventory_items + excluded.inventory_items,
+                    low_stocks = low_stocks + excluded.low_stocks,
+                    wastages = wastages + excluded.wastages,
+                    updated_at = excluded.updated_at
+            """
+        now = datetime.now()
+        cur.executemany(sql, [
+            (scope, round(d[0], 2), d[1], d[2], d[3], now)
+            for scope, d in sorted(deltas.items())
+        ])
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    @staticmethod
+    def get_kpis(department=None):
+        """Read the materialized KPIs for one department, or for everything.
+
+        Builds the table on first use. Returns None if the summary can't be
+        read so callers can fall back to computing the KPIs directly.
+        """
+        scope = department or GLOBAL_SCOPE
+        for attempt in range(2):
+            conn = get_conn()
+            try:
+                KpiSummaryModel.ensure_table(conn)
+                cur = conn.cursor()
+                param = _paramstyle()
+                cur.execute(
+                    f"SELECT scope, inventory_value, inventory_items, low_stocks, wastages "
+                    f"FROM kpi_summary WHERE scope IN ({param}, {param})",
+                    (GLOBAL_SCOPE, scope)
+                )
+                rows = {r[0]: r for r in cur.fetchall()}
+            except Exception as e:
+                print(f"[KPI] Error reading kpi_summary: {e}")
+                return None
+            finally:
+                conn.close()
+
+            if GLOBAL_SCOPE not in rows:
+                # Never built (or wiped) - build once, then read again
+                if attempt or not KpiSummaryModel.rebuild():
+                    return None
+                continue
+
+            row = rows.get(scope)
+            if not row:
+                # A category without any items or damages yet
+                return _empty_kpis()
+            return {
+                'inventory_value': float(row[1] or 0),
+                'inventory_items': int(row[2] or 0),
+                'low_stocks': int(row[3] or 0),
+                'wastages': int(row[4] or 0)
+            }
+        return None
+
+    # ------------------------------------------------------------------
+    # Rebuild / drift check
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _compute(cur):
+        """Aggregate the true KPI values for every scope straight from items/damages."""
+        cur.execute("""
+            SELECT category,
+                   COALESCE(SUM(unit_cost * stock_qty), 0),
+                   COUNT(*),
+                   COALESCE(SUM(CASE WHEN stock_qty <= min_stock THEN 1 ELSE 0 END), 0)
+            FROM items
+            GROUP BY category
+        """)
+        actual = {GLOBAL_SCOPE: _empty_kpis()}
+        for category, value, count, low in cur.fetchall():
+            total = actual[GLOBAL_SCOPE]
+            total['inventory_value'] += float(value or 0)
+            total['inventory_items'] += int(count or 0)
+            total['low_stocks'] += int(low or 0)
+            if category is not None:
+                kpis = actual.setdefault(category, _empty_kpis())
+                kpis['inventory_value'] = float(value or 0)
+                kpis['inventory_items'] = int(count or 0)
+                kpis['low_stocks'] = int(low or 0)
+
+        cur.execute("""
+            SELECT i.category, COALESCE(SUM(d.quantity), 0)
+            FROM damages d
+            JOIN items i ON d.item_id = i.id
+            WHERE i.category IS NOT NULL
+            GROUP BY i.category
+        """)
+        for category, wastages in cur.fetchall():
+            actual.setdefault(category, _empty_kpis())['wastages'] = int(wastages or 0)
+
+        cur.execute("SELECT COALESCE(SUM(quantity), 0) FROM damages")
+        actual[GLOBAL_SCOPE]['wastages'] = int(cur.fetchone()[0] or 0)
+
+        for kpis in actual.values():
+            kpis['inventory_value'] = round(kpis['inventory_value'], 2)
+        return actual
+
+    @staticmethod
+    def rebuild():
+        """Recompute every counter from items/damages in one transaction."""
+        KpiSummaryModel.ensure_table()
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            param = _paramstyle()
+            actual = KpiSummaryModel._compute(cur)
+            now = datetime.now()
+            cur.execute("DELETE FROM kpi_summary")
+            cur.executemany(
+                f"INSERT INTO kpi_summary (scope, inventory_value, inventory_items, low_stocks, wastages, updated_at) "
+                f"VALUES ({param},{param},{param},{param},{param},{param})",
+                [(scope,) + tuple(kpis[f] for f in _FIELDS) + (now,) for scope, kpis in actual.items()]
+            )
+            conn.commit()
+            return True
+        except Exception as e:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            print(f"[KPI] Error rebuilding kpi_summary: {e}")
+            return False
+        finally:
+            conn.close()
+
+    @staticmethod
+    def verify():
+        """Compare the stored counters with freshly aggregated values.
+
+        Returns:
+            list of dicts (scope, field, stored, actual) for every mismatch
+        """
+        KpiSummaryModel.ensure_table()
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            actual = KpiSummaryModel._compute(cur)
+            cur.execute("SELECT scope, inventory_value, inventory_items, low_stocks, wastages FROM kpi_summary")
+            stored = {}
+            for r in cur.fetchall():
+                stored[r[0]] = {
+                    'inventory_value': float(r[1] or 0),
+                    'inventory_items': int(r[2] or 0),
+                    'low_stocks': int(r[3] or 0),
+                    'wastages': int(r[4] or 0)
+                }
+        finally:
+            conn.close()
+
+        drift = []
+        for scope in sorted(set(actual) | set(stored)):
+            have = stored.get(scope, _empty_kpis())
+            want = actual.get(scope, _empty_kpis())
+            for field in _FIELDS:
+                if field == 'inventory_value':
+                    same = abs(have[field] - want[field]) < 0.01
+                else:
+                    same = have[field] == want[field]
+                if not same:
+                    drift.append({'scope': scope, 'field': field, 'stored': have[field], 'actual': want[field]})
+        return drift
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check or rebuild the materialized dashboard KPIs.")
+    parser.add_argument('command', choices=['verify', 'rebuild'])
+    parser.add_argument('--fix', action='store_true', help="rebuild when verify finds drift")
+    args = parser.parse_args(argv)
+
+    if args.command == 'rebuild':
+        ok = KpiSummaryModel.rebuild()
+        print("kpi_summary rebuilt" if ok else "kpi_summary rebuild failed")
+        return 0 if ok else 1
+
+    drift = KpiSummaryModel.verify()
+    if not drift:
+        print("kpi_summary is up to date")
+        return 0
+    for d in drift:
+        print(f"{d['scope']}: {d['field']} stored={d['stored']} actual={d['actual']}")
+    if args.fix:
+        ok = KpiSummaryModel.rebuild()
+        print("kpi_summary rebuilt" if ok else "kpi_summary rebuild failed")
+        return 0 if ok else 1
+    return 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
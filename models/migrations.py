@@ -0,0 +1,559 @@
+"""Versioned schema migrations.
+
+Every schema change is an entry in MIGRATIONS, numbered in the order it was
+made. The schema_version table records which ones a database has had:
+
+    from models.migrations import migrate
+    migrate()          # once at startup; also `python -m hms migrate`
+
+migrate() checks the database once per process. When it is already current
+that check is a single SELECT and nothing else runs; otherwise the pending
+steps run in order and each is recorded as soon as it succeeds. Afterwards
+the models' own ensure_*() helpers are marked done, so they don't repeat
+their DDL on first use either.
+
+Steps are idempotent (IF NOT EXISTS / column checks), so two terminals
+migrating the same database at the same moment is harmless.
+
+To change the schema, append a new (version, name, function) entry - never
+edit or renumber one that has shipped - and mirror it in hms_setup.sql.
+"""
+import threading
+from datetime import datetime
+
+from .database import get_conn, DB_DRIVER, _paramstyle
+
+_current = False
+_lock = threading.Lock()
+
+
+# ----------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------
+
+def _columns(cur, table):
+    """Names of the columns ``table`` currently has."""
+    if DB_DRIVER == 'mariadb':
+        cur.execute(
+            "SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,)
+        )
+        return {row[0] for row in cur.fetchall()}
+    cur.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cur.fetchall()}
+
+
+def _add_columns(cur, table, columns):
+    """Add the missing ones of ``columns`` ({name: (mariadb type, sqlite type)}).
+
+    Returns:
+        Names of the columns that were added
+    """
+    existing = _columns(cur, table)
+    added = []
+    for name, (mariadb_type, sqlite_type) in columns.items():
+        if name not in existing:
+            col_type = mariadb_type if DB_DRIVER == 'mariadb' else sqlite_type
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+            added.append(name)
+    return added
+
+
+def _require(module, flag, step):
+    """Fail the migration if an ensure_*() helper swallowed its error."""
+    if not getattr(module, flag):
+        raise RuntimeError(f"{step} did not complete (see the error above)")
+
+
+# ----------------------------------------------------------------------
+# Migrations
+# ----------------------------------------------------------------------
+
+_CORE_TABLES = {
+    'users': ("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            email VARCHAR(255) UNIQUE NOT NULL,
+            password VARCHAR(255) NOT NULL,
+            full_name VARCHAR(255) NOT NULL,
+            role VARCHAR(50) NOT NULL,
+            department VARCHAR(100) DEFAULT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_email (email),
+            INDEX idx_role (role)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """, """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            full_name TEXT NOT NULL,
+            role TEXT NOT NULL,
+            department TEXT DEFAULT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """),
+    'suppliers': ("""
+        CREATE TABLE IF NOT EXISTS suppliers (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            contact_name VARCHAR(255),
+            email VARCHAR(255),
+            phone VARCHAR(64),
+            address TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_name (name)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """, """
+        CREATE TABLE IF NOT EXISTS suppliers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            contact_name TEXT,
+            email TEXT,
+            phone TEXT,
+            address TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """),
+    'items': ("""
+        CREATE TABLE IF NOT EXISTS items (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            sku VARCHAR(100) DEFAULT NULL,
+            unit VARCHAR(50) NOT NULL,
+            unit_cost DECIMAL(12,2) DEFAULT 0.00,
+            stock_qty INT DEFAULT 0,
+            min_stock INT DEFAULT 10,
+            category VARCHAR(100) DEFAULT 'General',
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_name (name),
+            INDEX idx_category (category),
+            INDEX idx_stock (stock_qty),
+            INDEX idx_stock_min (stock_qty, min_stock)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """, """
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            sku TEXT DEFAULT NULL,
+            unit TEXT NOT NULL DEFAULT '',
+            unit_cost REAL DEFAULT 0,
+            stock_qty INTEGER DEFAULT 0,
+            min_stock INTEGER DEFAULT 10,
+            category TEXT DEFAULT 'General',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """),
+    'purchases': ("""
+        CREATE TABLE IF NOT EXISTS purchases (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            supplier_id INT,
+            expected_date DATE,
+            total_amount DECIMAL(12,2) DEFAULT 0.00,
+            status VARCHAR(32) DEFAULT 'pending',
+            created_by VARCHAR(255),
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            FOREIGN KEY (supplier_id) REFERENCES suppliers(id) ON DELETE SET NULL,
+            INDEX idx_supplier (supplier_id),
+            INDEX idx_status (status)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """, """
+        CREATE TABLE IF NOT EXISTS purchases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            supplier_id INTEGER REFERENCES suppliers(id) ON DELETE SET NULL,
+            expected_date TEXT,
+            total_amount REAL DEFAULT 0,
+            status TEXT DEFAULT 'pending',
+            created_by TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """),
+    'purchase_items': ("""
+        CREATE TABLE IF NOT EXISTS purchase_items (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            purchase_id INT NOT NULL,
+            item_name VARCHAR(255),
+            item_id INT,
+            quantity INT NOT NULL,
+            price DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+            total DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (purchase_id) REFERENCES purchases(id) ON DELETE CASCADE,
+            FOREIGN KEY (item_id) REFERENCES items(id) ON DELETE SET NULL,
+            INDEX idx_purchase (purchase_id),
+            INDEX idx_item (item_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """, """
+        CREATE TABLE IF NOT EXISTS purchase_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            purchase_id INTEGER NOT NULL REFERENCES purchases(id) ON DELETE CASCADE,
+            item_name TEXT,
+            item_id INTEGER REFERENCES items(id) ON DELETE SET NULL,
+            quantity INTEGER NOT NULL,
+            price REAL NOT NULL DEFAULT 0,
+            total REAL NOT NULL DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """),
+    'damages': ("""
+        CREATE TABLE IF NOT EXISTS damages (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            item_id INT,
+            quantity INT NOT NULL,
+            reason TEXT,
+            created_by VARCHAR(255),
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (item_id) REFERENCES items(id) ON DELETE SET NULL,
+            INDEX idx_item (item_id),
+            INDEX idx_created_at (created_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """, """
+        CREATE TABLE IF NOT EXISTS damages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id INTEGER REFERENCES items(id) ON DELETE SET NULL,
+            quantity INTEGER NOT NULL,
+            reason TEXT,
+            created_by TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """),
+    'messages': ("""
+        CREATE TABLE IF NOT EXISTS messages (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            sender_id INT NOT NULL,
+            recipient_id INT NOT NULL,
+            category VARCHAR(64) DEFAULT 'General',
+            title VARCHAR(255),
+            body TEXT,
+            is_read BOOLEAN DEFAULT FALSE,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            FOREIGN KEY (sender_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (recipient_id) REFERENCES users(id) ON DELETE CASCADE,
+            INDEX idx_sender (sender_id),
+            INDEX idx_recipient (recipient_id),
+            INDEX idx_is_read (is_read),
+            INDEX idx_created_at (created_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """, """
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sender_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            recipient_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            category TEXT DEFAULT 'General',
+            title TEXT,
+            body TEXT,
+            is_read INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """),
+    'requests': ("""
+        CREATE TABLE IF NOT EXISTS requests (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            department VARCHAR(50) NOT NULL,
+            requested_by VARCHAR(100) NOT NULL,
+            item_name VARCHAR(255) NOT NULL,
+            quantity INT NOT NULL,
+            unit VARCHAR(50),
+            reason TEXT,
+            status VARCHAR(20) DEFAULT 'Pending',
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            notes TEXT,
+            INDEX idx_department (department),
+            INDEX idx_status (status),
+            INDEX idx_created_at (created_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """, """
+        CREATE TABLE IF NOT EXISTS requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            department TEXT NOT NULL,
+            requested_by TEXT NOT NULL,
+            item_name TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            unit TEXT,
+            reason TEXT,
+            status TEXT DEFAULT 'Pending',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            notes TEXT
+        )
+    """),
+}
+
+
+def _core_tables(cur):
+    """Tables from hms_setup.sql, for databases that weren't created from it."""
+    for mariadb_sql, sqlite_sql in _CORE_TABLES.values():
+        cur.execute(mariadb_sql if DB_DRIVER == 'mariadb' else sqlite_sql)
+
+
+def _purchase_items_columns(cur):
+    """Columns the purchase and receiving screens use on purchase_items."""
+    existing = _columns(cur, 'purchase_items')
+    added = _add_columns(cur, 'purchase_items', {
+        'item_name': ("VARCHAR(255)", "TEXT"),
+        'item_id': ("INT", "INTEGER"),
+        'quantity': ("INT DEFAULT 0", "INTEGER DEFAULT 0"),
+        'unit_price': ("DECIMAL(12,2) DEFAULT 0", "REAL DEFAULT 0"),
+        'qty_added_to_inventory': ("INT DEFAULT 0", "INTEGER DEFAULT 0"),
+        'in_inventory': ("TINYINT DEFAULT 0", "INTEGER DEFAULT 0"),
+    })
+    # Very old databases named these qty / price
+    if 'quantity' in added and 'qty' in existing:
+        cur.execute("UPDATE purchase_items SET quantity = qty WHERE quantity IS NULL OR quantity = 0")
+    if 'unit_price' in added and 'price' in existing:
+        cur.execute("UPDATE purchase_items SET unit_price = price WHERE unit_price IS NULL OR unit_price = 0")
+    # hms_setup.sql declared price NOT NULL without a default, but new lines
+    # only set unit_price
+    if DB_DRIVER == 'mariadb' and 'price' in existing:
+        cur.execute("ALTER TABLE purchase_items MODIFY price DECIMAL(12,2) NOT NULL DEFAULT 0.00")
+
+
+def _damages_columns(cur):
+    """Columns damage reports (per purchase order) store on damages."""
+    _add_columns(cur, 'damages', {
+        'purchase_id': ("INT", "INTEGER"),
+        'category': ("VARCHAR(100)", "TEXT"),
+        'status': ("VARCHAR(32) DEFAULT 'Reported'", "TEXT DEFAULT 'Reported'"),
+    })
+
+
+def _inventory_history(cur):
+    from . import inventory_history
+    inventory_history._table_ready = False
+    inventory_history.ensure_table()
+
+
+def _purchases_item_count(cur):
+    from . import purchase
+    purchase._purchase_schema_ready = False
+    purchase.PurchaseModel.ensure_schema()
+    _require(purchase, '_purchase_schema_ready', 'PurchaseModel.ensure_schema()')
+
+
+def _item_indexes(cur):
+    from . import purchase
+    purchase._item_indexes_ready = False
+    purchase.ItemModel.ensure_indexes()
+    _require(purchase, '_item_indexes_ready', 'ItemModel.ensure_indexes()')
+
+
+def _kpi_summary(cur):
+    from . import kpi
+    kpi._table_ready = False
+    kpi.KpiSummaryModel.ensure_table()
+
+
+def _message_indexes(cur):
+    from . import purchase
+    purchase._message_indexes_ready = False
+    purchase.MessageModel.ensure_indexes()
+    _require(purchase, '_message_indexes_ready', 'MessageModel.ensure_indexes()')
+
+
+def _request_indexes(cur):
+    from . import request
+    request._request_indexes_ready = False
+    request.RequestModel.ensure_indexes()
+    _require(request, '_request_indexes_ready', 'RequestModel.ensure_indexes()')
+
+
+def _items_name_norm(cur):
+    """items.name_norm: the lower-cased, trimmed name, unique, for indexed
+    case-insensitive lookups (ItemModel.get_items_by_names)."""
+    from .purchase import normalize_item_name
+    _add_columns(cur, 'items', {'name_norm': ("VARCHAR(255)", "TEXT")})
+    cur.execute("SELECT id, name FROM items ORDER BY id")
+    rows = cur.fetchall()
+    # Existing items that differ only in case keep working, but only the
+    # oldest is found by name; the others get NULL (allowed by the index)
+    seen = set()
+    values = []
+    for item_id, name in ((r[0], r[1]) for r in rows):
+        key = normalize_item_name(name)
+        if key in seen:
+            print(f"[MIGRATIONS] Item #{item_id} '{name}' duplicates an existing item name")
+            key = None
+        seen.add(key)
+        values.append((key, item_id))
+    param = _paramstyle()
+    cur.executemany(f"UPDATE items SET name_norm = {param} WHERE id = {param}", values)
+    if DB_DRIVER == 'mariadb':
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_name_norm ON items (name_norm)")
+    else:
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_items_name_norm ON items (name_norm)")
+
+
+def _updated_at_tracking(cur):
+    """purchase_items.updated_at (receiving updates lines in place), and on
+    SQLite triggers that keep every updated_at current, like MariaDB's
+    ON UPDATE CURRENT_TIMESTAMP does. Incremental snapshots rely on it."""
+    added = _add_columns(cur, 'purchase_items', {
+        'updated_at': ("DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP", "TEXT"),
+    })
+    if added:
+        # SQLite can't ALTER in a CURRENT_TIMESTAMP default; stamp existing
+        # lines now so the next incremental snapshot picks them all up once
+        cur.execute("UPDATE purchase_items SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL")
+    if DB_DRIVER == 'mariadb':
+        return
+    for table in ('users', 'suppliers', 'items', 'purchases', 'purchase_items', 'messages', 'requests'):
+        # Writes that set updated_at themselves keep their value; recursive
+        # triggers are off, so the trigger's own UPDATE doesn't fire it again
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_updated_at
+            AFTER UPDATE ON {table} FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+            BEGIN
+                UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+            END
+        """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_purchase_items_inserted_at
+        AFTER INSERT ON purchase_items FOR EACH ROW WHEN NEW.updated_at IS NULL
+        BEGIN
+            UPDATE purchase_items SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END
+    """)
+
+
+def _table_versions(cur):
+    from . import database
+    database._versions_ready = False
+    database.ensure_table_versions()
+
+
+# (version, name, function(cursor)) - append only. Functions that delegate to
+# an ensure_*() helper use their own connection; the cursor is for the rest.
+MIGRATIONS = [
+    (1, 'core tables', _core_tables),
+    (2, 'purchase_items columns', _purchase_items_columns),
+    (3, 'damages columns', _damages_columns),
+    (4, 'inventory_history', _inventory_history),
+    (5, 'purchases item_count', _purchases_item_count),
+    (6, 'items indexes', _item_indexes),
+    (7, 'kpi_summary', _kpi_summary),
+    (8, 'table_versions', _table_versions),
+    (9, 'messages indexes', _message_indexes),
+    (10, 'requests indexes', _request_indexes),
+    (11, 'items name_norm', _items_name_norm),
+    (12, 'updated_at tracking', _updated_at_tracking),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+def _ensure_version_table(cur):
+    if DB_DRIVER == 'mariadb':
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                applied_at DATETIME NOT NULL
+            ) ENGINE=InnoDB
+        """)
+    else:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TEXT NOT NULL
+            )
+        """)
+
+
+def current_version():
+    """Highest migration recorded in schema_version (0 for a new database)."""
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT MAX(version) FROM schema_version")
+        except Exception:
+            # No schema_version table yet
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            return 0
+        row = cur.fetchone()
+        return int(row[0] or 0) if row else 0
+    finally:
+        conn.close()
+
+
+def _mark_models_ready():
+    """Tell the models' ensure_*() helpers their DDL is already in place."""
+    from . import database, inventory_history, kpi, purchase, request
+    inventory_history._table_ready = True
+    purchase._purchase_schema_ready = True
+    purchase._item_indexes_ready = True
+    purchase._message_indexes_ready = True
+    request._request_indexes_ready = True
+    kpi._table_ready = True
+    database._versions_ready = True
+
+
+def migrate():
+    """Apply pending migrations (checked once per process).
+
+    Returns:
+        Names of the migrations applied by this call ([] when current)
+
+    Raises:
+        Exception: a migration failed; earlier ones stay recorded and the
+            failed one is retried next time
+    """
+    global _current
+    if _current:
+        return []
+    with _lock:
+        if _current:
+            return []
+
+        applied = []
+        version = current_version()
+        if version < LATEST_VERSION:
+            param = _paramstyle()
+            ignore = "INSERT IGNORE" if DB_DRIVER == 'mariadb' else "INSERT OR IGNORE"
+            conn = get_conn()
+            try:
+                cur = conn.cursor()
+                _ensure_version_table(cur)
+                conn.commit()
+                for number, name, step in MIGRATIONS:
+                    if number <= version:
+                        continue
+                    print(f"[MIGRATIONS] Applying {number}: {name}")
+                    step(cur)
+                    cur.execute(
+                        f"{ignore} INTO schema_version (version, name, applied_at) VALUES ({param}, {param}, {param})",
+                        (number, name, datetime.now())
+                    )
+                    conn.commit()
+                    applied.append(name)
+            except Exception:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                raise
+            finally:
+                conn.close()
+
+        _mark_models_ready()
+        _current = True
+        return applied
@@ -1,6 +1,60 @@
-from .database import get_conn, DB_DRIVER
+import threading
+import time
+
+from .database import get_conn, transaction, DB_DRIVER, bump_table_versions
+from .kpi import KpiSummaryModel
+from . import inventory_history
+from .inventory_history import MovementType
 from datetime import datetime
 
+_item_indexes_ready = False
+_purchase_schema_ready = False
+_message_indexes_ready = False
+
+# Seconds the cached list of purchase years/months stays valid
+PERIODS_TTL = 300
+
+# Maximum number of values bound into one IN (...) list
+_IN_CHUNK = 500
+
+
+class InsufficientStockError(Exception):
+    """Raised when a stock decrement would take an item below zero.
+
+    Attributes:
+        shortages: list of dicts (item_id, item_name, requested, available)
+    """
+
+    def __init__(self, shortages):
+        self.shortages = shortages
+        details = ", ".join(
+            f"{s['item_name']} (requested {s['requested']}, available {s['available']})" for s in shortages
+        )
+        super().__init__(f"Insufficient stock: {details}")
+
+
+class ItemNotFoundError(LookupError):
+    """Raised when no inventory item has the given name."""
+
+    def __init__(self, name):
+        self.name = name
+        super().__init__(f"Item '{name}' not found in inventory")
+
+
+class DuplicateItemNameError(ValueError):
+    """Raised when another item already has the name (ignoring case)."""
+
+    def __init__(self, name):
+        self.name = name
+        super().__init__(f"An item named '{name}' already exists")
+
+
+def normalize_item_name(name):
+    """Key stored in items.name_norm: names differing only in case or
+    surrounding spaces are the same item."""
+    return str(name or '').strip().lower()
+
+
 # Helper to adapt parameter placeholder depending on DB driver
 def _paramstyle():
     return "%s" if DB_DRIVER == 'mariadb' else "?"
@@ -26,231 +80,9 @@ def _exec(conn, sql, params=None):
 
 
 def create_tables():
-    conn = get_conn()
-    try:
-        cur = conn.cursor()
-        if DB_DRIVER == 'mariadb':
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS suppliers (
-                    id INT PRIMARY KEY AUTO_INCREMENT,
-                    name VARCHAR(255) NOT NULL,
-                    contact_name VARCHAR(255),
-                    email VARCHAR(255),
-                    phone VARCHAR(64),
-                    address TEXT
-                ) ENGINE=InnoDB;
-            """)
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS purchases (
-                    id INT PRIMARY KEY AUTO_INCREMENT,
-                    supplier_id INT,
-                    expected_date DATE,
-                    total_amount DECIMAL(12,2) DEFAULT 0,
-                    status VARCHAR(32) DEFAULT 'pending',
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                ) ENGINE=InnoDB;
-            """)
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS purchase_items (
-                    id INT PRIMARY KEY AUTO_INCREMENT,
-                    purchase_id INT,
-                    item_name VARCHAR(255),
-                    qty INT,
-                    price DECIMAL(12,2),
-                    total DECIMAL(12,2)
-                ) ENGINE=InnoDB;
-            """)
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS items (
-                    id INT PRIMARY KEY AUTO_INCREMENT,
-                    name VARCHAR(255) NOT NULL,
-                    stock INT DEFAULT 0
-                ) ENGINE=InnoDB;
-            """)
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS damages (
-                    id INT PRIMARY KEY AUTO_INCREMENT,
-                    item_id INT,
-                    quantity INT,
-                    reason TEXT,
-                    created_by VARCHAR(255),
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                ) ENGINE=InnoDB;
-            """)
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS messages (
-                    id INT PRIMARY KEY AUTO_INCREMENT,
-                    sender_id INT NOT NULL,
-                    recipient_id INT NOT NULL,
-                    category VARCHAR(64) DEFAULT 'General',
-                    title VARCHAR(255),
-                    body TEXT,
-                    is_read BOOLEAN DEFAULT FALSE,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (sender_id) REFERENCES users(id),
-                    FOREIGN KEY (recipient_id) REFERENCES users(id)
-                ) ENGINE=InnoDB;
-            """)
-            conn.commit()
-        else:
-            # sqlite
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS suppliers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    contact_name TEXT,
-                    email TEXT,
-                    phone TEXT,
-                    address TEXT
-                );
-            """)
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS purchases (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    supplier_id INTEGER,
-                    expected_date TEXT,
-                    total_amount REAL DEFAULT 0,
-                    status TEXT DEFAULT 'pending',
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS purchase_items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    purchase_id INTEGER,
-                    item_name TEXT,
-                    qty INTEGER,
-                    price REAL,
-                    total REAL
-                );
-            """)
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    stock INTEGER DEFAULT 0
-                );
-            """)
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS damages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    item_id INTEGER,
-                    quantity INTEGER,
-                    reason TEXT,
-                    created_by TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    sender_id INTEGER NOT NULL,
-                    recipient_id INTEGER NOT NULL,
-                    category TEXT DEFAULT 'General',
-                    title TEXT,
-                    body TEXT,
-                    is_read INTEGER DEFAULT 0,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (sender_id) REFERENCES users(id),
-                    FOREIGN KEY (recipient_id) REFERENCES users(id)
-                );
-            """)
-            conn.commit()
-            
-            # Add migration for new columns if they don't exist
-            PurchaseModel.migrate_purchase_items_table(conn)
-            
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
-
-    @staticmethod
-    def migrate_purchase_items_table(conn):
-        """Add missing columns to purchase_items table and handle renames."""
-        try:
-            cur = conn.cursor()
-            
-            # Check if item_id column exists
-            if _paramstyle == 'qmark':  # SQLite
-                cur.execute("PRAGMA table_info(purchase_items)")
-                columns = [row[1] for row in cur.fetchall()]
-                
-                if 'item_name' not in columns:
-                    cur.execute("ALTER TABLE purchase_items ADD COLUMN item_name TEXT")
-                    print("Added item_name column to purchase_items")
-                
-                if 'item_id' not in columns:
-                    cur.execute("ALTER TABLE purchase_items ADD COLUMN item_id INTEGER")
-                    print("Added item_id column to purchase_items")
-                
-                if 'quantity' not in columns and 'qty' in columns:
-                    # SQLite doesn't support RENAME COLUMN in older versions, so we'll just add it
-                    cur.execute("ALTER TABLE purchase_items ADD COLUMN quantity INTEGER DEFAULT 0")
-                    # Copy data from qty to quantity
-                    cur.execute("UPDATE purchase_items SET quantity = qty WHERE quantity IS NULL OR quantity = 0")
-                    print("Added quantity column to purchase_items")
-                elif 'quantity' not in columns:
-                    cur.execute("ALTER TABLE purchase_items ADD COLUMN quantity INTEGER DEFAULT 0")
-                    print("Added quantity column to purchase_items")
-                
-                if 'unit_price' not in columns and 'price' in columns:
-                    cur.execute("ALTER TABLE purchase_items ADD COLUMN unit_price REAL DEFAULT 0")
-                    cur.execute("UPDATE purchase_items SET unit_price = price WHERE unit_price IS NULL OR unit_price = 0")
-                    print("Added unit_price column to purchase_items")
-                elif 'unit_price' not in columns:
-                    cur.execute("ALTER TABLE purchase_items ADD COLUMN unit_price REAL DEFAULT 0")
-                    print("Added unit_price column to purchase_items")
-                
-                if 'in_inventory' not in columns:
-                    cur.execute("ALTER TABLE purchase_items ADD COLUMN in_inventory INTEGER DEFAULT 0")
-                    print("Added in_inventory column to purchase_items")
-                    
-            else:  # MySQL
-                cur.execute("""
-                    SELECT COLUMN_NAME 
-                    FROM INFORMATION_SCHEMA.COLUMNS 
-                    WHERE TABLE_SCHEMA = DATABASE() 
-                    AND TABLE_NAME = 'purchase_items'
-                """)
-                columns = [row[0] for row in cur.fetchall()]
-                
-                if 'item_name' not in columns:
-                    cur.execute("ALTER TABLE purchase_items ADD COLUMN item_name VARCHAR(255)")
-                    print("Added item_name column to purchase_items")
-                
-                if 'item_id' not in columns:
-                    cur.execute("ALTER TABLE purchase_items ADD COLUMN item_id INT")
-                    print("Added item_id column to purchase_items")
-                
-                if 'quantity' not in columns and 'qty' in columns:
-                    cur.execute("ALTER TABLE purchase_items ADD COLUMN quantity INT DEFAULT 0")
-                    cur.execute("UPDATE purchase_items SET quantity = qty WHERE quantity IS NULL OR quantity = 0")
-                    print("Added quantity column to purchase_items")
-                elif 'quantity' not in columns:
-                    cur.execute("ALTER TABLE purchase_items ADD COLUMN quantity INT DEFAULT 0")
-                    print("Added quantity column to purchase_items")
-                
-                if 'unit_price' not in columns and 'price' in columns:
-                    cur.execute("ALTER TABLE purchase_items ADD COLUMN unit_price DECIMAL(12,2) DEFAULT 0")
-                    cur.execute("UPDATE purchase_items SET unit_price = price WHERE unit_price IS NULL OR unit_price = 0")
-                    print("Added unit_price column to purchase_items")
-                elif 'unit_price' not in columns:
-                    cur.execute("ALTER TABLE purchase_items ADD COLUMN unit_price DECIMAL(12,2) DEFAULT 0")
-                    print("Added unit_price column to purchase_items")
-                
-                if 'in_inventory' not in columns:
-                    cur.execute("ALTER TABLE purchase_items ADD COLUMN in_inventory TINYINT DEFAULT 0")
-                    print("Added in_inventory column to purchase_items")
-            
-            conn.commit()
-            
-        except Exception as e:
-            print(f"Migration warning: {e}")
-            import traceback
-            traceback.print_exc()
-            # Don't fail if migration has issues
+    """Bring the schema up to date; see models.migrations (a no-op once current)."""
+    from .migrations import migrate
+    migrate()
 
 
 class SupplierModel:
@@ -262,6 +94,7 @@ class SupplierModel:
                 ",".join([_paramstyle()]*5)
             )
             cur = _exec(conn, sql, (data.get('name'), data.get('contact_name'), data.get('email'), data.get('phone'), data.get('address')))
+            bump_table_versions(cur, 'suppliers')
             conn.commit()
             return cur.lastrowid if hasattr(cur, 'lastrowid') else cur.lastrowid
         finally:
@@ -309,7 +142,8 @@ class SupplierModel:
             sql = "UPDATE suppliers SET name = {}, contact_name = {}, email = {}, phone = {}, address = {} WHERE id = {}".format(
                 _paramstyle(), _paramstyle(), _paramstyle(), _paramstyle(), _paramstyle(), _paramstyle()
             )
-            _exec(conn, sql, (data.get('name'), data.get('contact_name'), data.get('email'), data.get('phone'), data.get('address'), sid))
+            cur = _exec(conn, sql, (data.get('name'), data.get('contact_name'), data.get('email'), data.get('phone'), data.get('address'), sid))
+            bump_table_versions(cur, 'suppliers')
             conn.commit()
             return True
         except Exception:
@@ -321,7 +155,8 @@ class SupplierModel:
     def delete_supplier(sid: int):
         conn = get_conn()
         try:
-            _exec(conn, f"DELETE FROM suppliers WHERE id = {_paramstyle()}", (sid,))
+            cur = _exec(conn, f"DELETE FROM suppliers WHERE id = {_paramstyle()}", (sid,))
+            bump_table_versions(cur, 'suppliers')
             conn.commit()
             return True
         except Exception:
@@ -358,6 +193,141 @@ class ItemModel:
         finally:
             conn.close()
 
+    # Sort keys accepted by query_items(), mapped to trusted SQL expressions
+    SORT_COLUMNS = {
+        'name': 'name',
+        'category': 'category',
+        'unit': 'unit',
+        'unit_cost': 'unit_cost',
+        'stock_qty': 'stock_qty',
+        'min_stock': 'min_stock',
+        'value': 'unit_cost * stock_qty',
+        'created_at': 'created_at'
+    }
+
+    @staticmethod
+    def ensure_indexes():
+        """Create the indexes query_items() relies on (once per process)."""
+        global _item_indexes_ready
+        if _item_indexes_ready:
+            return
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            if DB_DRIVER == 'mariadb':
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_category ON items (category)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_stock_min ON items (stock_qty, min_stock)")
+            else:
+                # NOCASE so the case-insensitive category filter can use it
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_items_category ON items (category COLLATE NOCASE)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_items_stock_min ON items (stock_qty, min_stock)")
+            conn.commit()
+            _item_indexes_ready = True
+        except Exception as e:
+            print(f"[ITEMS] Could not create item indexes: {e}")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _item_filters(category=None, department=None, low_stock_only=False, search=None):
+        """Build the WHERE clause shared by query_items() and count_items()."""
+        param = _paramstyle()
+        clauses = []
+        params = []
+
+        # Departments and item categories are the same thing in this app;
+        # the department filter wins when both are given, like the inventory page
+        scope = department or category
+        if scope:
+            if DB_DRIVER == 'mariadb':
+                # utf8mb4_unicode_ci comparisons are already case-insensitive
+                clauses.append(f"category = {param}")
+            else:
+                clauses.append(f"category = {param} COLLATE NOCASE")
+            params.append(scope)
+
+        if low_stock_only:
+            clauses.append("stock_qty <= min_stock")
+
+        if search:
+            pattern = '%' + search.strip().replace('!', '!!').replace('%', '!%').replace('_', '!_') + '%'
+            clauses.append(f"(name LIKE {param} ESCAPE '!' OR sku LIKE {param} ESCAPE '!')")
+            params.extend([pattern, pattern])
+
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params
+
+    @staticmethod
+    def query_items(category: str | None = None, department: str | None = None, low_stock_only: bool = False,
+                    search: str | None = None, sort: str = 'name', descending: bool = False,
+                    limit: int | None = None, offset: int = 0):
+        """Fetch items with filtering, sorting and paging done in SQL.
+
+        Args:
+            category: Only items in this category (case-insensitive)
+            department: Alias for category; takes precedence when both are set
+            low_stock_only: Only items at or below their minimum stock
+            search: Substring matched against item name and SKU
+            sort: One of ItemModel.SORT_COLUMNS
+            descending: Reverse the sort order
+            limit: Maximum number of rows, or None for all
+            offset: Number of rows to skip (used with limit)
+
+        Returns:
+            list of item dicts, same shape as list_items()
+        """
+        if sort not in ItemModel.SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {sort}")
+        ItemModel.ensure_indexes()
+
+        where, params = ItemModel._item_filters(category, department, low_stock_only, search)
+        direction = "DESC" if descending else "ASC"
+        sql = (
+            "SELECT id, name, sku, unit, unit_cost, stock_qty, min_stock, category, created_at FROM items"
+            f"{where} ORDER BY {ItemModel.SORT_COLUMNS[sort]} {direction}, id {direction}"
+        )
+        if limit is not None:
+            sql += f" LIMIT {max(0, int(limit))} OFFSET {max(0, int(offset))}"
+
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            cur.execute(sql, tuple(params))
+            rows = cur.fetchall()
+            result = []
+            for r in rows:
+                try:
+                    result.append(dict(r))
+                except Exception:
+                    result.append({
+                        'id': r[0], 
+                        'name': r[1], 
+                        'sku': r[2], 
+                        'unit': r[3], 
+                        'unit_cost': r[4], 
+                        'stock_qty': r[5], 
+                        'min_stock': r[6], 
+                        'category': r[7], 
+                        'created_at': r[8]
+                    })
+            return result
+        finally:
+            conn.close()
+
+    @staticmethod
+    def count_items(category: str | None = None, department: str | None = None, low_stock_only: bool = False,
+                    search: str | None = None):
+        """Count the items query_items() would return for the same filters (ignoring paging)."""
+        ItemModel.ensure_indexes()
+        where, params = ItemModel._item_filters(category, department, low_stock_only, search)
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            cur.execute(f"SELECT COUNT(*) FROM items{where}", tuple(params))
+            return int(cur.fetchone()[0] or 0)
+        finally:
+            conn.close()
+
     @staticmethod
     def get_item(iid: int):
         conn = get_conn()
@@ -393,24 +363,390 @@ class ItemModel:
         conn = get_conn()
         try:
             cur = conn.cursor()
+            before = KpiSummaryModel.capture(cur, item_id)
             cur.execute("UPDATE items SET stock_qty = COALESCE(stock_qty,0) + {} WHERE id = {}".format(_paramstyle(), _paramstyle()), (delta, item_id))
+            KpiSummaryModel.apply_item_change(cur, before, KpiSummaryModel.capture(cur, item_id))
+            bump_table_versions(cur, 'items')
             conn.commit()
             return True
         except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
             return False
         finally:
             conn.close()
-    
+
     @staticmethod
-    def add_item(name: str, category: str, unit: str, unit_cost: float, stock_qty: int, min_stock: int):
-        """Add a new inventory item."""
+    def record_adjustment(item_id: int, delta: int, user_name: str, notes: str | None = None):
+        """Change an item's stock by ``delta`` and log it, in one transaction.
+
+        Positive deltas are logged as stock in, negative ones as adjustments
+        (with the signed quantity). Unlike adjust_stock() the database
+        refuses to take the stock below zero.
+
+        Raises:
+            InsufficientStockError: a negative delta exceeds the stock on hand
+            ValueError: delta is zero or the item doesn't exist
+        """
+        delta = int(delta)
+        if delta == 0:
+            raise ValueError("Stock adjustment must be non-zero")
+
+        inventory_history.ensure_table()
         conn = get_conn()
         try:
+            cur = conn.cursor()
             param = _paramstyle()
-            sql = f"INSERT INTO items (name, category, unit, unit_cost, stock_qty, min_stock, created_at) VALUES ({param},{param},{param},{param},{param},{param},{param})"
-            _exec(conn, sql, (name, category, unit, unit_cost, stock_qty, min_stock, datetime.now()))
+            before = KpiSummaryModel.capture(cur, item_id)
+            cur.execute(
+                f"UPDATE items SET stock_qty = COALESCE(stock_qty,0) + {param} "
+                f"WHERE id = {param} AND COALESCE(stock_qty,0) + {param} >= 0",
+                (delta, item_id, delta)
+            )
+            if cur.rowcount != 1:
+                cur.execute(f"SELECT name, stock_qty FROM items WHERE id = {param}", (item_id,))
+                row = cur.fetchone()
+                conn.rollback()
+                if row is None:
+                    raise ValueError(f"Item {item_id} not found")
+                raise InsufficientStockError([{
+                    'item_id': item_id,
+                    'item_name': row[0],
+                    'requested': -delta,
+                    'available': row[1] or 0
+                }])
+
+            cur.execute(f"SELECT name, category FROM items WHERE id = {param}", (item_id,))
+            name, category = cur.fetchone()
+            movement = MovementType.STOCK_IN if delta > 0 else MovementType.ADJUSTMENT
+            inventory_history.write_events(cur, [
+                inventory_history.make_event(name, movement, delta, user_name,
+                                             notes or '', category)
+            ])
+            KpiSummaryModel.apply_item_change(cur, before, KpiSummaryModel.capture(cur, item_id))
+            bump_table_versions(cur, 'items')
             conn.commit()
             return True
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _names_by_id(cur, item_ids):
+        """Return {id: name} for the given item ids (inside the caller's transaction)."""
+        param = _paramstyle()
+        ids = sorted({i for i in item_ids if i})
+        names = {}
+        for start in range(0, len(ids), _IN_CHUNK):
+            chunk = ids[start:start + _IN_CHUNK]
+            cur.execute(f"SELECT id, name FROM items WHERE id IN ({', '.join([param] * len(chunk))})", tuple(chunk))
+            names.update({r[0]: r[1] for r in cur.fetchall()})
+        return names
+
+    @staticmethod
+    def get_items_by_names(names, cur=None, for_update=False):
+        """Look up items by name, ignoring case (one indexed query per 500 names).
+
+        Args:
+            names: Item names as typed (e.g. from requests or an import file)
+            cur: Cursor of the caller's open transaction (optional)
+            for_update: Lock the rows until the transaction ends (MariaDB),
+                so stock_qty can't change under the caller
+
+        Returns:
+            {name: item dict} for the names that exist, keyed as given
+        """
+        names = [n for n in dict.fromkeys(names) if normalize_item_name(n)]
+        if not names:
+            return {}
+        if cur is None:
+            conn = get_conn()
+            try:
+                return ItemModel.get_items_by_names(names, conn.cursor(), for_update)
+            finally:
+                conn.close()
+
+        param = _paramstyle()
+        keys = sorted({normalize_item_name(n) for n in names})
+        by_key = {}
+        for start in range(0, len(keys), _IN_CHUNK):
+            chunk = keys[start:start + _IN_CHUNK]
+            cur.execute(
+                f"SELECT id, name, category, unit, unit_cost, stock_qty, min_stock, name_norm FROM items "
+                f"WHERE name_norm IN ({', '.join([param] * len(chunk))})"
+                + (" FOR UPDATE" if for_update and DB_DRIVER == 'mariadb' else ""),
+                tuple(chunk)
+            )
+            for r in cur.fetchall():
+                by_key[r[7]] = {
+                    'id': r[0], 'name': r[1], 'category': r[2], 'unit': r[3],
+                    'unit_cost': r[4], 'stock_qty': r[5], 'min_stock': r[6]
+                }
+        return {n: by_key[normalize_item_name(n)] for n in names if normalize_item_name(n) in by_key}
+
+    @staticmethod
+    def get_item_by_name(name: str):
+        """Return the item named ``name`` (ignoring case), or None."""
+        return ItemModel.get_items_by_names([name]).get(name)
+
+    @staticmethod
+    def resolve_items(cur, specs):
+        """Map item names to ids, creating the missing items (inside the caller's transaction).
+
+        Args:
+            cur: Cursor of the caller's open transaction
+            specs: list of dicts {name, category, unit, unit_price}; the first
+                spec for a name (ignoring case) supplies the details of a newly
+                created item
+
+        Returns:
+            {name: item_id}
+        """
+        param = _paramstyle()
+        wanted = {}
+        for spec in specs:
+            name = (spec.get('name') or '').strip()
+            if name:
+                wanted.setdefault(name, spec)
+        if not wanted:
+            return {}
+
+        found = ItemModel.get_items_by_names(wanted, cur)
+        resolved = {n: item['id'] for n, item in found.items()}
+        missing = {}
+        for n in wanted:
+            if n not in resolved:
+                missing.setdefault(normalize_item_name(n), n)
+        if missing:
+            now = datetime.now()
+            cur.executemany(
+                f"INSERT INTO items (name, name_norm, category, unit, unit_cost, stock_qty, min_stock, created_at) VALUES ({param},{param},{param},{param},{param},{param},{param},{param})",
+                [(n, key, wanted[n].get('category') or 'General', wanted[n].get('unit') or '',
+                  float(wanted[n].get('unit_price') or 0), 0, 10, now) for key, n in missing.items()]
+            )
+            created = ItemModel.get_items_by_names([n for n in wanted if n not in resolved], cur)
+            resolved.update({n: item['id'] for n, item in created.items()})
+            after = KpiSummaryModel.capture_many(cur, {item['id'] for item in created.values()})
+            KpiSummaryModel.apply_item_changes(cur, [(None, c) for c in after.values()])
+            bump_table_versions(cur, 'items')
+        return resolved
+
+    @staticmethod
+    def distribute_stock(lines: list, department: str, user_name: str, notes: str | None = None):
+        """Take stock out of inventory for a department in one transaction.
+
+        All decrements, the inventory_history rows and the KPI counters are
+        written together; if any item lacks stock nothing is changed.
+
+        Args:
+            lines: list of dicts {item_id, item_name, quantity}; repeated items are combined
+            department: Department receiving the stock
+            user_name: Who performed the distribution
+            notes: History note (defaults to "Distributed to <department>")
+
+        Raises:
+            InsufficientStockError: an item doesn't have enough stock (checked in SQL)
+            ValueError: a line has no item or a non-positive quantity
+        """
+        if not lines:
+            return True
+        inventory_history.ensure_table()
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            ItemModel.take_stock(cur, lines, department, user_name, notes)
+            conn.commit()
+            return True
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def take_stock(cur, lines: list, department: str, user_name: str, notes: str | None = None):
+        """distribute_stock() inside the caller's transaction.
+
+        The caller must have run inventory_history.ensure_table() before
+        opening the transaction, and must roll back if this raises.
+
+        A line may carry its own 'department' and 'notes' for the history
+        log (e.g. bulk approvals for several departments); stock is still
+        checked and taken once per item.
+        """
+        totals = {}
+        names = {}
+        # (item_id, department, notes) -> quantity, in first-seen order
+        logged = {}
+        for line in lines:
+            item_id = line.get('item_id')
+            quantity = int(line.get('quantity') or 0)
+            if not item_id or quantity <= 0:
+                raise ValueError(f"Invalid distribution line: {line}")
+            totals[item_id] = totals.get(item_id, 0) + quantity
+            names.setdefault(item_id, line.get('item_name'))
+            line_department = line.get('department') or department
+            line_notes = line.get('notes')
+            if line_notes is None:
+                line_notes = notes if notes is not None else f"Distributed to {line_department}"
+            key = (item_id, line_department, line_notes)
+            logged[key] = logged.get(key, 0) + quantity
+        if not totals:
+            return
+
+        param = _paramstyle()
+        ids = sorted(totals)
+        before = KpiSummaryModel.capture_many(cur, ids)
+
+        # The stock_qty >= qty guard makes the database reject overselling,
+        # even if another user took stock since the dialog was opened. The
+        # savepoint lets a shortage be reported against the stock as it was
+        # before this batch; it is never RELEASEd (on SQLite that would
+        # commit when it opened the transaction), the caller's COMMIT or
+        # ROLLBACK ends it.
+        cur.execute("SAVEPOINT take_stock")
+        cur.executemany(
+            f"UPDATE items SET stock_qty = stock_qty - {param} WHERE id = {param} AND stock_qty >= {param}",
+            [(totals[i], i, totals[i]) for i in ids]
+        )
+        if cur.rowcount != len(ids):
+            cur.execute("ROLLBACK TO SAVEPOINT take_stock")
+            placeholders = ", ".join([param] * len(ids))
+            cur.execute(f"SELECT id, name, stock_qty FROM items WHERE id IN ({placeholders})", tuple(ids))
+            found = {r[0]: (r[1], r[2]) for r in cur.fetchall()}
+            shortages = []
+            for i in ids:
+                name, available = found.get(i, (names.get(i), 0))
+                if (available or 0) < totals[i]:
+                    shortages.append({
+                        'item_id': i,
+                        'item_name': names.get(i) or name,
+                        'requested': totals[i],
+                        'available': available or 0
+                    })
+            raise InsufficientStockError(shortages)
+
+        missing = [i for i in ids if not names.get(i)]
+        if missing:
+            cur.execute(f"SELECT id, name FROM items WHERE id IN ({', '.join([param] * len(missing))})", tuple(missing))
+            names.update({r[0]: r[1] for r in cur.fetchall()})
+
+        now = datetime.now()
+        inventory_history.write_events(cur, [
+            inventory_history.make_event(names.get(i), MovementType.DISTRIBUTED, quantity, user_name,
+                                         line_notes, line_department, created_at=now)
+            for (i, line_department, line_notes), quantity in logged.items()
+        ])
+
+        after = KpiSummaryModel.capture_many(cur, ids)
+        KpiSummaryModel.apply_item_changes(cur, [(before.get(i), after.get(i)) for i in ids])
+        bump_table_versions(cur, 'items')
+
+    @staticmethod
+    def receive_stock(name: str, quantity: int, user_name: str, item_id: int | None = None,
+                      purchase_item_id: int | None = None, category: str | None = None,
+                      unit: str = '', unit_cost: float = 0, min_stock: int = 10,
+                      notes: str = 'Added from purchase order'):
+        """Put delivered stock into inventory in one transaction.
+
+        The stock change (or the new item), the purchase line's
+        qty_added_to_inventory / in_inventory, the inventory_history row and
+        the KPI counters commit together, so a failure part way never leaves
+        received stock on offer again.
+
+        Args:
+            name: Item name; used to find the item when item_id is not given
+                (ignoring case) and to create it if it doesn't exist
+            quantity: Units received
+            user_name: Who received the stock
+            item_id: Inventory item to add to, if already known
+            purchase_item_id: purchase_items line the stock came from (optional)
+            category, unit, unit_cost, min_stock: Details of a newly created item
+
+        Returns:
+            (item_id, created)
+
+        Raises:
+            ValueError: quantity is not positive, or item_id doesn't exist
+        """
+        quantity = int(quantity)
+        if quantity <= 0:
+            raise ValueError("Received quantity must be positive")
+
+        inventory_history.ensure_table()
+        param = _paramstyle()
+        with transaction() as conn:
+            cur = conn.cursor()
+            if not item_id:
+                existing = ItemModel.get_items_by_names([name], cur).get(name)
+                item_id = existing['id'] if existing else None
+
+            created = not item_id
+            if created:
+                cur.execute(
+                    f"INSERT INTO items (name, name_norm, category, unit, unit_cost, stock_qty, min_stock, created_at) VALUES ({param},{param},{param},{param},{param},{param},{param},{param})",
+                    (name, normalize_item_name(name), category, unit, unit_cost, quantity, min_stock, datetime.now())
+                )
+                item_id = cur.lastrowid
+                before = None
+            else:
+                before = KpiSummaryModel.capture(cur, item_id)
+                cur.execute(f"UPDATE items SET stock_qty = COALESCE(stock_qty,0) + {param} WHERE id = {param}", (quantity, item_id))
+                if cur.rowcount != 1:
+                    raise ValueError(f"Item {item_id} not found")
+
+            if purchase_item_id:
+                cur.execute(
+                    f"UPDATE purchase_items SET qty_added_to_inventory = COALESCE(qty_added_to_inventory, 0) + {param} WHERE id = {param}",
+                    (quantity, purchase_item_id)
+                )
+                # Fully received lines drop out of the receiving list
+                cur.execute(
+                    f"UPDATE purchase_items SET in_inventory = 1 WHERE id = {param} AND quantity <= COALESCE(qty_added_to_inventory, 0)",
+                    (purchase_item_id,)
+                )
+                bump_table_versions(cur, 'purchase_items')
+
+            inventory_history.write_events(cur, [
+                inventory_history.make_event(name, MovementType.STOCK_IN, quantity, user_name, notes, category)
+            ])
+            KpiSummaryModel.apply_item_change(cur, before, KpiSummaryModel.capture(cur, item_id))
+            bump_table_versions(cur, 'items')
+        return item_id, created
+
+    @staticmethod
+    def add_item(name: str, category: str, unit: str, unit_cost: float, stock_qty: int, min_stock: int):
+        """Add a new inventory item. Returns the new item id, or False on failure.
+
+        Raises:
+            DuplicateItemNameError: another item already has the name
+        """
+        conn = get_conn()
+        try:
+            param = _paramstyle()
+            cur = conn.cursor()
+            if ItemModel.get_items_by_names([name], cur):
+                raise DuplicateItemNameError(name)
+            sql = f"INSERT INTO items (name, name_norm, category, unit, unit_cost, stock_qty, min_stock, created_at) VALUES ({param},{param},{param},{param},{param},{param},{param},{param})"
+            cur = _exec(conn, sql, (name, normalize_item_name(name), category, unit, unit_cost, stock_qty, min_stock, datetime.now()))
+            item_id = cur.lastrowid
+            KpiSummaryModel.apply_item_change(cur, None, KpiSummaryModel.capture(cur, item_id))
+            bump_table_versions(cur, 'items')
+            conn.commit()
+            return item_id
+        except DuplicateItemNameError:
+            conn.rollback()
+            raise
         except Exception as e:
             try:
                 conn.rollback()
@@ -421,16 +757,50 @@ class ItemModel:
         finally:
             conn.close()
     
+    @staticmethod
+    def _name_key_for(cur, item_id, name):
+        """name_norm to store when item ``item_id`` is saved as ``name``.
+
+        Items that migration 11 found duplicating an older item's name keep
+        their NULL key while the name stays the same (ignoring case), so
+        their other fields can still be edited; renaming one gives it a key.
+
+        Raises:
+            DuplicateItemNameError: another item already has the name
+        """
+        key = normalize_item_name(name)
+        param = _paramstyle()
+        cur.execute(f"SELECT name, name_norm FROM items WHERE id = {param}", (item_id,))
+        row = cur.fetchone()
+        if row is not None and row[1] is None and normalize_item_name(row[0]) == key:
+            return None
+        cur.execute(f"SELECT 1 FROM items WHERE name_norm = {param} AND id <> {param}", (key, item_id))
+        if cur.fetchone():
+            raise DuplicateItemNameError(name)
+        return key
+
     @staticmethod
     def update_item(item_id: int, name: str, category: str, unit: str, unit_cost: float, stock_qty: int, min_stock: int):
-        """Update an existing inventory item."""
+        """Update an existing inventory item.
+
+        Raises:
+            DuplicateItemNameError: another item already has the new name
+        """
         conn = get_conn()
         try:
             param = _paramstyle()
-            sql = f"UPDATE items SET name = {param}, category = {param}, unit = {param}, unit_cost = {param}, stock_qty = {param}, min_stock = {param} WHERE id = {param}"
-            _exec(conn, sql, (name, category, unit, unit_cost, stock_qty, min_stock, item_id))
+            sql = f"UPDATE items SET name = {param}, name_norm = {param}, category = {param}, unit = {param}, unit_cost = {param}, stock_qty = {param}, min_stock = {param} WHERE id = {param}"
+            cur = conn.cursor()
+            name_key = ItemModel._name_key_for(cur, item_id, name)
+            before = KpiSummaryModel.capture(cur, item_id)
+            _exec(conn, sql, (name, name_key, category, unit, unit_cost, stock_qty, min_stock, item_id))
+            KpiSummaryModel.apply_item_change(cur, before, KpiSummaryModel.capture(cur, item_id))
+            bump_table_versions(cur, 'items')
             conn.commit()
             return True
+        except DuplicateItemNameError:
+            conn.rollback()
+            raise
         except Exception as e:
             try:
                 conn.rollback()
@@ -448,7 +818,11 @@ class ItemModel:
         try:
             param = _paramstyle()
             sql = f"DELETE FROM items WHERE id = {param}"
+            cur = conn.cursor()
+            before = KpiSummaryModel.capture(cur, item_id)
             _exec(conn, sql, (item_id,))
+            KpiSummaryModel.apply_item_change(cur, before, None)
+            bump_table_versions(cur, 'items')
             conn.commit()
             return True
         except Exception as e:
@@ -465,45 +839,54 @@ class ItemModel:
 class PurchaseModel:
     @staticmethod
     def create_purchase(supplier_id: int, items: list, expected_date: str | None, created_by: str | None = None):
-        """items is a list of dicts: {item_id, quantity, unit_price}
-        Returns new purchase id on success or None.
+        """Create a purchase order with all of its lines in one transaction.
+
+        items is a list of dicts: {item_id, quantity, unit_price}. Instead of
+        item_id a line may give {name, category, unit}; such items are looked
+        up by name in one pass and any that don't exist yet are created (with
+        no stock), like the order dialog's free-text lines.
+
+        Returns new purchase id on success; raises on failure (nothing is saved).
         """
+        # item_count column must exist before the transaction (DDL)
+        PurchaseModel.ensure_schema()
         conn = get_conn()
         try:
             cur = conn.cursor()
             param = _paramstyle()
-            # insert purchase with created_by
-            sql = f"INSERT INTO purchases (supplier_id, expected_date, total_amount, status, created_by, created_at) VALUES ({param}, {param}, {param}, {param}, {param}, {param})"
-            total = sum([(float(i.get('quantity',0)) * float(i.get('unit_price',0))) for i in items])
-            cur_ins = _exec(conn, sql, (supplier_id, expected_date or None, total, 'pending', created_by, datetime.now()))
-            # fetch last id from the cursor that executed the insert
-            try:
-                purchase_id = cur_ins.lastrowid
-            except Exception:
-                # fallback for sqlite or drivers without lastrowid on cursor
-                try:
-                    purchase_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
-                except Exception:
-                    purchase_id = None
 
-            # insert items - also store item_name for easy querying
+            # Resolve every line's item in set-based queries
+            by_name = ItemModel.resolve_items(cur, [it for it in items if not it.get('item_id')])
+            ids = [it.get('item_id') for it in items if it.get('item_id')]
+            names = ItemModel._names_by_id(cur, ids)
+
+            lines = []
             for it in items:
-                # Get item name from items table
-                item_name = None
                 item_id = it.get('item_id')
                 if item_id:
-                    try:
-                        name_cur = conn.cursor()
-                        name_cur.execute(f"SELECT name FROM items WHERE id = {param}", (item_id,))
-                        name_row = name_cur.fetchone()
-                        if name_row:
-                            item_name = name_row[0]
-                    except Exception:
-                        pass
-                
-                _exec(conn, f"INSERT INTO purchase_items (purchase_id, item_id, item_name, quantity, unit_price, total) VALUES ({param},{param},{param},{param},{param},{param})",
-                      (purchase_id, item_id, item_name, it.get('quantity'), it.get('unit_price'), float(it.get('quantity',0)) * float(it.get('unit_price',0))))
+                    item_name = names.get(item_id)
+                else:
+                    item_name = (it.get('name') or '').strip()
+                    item_id = by_name.get(item_name)
+                quantity = it.get('quantity')
+                unit_price = it.get('unit_price')
+                total = float(quantity or 0) * float(unit_price or 0)
+                lines.append((item_id, item_name, quantity, unit_price, total))
+
+            # insert purchase with created_by
+            sql = f"INSERT INTO purchases (supplier_id, expected_date, total_amount, status, created_by, created_at, item_count) VALUES ({param}, {param}, {param}, {param}, {param}, {param}, {param})"
+            total = sum(line[4] for line in lines)
+            cur_ins = _exec(conn, sql, (supplier_id, expected_date or None, total, 'pending', created_by, datetime.now(), len(lines)))
+            purchase_id = cur_ins.lastrowid
+
+            # insert items - also store item_name for easy querying
+            cur.executemany(
+                f"INSERT INTO purchase_items (purchase_id, item_id, item_name, quantity, unit_price, total) VALUES ({param},{param},{param},{param},{param},{param})",
+                [(purchase_id,) + line for line in lines]
+            )
+            bump_table_versions(cur, 'purchases', 'purchase_items')
             conn.commit()
+            PurchaseModel.invalidate_periods()
             return purchase_id
         except Exception as e:
             try:
@@ -520,11 +903,73 @@ class PurchaseModel:
             conn.close()
 
     @staticmethod
-    def list_purchases(status: str | None = None):
+    def ensure_schema():
+        """Prepare purchases for list_purchases() (once per process).
+
+        Creates the created_at/status indexes and the denormalized item_count
+        column, backfilling it for orders that don't have it yet.
+        """
+        global _purchase_schema_ready
+        if _purchase_schema_ready:
+            return
         conn = get_conn()
         try:
             cur = conn.cursor()
-            # Join with suppliers and count items
+            if DB_DRIVER == 'mariadb':
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_created_at ON purchases (created_at)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_status_created ON purchases (status, created_at)")
+                cur.execute("ALTER TABLE purchases ADD COLUMN IF NOT EXISTS item_count INT NULL")
+            else:
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_purchases_created_at ON purchases (created_at)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_purchases_status_created ON purchases (status, created_at)")
+                cur.execute("PRAGMA table_info(purchases)")
+                if 'item_count' not in [row[1] for row in cur.fetchall()]:
+                    cur.execute("ALTER TABLE purchases ADD COLUMN item_count INTEGER")
+            # Orders created before the column existed (NULL) get counted once
+            cur.execute("""
+                UPDATE purchases SET item_count = (
+                    SELECT COUNT(*) FROM purchase_items pi WHERE pi.purchase_id = purchases.id
+                )
+                WHERE item_count IS NULL
+            """)
+            conn.commit()
+            _purchase_schema_ready = True
+        except Exception as e:
+            print(f"[PURCHASE SCHEMA] {e}")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def list_purchases(status: str | None = None, start=None, end=None, supplier_id: int | None = None):
+        """List purchase orders, newest first.
+
+        Args:
+            status: Only orders with this status
+            start: Only orders created at or after this date/datetime
+            end: Only orders created before this date/datetime (exclusive)
+            supplier_id: Only orders from this supplier
+        """
+        PurchaseModel.ensure_schema()
+        param = _paramstyle()
+        where = []
+        params = []
+        if status:
+            where.append(f"p.status = {param}")
+            params.append(status)
+        if start is not None:
+            where.append(f"p.created_at >= {param}")
+            params.append(start)
+        if end is not None:
+            where.append(f"p.created_at < {param}")
+            params.append(end)
+        if supplier_id is not None:
+            where.append(f"p.supplier_id = {param}")
+            params.append(supplier_id)
+
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            # item_count is maintained on purchases, so no join/aggregate over purchase_items
             sql = """
                 SELECT 
                     p.id, 
@@ -536,20 +981,14 @@ class PurchaseModel:
                     p.created_by,
                     s.name as supplier_name,
                     s.contact_name as supplier_contact,
-                    COUNT(pi.id) as item_count
+                    COALESCE(p.item_count, 0) as items_count
                 FROM purchases p
                 LEFT JOIN suppliers s ON p.supplier_id = s.id
-                LEFT JOIN purchase_items pi ON p.id = pi.purchase_id
             """
-            if status:
-                sql += " WHERE p.status = {} ".format(_paramstyle())
-                sql += " GROUP BY p.id, p.supplier_id, p.expected_date, p.total_amount, p.status, p.created_at, p.created_by, s.name, s.contact_name"
-                sql += " ORDER BY p.created_at DESC"
-                cur.execute(sql, (status,))
-            else:
-                sql += " GROUP BY p.id, p.supplier_id, p.expected_date, p.total_amount, p.status, p.created_at, p.created_by, s.name, s.contact_name"
-                sql += " ORDER BY p.created_at DESC"
-                cur.execute(sql)
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            sql += " ORDER BY p.created_at DESC"
+            cur.execute(sql, params)
             rows = cur.fetchall()
             result = []
             for r in rows:
@@ -566,12 +1005,57 @@ class PurchaseModel:
                         'created_by': r[6],
                         'supplier_name': r[7],
                         'supplier_contact': r[8],
-                        'items_count': r[9]  # Changed from item_count to items_count
+                        'items_count': r[9]
                     })
             return result
         finally:
             conn.close()
-    
+
+    # Cached {year: [months]} of existing purchases for the history filters
+    _periods = None
+    _periods_loaded_at = 0.0
+    _periods_lock = threading.Lock()
+
+    @classmethod
+    def invalidate_periods(cls):
+        """Drop the cached purchase periods so the next call reloads them."""
+        with cls._periods_lock:
+            cls._periods = None
+
+    @classmethod
+    def list_purchase_periods(cls):
+        """Return {year: [month, ...]} for which purchases exist, newest year first.
+
+        Computed with one DISTINCT query over the created_at index and cached
+        for PERIODS_TTL seconds (or until invalidate_periods()).
+        """
+        with cls._periods_lock:
+            if cls._periods is not None and time.monotonic() - cls._periods_loaded_at < PERIODS_TTL:
+                return cls._periods
+
+            PurchaseModel.ensure_schema()
+            if DB_DRIVER == 'mariadb':
+                sql = "SELECT DISTINCT YEAR(created_at), MONTH(created_at) FROM purchases WHERE created_at IS NOT NULL"
+            else:
+                sql = ("SELECT DISTINCT CAST(strftime('%Y', created_at) AS INTEGER), "
+                       "CAST(strftime('%m', created_at) AS INTEGER) FROM purchases WHERE created_at IS NOT NULL")
+            conn = get_conn()
+            try:
+                cur = conn.cursor()
+                cur.execute(sql)
+                rows = cur.fetchall()
+            finally:
+                conn.close()
+
+            periods = {}
+            for year, month in (tuple(r) for r in rows):
+                if year is None or month is None:
+                    continue
+                periods.setdefault(int(year), []).append(int(month))
+            cls._periods = {year: sorted(periods[year]) for year in sorted(periods, reverse=True)}
+            cls._periods_loaded_at = time.monotonic()
+            return cls._periods
+
     @staticmethod
     def update_order_status(order_id: int, new_status: str):
         """Update the status of a purchase order."""
@@ -579,7 +1063,8 @@ class PurchaseModel:
         try:
             param = _paramstyle()
             sql = f"UPDATE purchases SET status = {param} WHERE id = {param}"
-            _exec(conn, sql, (new_status, order_id))
+            cur = _exec(conn, sql, (new_status, order_id))
+            bump_table_versions(cur, 'purchases')
             conn.commit()
             return True
         except Exception as e:
@@ -594,13 +1079,28 @@ class PurchaseModel:
 
 
 class DamageModel:
+    @staticmethod
+    def _journal_damage(cur, item_id, quantity, reason, created_by):
+        """Record a damage movement in inventory_history (caller's transaction)."""
+        cur.execute(f"SELECT name, category FROM items WHERE id = {_paramstyle()}", (item_id,))
+        row = cur.fetchone()
+        if not row:
+            return
+        inventory_history.write_events(cur, [
+            inventory_history.make_event(row[0], MovementType.DAMAGE, quantity, created_by, reason, row[1])
+        ])
+
     @staticmethod
     def log_damage(item_id: int, quantity: int, reason: str, created_by: str | None = None):
+        inventory_history.ensure_table()
         conn = get_conn()
         try:
             param = _paramstyle()
-            _exec(conn, f"INSERT INTO damages (item_id, quantity, reason, created_by, created_at) VALUES ({param},{param},{param},{param},{param})",
+            cur = _exec(conn, f"INSERT INTO damages (item_id, quantity, reason, created_by, created_at) VALUES ({param},{param},{param},{param},{param})",
                   (item_id, quantity, reason, created_by, datetime.now()))
+            KpiSummaryModel.apply_damage(cur, item_id, quantity)
+            DamageModel._journal_damage(cur, item_id, quantity, reason, created_by)
+            bump_table_versions(cur, 'damages')
             conn.commit()
             return True
         except Exception:
@@ -615,6 +1115,7 @@ class DamageModel:
     @staticmethod
     def add_damage_report(purchase_id: int, category: str, reason: str, created_by: str | None = None):
         """Add a new damage report."""
+        inventory_history.ensure_table()
         conn = get_conn()
         try:
             param = _paramstyle()
@@ -646,6 +1147,9 @@ class DamageModel:
             
             sql = f"INSERT INTO damages (purchase_id, category, reason, created_by, created_at, item_id, quantity) VALUES ({param},{param},{param},{param},{param},{param},{param})"
             _exec(conn, sql, (purchase_id, category, reason, created_by, datetime.now(), item_id, 1))
+            KpiSummaryModel.apply_damage(cur, item_id, 1)
+            DamageModel._journal_damage(cur, item_id, 1, reason, created_by)
+            bump_table_versions(cur, 'damages')
             conn.commit()
             print(f"[ADD_DAMAGE_REPORT] Successfully added damage report for purchase {purchase_id}")
             return True
@@ -694,30 +1198,78 @@ class MessageModel:
     def add_message(sender_id: int, recipient_id: int, category: str, title: str, body: str):
         conn = get_conn()
         try:
-            _exec(conn, f"INSERT INTO messages (sender_id, recipient_id, category, title, body, created_at) VALUES ({_paramstyle()},{_paramstyle()},{_paramstyle()},{_paramstyle()},{_paramstyle()},{_paramstyle()})",
-                  (sender_id, recipient_id, category, title, body, datetime.now()))
+            cur = _exec(conn, f"INSERT INTO messages (sender_id, recipient_id, category, title, body, created_at) VALUES ({_paramstyle()},{_paramstyle()},{_paramstyle()},{_paramstyle()},{_paramstyle()},{_paramstyle()})",
+                        (sender_id, recipient_id, category, title, body, datetime.now()))
+            bump_table_versions(cur, 'messages')
             conn.commit()
             return True
         finally:
             conn.close()
 
     @staticmethod
-    def list_messages(user_id: int, limit: int = 50):
-        """List messages for a specific user (both sent and received)."""
+    def ensure_indexes():
+        """Create the indexes the inbox queries rely on (once per process)."""
+        global _message_indexes_ready
+        if _message_indexes_ready:
+            return
         conn = get_conn()
         try:
             cur = conn.cursor()
-            # Get messages where user is either sender or recipient
-            cur.execute("""
+            if DB_DRIVER == 'mariadb':
+                # idx_sender / idx_recipient come from hms_setup.sql
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_recipient_read ON messages (recipient_id, is_read)")
+            else:
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_messages_sender ON messages (sender_id)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_messages_recipient ON messages (recipient_id)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_messages_recipient_read ON messages (recipient_id, is_read)")
+            conn.commit()
+            _message_indexes_ready = True
+        except Exception as e:
+            print(f"[MESSAGES] Could not create message indexes: {e}")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def list_messages(user_id: int, limit: int = 50, after_id: int | None = None):
+        """List messages for a specific user (both sent and received), newest first.
+
+        Args:
+            user_id: The user whose inbox and sent messages to list
+            limit: Maximum number of messages returned
+            after_id: Only messages with a higher id (newer) than this, for
+                merging into an already loaded list
+
+        Received and sent messages are two separate queries on
+        idx_recipient / idx_sender joined with UNION ALL; an OR over both
+        columns can't use either index.
+        """
+        MessageModel.ensure_indexes()
+        param = _paramstyle()
+        after_id = after_id or 0
+        limit = int(limit)
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            cur.execute(f"""
                 SELECT m.id, m.sender_id, m.recipient_id, m.category, m.title, m.body, m.is_read, m.created_at,
                        sender.full_name as sender_name, sender.role as sender_role,
                        recipient.full_name as recipient_name, recipient.role as recipient_role
-                FROM messages m
+                FROM (
+                    SELECT id FROM (
+                        SELECT id FROM messages WHERE recipient_id = {param} AND id > {param}
+                        ORDER BY id DESC LIMIT {limit}
+                    ) received
+                    UNION ALL
+                    SELECT id FROM (
+                        SELECT id FROM messages WHERE sender_id = {param} AND recipient_id <> {param} AND id > {param}
+                        ORDER BY id DESC LIMIT {limit}
+                    ) sent
+                ) ids
+                JOIN messages m ON m.id = ids.id
                 LEFT JOIN users sender ON m.sender_id = sender.id
                 LEFT JOIN users recipient ON m.recipient_id = recipient.id
-                WHERE m.recipient_id = {} OR m.sender_id = {}
-                ORDER BY m.created_at DESC LIMIT {}
-            """.format(_paramstyle(), _paramstyle(), limit), (user_id, user_id))
+                ORDER BY m.id DESC LIMIT {limit}
+            """, (user_id, after_id, user_id, user_id, after_id))
             rows = cur.fetchall()
             result = []
             for r in rows:
@@ -741,13 +1293,73 @@ class MessageModel:
             return result
         finally:
             conn.close()
+
+    @staticmethod
+    def get_unread_count(user_id: int):
+        """Number of unread messages received by a user (uses idx_recipient_read)."""
+        MessageModel.ensure_indexes()
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            cur.execute(f"SELECT COUNT(*) FROM messages WHERE recipient_id = {_paramstyle()} AND is_read = 0",
+                        (user_id,))
+            row = cur.fetchone()
+            return int(row[0] or 0) if row else 0
+        finally:
+            conn.close()
+
+    @staticmethod
+    def list_message_states(user_id: int, first_id: int, last_id: int):
+        """Read flags of a user's messages with ids in [first_id, last_id].
+
+        Lets an already loaded list drop messages deleted since (by either
+        side) and redraw ones the recipient has read.
+
+        Returns:
+            {message_id: is_read}
+        """
+        MessageModel.ensure_indexes()
+        param = _paramstyle()
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            cur.execute(f"""
+                SELECT id, is_read FROM messages
+                WHERE recipient_id = {param} AND id BETWEEN {param} AND {param}
+                UNION ALL
+                SELECT id, is_read FROM messages
+                WHERE sender_id = {param} AND recipient_id <> {param} AND id BETWEEN {param} AND {param}
+            """, (user_id, first_id, last_id, user_id, user_id, first_id, last_id))
+            return {r[0]: r[1] for r in cur.fetchall()}
+        finally:
+            conn.close()
+
+    @staticmethod
+    def sync_inbox(user_id: int, after_id: int | None = None, limit: int = 200, first_id: int | None = None):
+        """Messages newer than ``after_id`` (all recent ones when None) plus the unread count.
+
+        When ``first_id`` is given too (the oldest message already loaded),
+        'states' holds the read flags of the loaded messages that still exist.
+
+        Returns:
+            {'messages': [...] newest first, 'unread': int, 'states': {id: is_read} or None}
+        """
+        states = None
+        if after_id is not None and first_id is not None:
+            states = MessageModel.list_message_states(user_id, first_id, after_id)
+        return {
+            'messages': MessageModel.list_messages(user_id, limit, after_id),
+            'unread': MessageModel.get_unread_count(user_id),
+            'states': states,
+        }
     
     @staticmethod
     def mark_as_read(message_id: int):
         """Mark a message as read."""
         conn = get_conn()
         try:
-            _exec(conn, f"UPDATE messages SET is_read = 1 WHERE id = {_paramstyle()}", (message_id,))
+            cur = _exec(conn, f"UPDATE messages SET is_read = 1 WHERE id = {_paramstyle()}", (message_id,))
+            bump_table_versions(cur, 'messages')
             conn.commit()
             return True
         finally:
@@ -758,7 +1370,8 @@ class MessageModel:
         """Delete a message."""
         conn = get_conn()
         try:
-            _exec(conn, f"DELETE FROM messages WHERE id = {_paramstyle()}", (message_id,))
+            cur = _exec(conn, f"DELETE FROM messages WHERE id = {_paramstyle()}", (message_id,))
+            bump_table_versions(cur, 'messages')
             conn.commit()
             return True
         finally:
@@ -853,89 +1466,84 @@ class DashboardModel:
             conn.close()
     
     @staticmethod
-    def get_all_kpis():
-        """Get all dashboard KPIs in one call."""
-        return {
-            'inventory_value': DashboardModel.get_inventory_value(),
-            'wastages': DashboardModel.get_total_wastages(),
-            'inventory_items': DashboardModel.get_inventory_items_count(),
-            'low_stocks': DashboardModel.get_low_stock_count()
-        }
-    
-    @staticmethod
-    def get_department_kpis(department=None):
-        """Get KPIs filtered by department.
-        
+    def get_kpi_snapshot(department=None):
+        """Get every dashboard KPI in a single round trip.
+
+        Reads the materialized kpi_summary counters (a primary-key lookup) and
+        only aggregates items/damages directly if the summary is unavailable.
+
         Args:
-            department: Department name to filter by, or None for all departments
-        
+            department: Department (item category) to scope the KPIs to, or None for all
+
         Returns:
-            dict with inventory_value, inventory_items, and wastages
+            dict with inventory_value (float), inventory_items, low_stocks and wastages (int)
         """
+        kpis = KpiSummaryModel.get_kpis(department)
+        if kpis is not None:
+            return kpis
+
         conn = get_conn()
         try:
             cur = conn.cursor()
-            
-            # Build WHERE clause for department filtering
-            where_clause = ""
-            params = []
-            if department:
-                where_clause = f" WHERE category = {_paramstyle()}"
-                params = [department]
-            
-            # Get inventory value for department
-            sql = f"SELECT SUM(unit_cost * stock_qty) as total_value FROM items{where_clause}"
-            cur.execute(sql, tuple(params) if params else ())
-            row = cur.fetchone()
-            try:
-                inventory_value = float(row['total_value'] if row and row['total_value'] is not None else 0)
-            except (TypeError, KeyError):
-                inventory_value = float(row[0] if row and row[0] is not None else 0)
-            
-            # Get inventory items count for department
-            sql = f"SELECT COUNT(*) as item_count FROM items{where_clause}"
-            cur.execute(sql, tuple(params) if params else ())
-            row = cur.fetchone()
-            try:
-                inventory_items = int(row['item_count'] if row else 0)
-            except (TypeError, KeyError):
-                inventory_items = int(row[0] if row else 0)
-            
-            # Get wastages for department (join damages with items)
+            param = _paramstyle()
+
             if department:
                 sql = f"""
-                    SELECT SUM(d.quantity) as total_wastages 
-                    FROM damages d
-                    JOIN items i ON d.item_id = i.id
-                    WHERE i.category = {_paramstyle()}
+                    SELECT
+                        COALESCE(SUM(i.unit_cost * i.stock_qty), 0) AS inventory_value,
+                        COUNT(*) AS inventory_items,
+                        COALESCE(SUM(CASE WHEN i.stock_qty <= i.min_stock THEN 1 ELSE 0 END), 0) AS low_stocks,
+                        (SELECT COALESCE(SUM(d.quantity), 0)
+                           FROM damages d
+                           JOIN items di ON d.item_id = di.id
+                          WHERE di.category = {param}) AS wastages
+                    FROM items i
+                    WHERE i.category = {param}
                 """
-                cur.execute(sql, (department,))
+                cur.execute(sql, (department, department))
             else:
-                sql = "SELECT SUM(quantity) as total_wastages FROM damages"
-                cur.execute(sql)
+                cur.execute("""
+                    SELECT
+                        COALESCE(SUM(i.unit_cost * i.stock_qty), 0) AS inventory_value,
+                        COUNT(*) AS inventory_items,
+                        COALESCE(SUM(CASE WHEN i.stock_qty <= i.min_stock THEN 1 ELSE 0 END), 0) AS low_stocks,
+                        (SELECT COALESCE(SUM(d.quantity), 0) FROM damages d) AS wastages
+                    FROM items i
+                """)
             row = cur.fetchone()
-            try:
-                wastages = int(row['total_wastages'] if row and row['total_wastages'] is not None else 0)
-            except (TypeError, KeyError):
-                wastages = int(row[0] if row and row[0] is not None else 0)
-            
-            # Format inventory value as currency
-            formatted_value = f"₱{inventory_value:,.2f}"
-            
             return {
-                'inventory_value': formatted_value,
-                'inventory_items': inventory_items,
-                'wastages': wastages
+                'inventory_value': float(row[0] or 0),
+                'inventory_items': int(row[1] or 0),
+                'low_stocks': int(row[2] or 0),
+                'wastages': int(row[3] or 0)
             }
         except Exception as e:
-            print(f"[DASHBOARD] Error getting department KPIs: {e}")
+            print(f"[DASHBOARD] Error getting KPI snapshot: {e}")
             return {
-                'inventory_value': '₱0.00',
+                'inventory_value': 0.0,
                 'inventory_items': 0,
+                'low_stocks': 0,
                 'wastages': 0
             }
         finally:
             conn.close()
+
+    @staticmethod
+    def get_all_kpis():
+        """Get all dashboard KPIs in one call."""
+        return DashboardModel.get_kpi_snapshot()
+    
+    @staticmethod
+    def get_department_kpis(department=None):
+        """Get KPIs filtered by department.
+        
+        Args:
+            department: Department name to filter by, or None for all departments
+        
+        Returns:
+            dict with inventory_value, inventory_items, low_stocks and wastages as numbers
+        """
+        return DashboardModel.get_kpi_snapshot(department)
     
     @staticmethod
     def get_department_top_items(department=None, limit=4):
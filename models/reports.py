@@ -0,0 +1,449 @@
+"""Report engine for the REPORTS page.
+
+Every report is computed by the database in one query (GROUP BY or an
+indexed filter) and returned as a ReportResult. The VIEW REPORTS preview and
+the CSV/Excel/PDF export render the same result, so a report is never
+aggregated twice or in Python.
+
+    result = ReportModel.build("Stock Summary", department="Kitchen")
+    result.display_rows(limit=20)    # formatted strings for the preview
+    result.to_report_data()          # legacy dict for exporters/ViewReportDialog
+
+ReportModel.get() serves results from an in-process LRU cache. An entry is
+reused until one of the tables its report reads is written (per-table
+counters in table_versions, bumped by the model write paths), or it is
+older than CACHE_TTL.
+"""
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from .database import get_conn, DB_DRIVER, _paramstyle, get_table_versions
+from .purchase import ItemModel, PurchaseModel
+
+REPORT_TYPES = [
+    "Stock Summary",
+    "Usage Data",
+    "Purchasing Trends",
+    "Low Stock Alert",
+    "Damage Reports",
+    "Supplier Performance"
+]
+
+# Reports whose rows depend on the viewer's department (item category)
+DEPARTMENT_SCOPED = {"Stock Summary", "Low Stock Alert"}
+
+# Purchase statuses counted as fulfilled by Supplier Performance
+COMPLETED_STATUSES = ('completed', 'received', 'delivered')
+
+# Tables each report reads; a write to any of them invalidates its cached result
+REPORT_TABLES = {
+    "Stock Summary": ('items',),
+    "Usage Data": ('purchases', 'purchase_items', 'suppliers'),
+    "Purchasing Trends": ('purchases',),
+    "Low Stock Alert": ('items',),
+    "Damage Reports": ('damages', 'items'),
+    "Supplier Performance": ('suppliers', 'purchases'),
+}
+
+USAGE_DAYS = 30
+TREND_MONTHS = 12
+
+# Report cache bounds
+CACHE_MAX_ENTRIES = 32
+CACHE_TTL = 600
+
+
+def _format(value, kind):
+    """Render one cell for display; ``kind`` is a ReportResult column format."""
+    if value is None:
+        return 'N/A' if kind in ('text', 'date') else _format(0, kind)
+    if kind == 'money':
+        return f"₱{float(value):,.2f}"
+    if kind == 'percent':
+        return f"{float(value):.1f}%"
+    if kind == 'int':
+        return str(int(value))
+    if kind == 'order':
+        return f"#{int(value):04d}"
+    if kind == 'date':
+        return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else str(value)[:10]
+    return str(value)
+
+
+class ReportResult:
+    """One computed report: typed rows plus how to present them.
+
+    Attributes:
+        report_type: One of REPORT_TYPES
+        title: Heading used by dialogs and exports
+        date_range: Human readable description of the covered period
+        headers: Column headers
+        formats: Per-column format ('text', 'int', 'order', 'money', 'percent', 'date')
+        rows: List of row tuples with raw (numeric/date) values
+        summary: Ordered {label: display value} totals
+        preview_limit: Rows shown in the preview table (None = all)
+        generated_at: When the result was computed
+    """
+
+    def __init__(self, report_type, title, date_range, headers, formats, rows, summary=None, preview_limit=None):
+        self.report_type = report_type
+        self.title = title
+        self.date_range = date_range
+        self.headers = headers
+        self.formats = formats
+        self.rows = rows
+        self.summary = summary or {}
+        self.preview_limit = preview_limit
+        self.generated_at = datetime.now()
+
+    def iter_rows(self, formatted=True):
+        """Yield rows one at a time, as display strings or typed values.
+
+        Typed values keep numbers/dates for spreadsheets, with money rounded
+        to cents. Used by the streaming exporters.
+        """
+        for row in self.rows:
+            if formatted:
+                yield [_format(value, kind) for value, kind in zip(row, self.formats)]
+                continue
+            values = []
+            for value, kind in zip(row, self.formats):
+                if kind == 'money' and value is not None:
+                    value = round(float(value), 2)
+                elif kind == 'date' and value is not None and not hasattr(value, 'strftime'):
+                    value = str(value)[:10]
+                values.append(value)
+            yield values
+
+    def display_rows(self, limit=None):
+        """Rows formatted as strings, optionally only the first ``limit``."""
+        rows = self.iter_rows(formatted=True)
+        return list(rows if limit is None else itertools.islice(rows, limit))
+
+    def plain_rows(self):
+        """Rows with typed values kept (money rounded to cents) for spreadsheets."""
+        return list(self.iter_rows(formatted=False))
+
+    def to_report_data(self, formatted=True):
+        """The dict shape used by ViewReportDialog and the export_* methods."""
+        return {
+            'title': self.title,
+            'date_range': self.date_range,
+            'generated_at': self.generated_at.strftime('%Y-%m-%d %H:%M'),
+            'summary': dict(self.summary),
+            'headers': list(self.headers),
+            'table_data': self.display_rows() if formatted else self.plain_rows()
+        }
+
+
+def _fetch(sql, params=()):
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(sql, tuple(params))
+        return [tuple(r) for r in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def _month_sql(column):
+    if DB_DRIVER == 'mariadb':
+        return f"DATE_FORMAT({column}, '%Y-%m')"
+    return f"strftime('%Y-%m', {column})"
+
+
+class ReportCache:
+    """Bounded LRU of ReportResults tagged with the table versions they were built from."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (versions, stored_at, result)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, versions):
+        """Return the cached result for ``key`` if it was built from ``versions``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_versions, stored_at, result = entry
+                if stored_versions == versions and time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self._entries[key]
+                self.invalidations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, versions, result):
+        with self._lock:
+            self._entries[key] = (versions, time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters for diagnostics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+
+_cache = ReportCache()
+
+
+class ReportModel:
+    @staticmethod
+    def get(report_type, department=None, **params):
+        """Return ``report_type`` from the cache, building it if needed.
+
+        The cache key is the report type, the department (only for
+        department scoped reports, so everyone else shares one entry) and
+        any extra builder parameters.
+        """
+        if report_type not in REPORT_TABLES:
+            raise ValueError(f"Unknown report type: {report_type}")
+        scope = department.casefold() if department and report_type in DEPARTMENT_SCOPED else None
+        key = (report_type, scope, tuple(sorted(params.items())))
+
+        # Read the versions before building: a write that lands mid-build
+        # leaves the entry stale on the next lookup instead of hiding it
+        versions = get_table_versions(REPORT_TABLES[report_type])
+        result = _cache.get(key, versions)
+        if result is None:
+            result = ReportModel.build(report_type, department, **params)
+            _cache.put(key, versions, result)
+        return result
+
+    @staticmethod
+    def cache_stats():
+        return _cache.stats()
+
+    @staticmethod
+    def clear_cache():
+        _cache.clear()
+
+    @staticmethod
+    def build(report_type, department=None, **params):
+        """Compute ``report_type`` (one of REPORT_TYPES) without the cache.
+
+        Args:
+            department: Restrict item based reports to this department
+            params: Extra builder arguments (e.g. days=, months=)
+
+        Raises:
+            ValueError: unknown report type
+        """
+        builders = {
+            "Stock Summary": ReportModel.stock_summary,
+            "Usage Data": ReportModel.usage_data,
+            "Purchasing Trends": ReportModel.purchasing_trends,
+            "Low Stock Alert": ReportModel.low_stock,
+            "Damage Reports": ReportModel.damage_reports,
+            "Supplier Performance": ReportModel.supplier_performance,
+        }
+        if report_type not in builders:
+            raise ValueError(f"Unknown report type: {report_type}")
+        if report_type in DEPARTMENT_SCOPED:
+            params['department'] = department
+        return builders[report_type](**params)
+
+    @staticmethod
+    def stock_summary(department=None):
+        """Items, quantity and value per category."""
+        ItemModel.ensure_indexes()
+        where, params = ItemModel._item_filters(department=department)
+        rows = _fetch(f"""
+            SELECT COALESCE(category, 'Uncategorized') AS cat,
+                   COUNT(*),
+                   COALESCE(SUM(stock_qty), 0),
+                   COALESCE(SUM(stock_qty * unit_cost), 0),
+                   SUM(CASE WHEN stock_qty <= min_stock THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN stock_qty = 0 THEN 1 ELSE 0 END)
+            FROM items{where}
+            GROUP BY COALESCE(category, 'Uncategorized')
+            ORDER BY cat
+        """, params)
+
+        total_value = sum(float(r[3] or 0) for r in rows)
+        summary = {
+            'Total Items': sum(int(r[1]) for r in rows),
+            'Total Stock Value': f'₱{total_value:,.2f}',
+            'Low Stock Items': sum(int(r[4] or 0) for r in rows),
+            'Out of Stock Items': sum(int(r[5] or 0) for r in rows),
+            'Categories': len(rows)
+        }
+        return ReportResult(
+            "Stock Summary", 'STOCK SUMMARY REPORT',
+            f'Current Stock Levels - {department}' if department else 'Current Stock Levels',
+            ['CATEGORY', 'ITEMS COUNT', 'TOTAL QUANTITY', 'TOTAL VALUE'],
+            ['text', 'int', 'int', 'money'],
+            [r[:4] for r in rows], summary
+        )
+
+    @staticmethod
+    def usage_data(days=USAGE_DAYS):
+        """Purchase orders placed in the last ``days`` days, newest first."""
+        purchases = PurchaseModel.list_purchases(start=datetime.now() - timedelta(days=days))
+        rows = [
+            (p.get('id'), p.get('created_at'), p.get('supplier_name'), p.get('items_count') or 0,
+             p.get('total_amount') or 0, str(p.get('status') or 'pending').upper())
+            for p in purchases
+        ]
+        total = sum(float(r[4]) for r in rows)
+        summary = {
+            'Purchase Orders': len(rows),
+            'Total Amount': f'₱{total:,.2f}',
+            'Items Ordered': sum(int(r[3]) for r in rows)
+        }
+        return ReportResult(
+            "Usage Data", 'USAGE DATA REPORT', f'Last {days} Days',
+            ['ORDER ID', 'DATE', 'SUPPLIER', 'ITEMS', 'TOTAL AMOUNT', 'STATUS'],
+            ['order', 'date', 'text', 'int', 'money', 'text'],
+            rows, summary, preview_limit=20
+        )
+
+    @staticmethod
+    def purchasing_trends(months=TREND_MONTHS):
+        """Order count, spend and average order value for the latest ``months`` months."""
+        PurchaseModel.ensure_schema()
+        month = _month_sql('created_at')
+        rows = _fetch(f"""
+            SELECT {month} AS month, COUNT(*), COALESCE(SUM(total_amount), 0)
+            FROM purchases
+            WHERE created_at IS NOT NULL
+            GROUP BY {month}
+            ORDER BY month DESC
+            LIMIT {int(months)}
+        """)
+        rows = [(r[0], int(r[1]), float(r[2] or 0), float(r[2] or 0) / r[1] if r[1] else 0) for r in rows]
+
+        orders = sum(r[1] for r in rows)
+        total = sum(r[2] for r in rows)
+        summary = {
+            'Total Purchase Orders': orders,
+            'Total Amount': f'₱{total:,.2f}',
+            'Average Order Value': f'₱{(total / orders if orders else 0):,.2f}'
+        }
+        return ReportResult(
+            "Purchasing Trends", 'PURCHASING TRENDS REPORT', f'Last {months} Months',
+            ['MONTH', 'ORDERS COUNT', 'TOTAL AMOUNT', 'AVG ORDER VALUE'],
+            ['text', 'int', 'money', 'money'],
+            rows, summary
+        )
+
+    @staticmethod
+    def low_stock(department=None):
+        """Items at or below their minimum stock (uses the stock_qty/min_stock index)."""
+        ItemModel.ensure_indexes()
+        where, params = ItemModel._item_filters(department=department, low_stock_only=True)
+        rows = _fetch(f"""
+            SELECT name, COALESCE(category, 'General'), stock_qty, min_stock
+            FROM items{where}
+            ORDER BY stock_qty, name
+        """, params)
+
+        result_rows = []
+        for name, category, stock, min_stock in rows:
+            stock = int(stock or 0)
+            min_stock = int(min_stock or 0)
+            if stock == 0:
+                status = "OUT OF STOCK"
+            elif stock <= min_stock * 0.5:
+                status = "CRITICAL"
+            else:
+                status = "LOW"
+            result_rows.append((name, category, stock, min_stock, max(0, min_stock - stock), status))
+
+        summary = {
+            'Low Stock Items': len(result_rows),
+            'Out of Stock Items': sum(1 for r in result_rows if r[5] == "OUT OF STOCK"),
+            'Total Shortage': sum(r[4] for r in result_rows)
+        }
+        return ReportResult(
+            "Low Stock Alert", 'LOW STOCK ALERT REPORT',
+            f'Current Stock Levels - {department}' if department else 'Current Stock Levels',
+            ['ITEM NAME', 'CATEGORY', 'CURRENT STOCK', 'MIN STOCK', 'SHORTAGE', 'STATUS'],
+            ['text', 'text', 'int', 'int', 'int', 'text'],
+            result_rows, summary
+        )
+
+    @staticmethod
+    def damage_reports():
+        """Damage reports with item names, newest first."""
+        rows = _fetch("""
+            SELECT d.created_at, COALESCE(i.name, 'Unknown item'), d.quantity,
+                   COALESCE(d.category, i.category), d.reason, d.created_by
+            FROM damages d
+            LEFT JOIN items i ON i.id = d.item_id
+            ORDER BY d.created_at DESC
+        """)
+        summary = {
+            'Total Damage Reports': len(rows),
+            'Total Quantity Damaged': sum(int(r[2] or 0) for r in rows)
+        }
+        return ReportResult(
+            "Damage Reports", 'DAMAGE REPORTS', 'All Damage Reports',
+            ['DATE', 'ITEM', 'QUANTITY', 'CATEGORY', 'REASON', 'REPORTED BY'],
+            ['date', 'text', 'int', 'text', 'text', 'text'],
+            rows, summary, preview_limit=20
+        )
+
+    @staticmethod
+    def supplier_performance():
+        """Orders, spend and completion rate per supplier."""
+        param = _paramstyle()
+        done = ','.join([param] * len(COMPLETED_STATUSES))
+        rows = _fetch(f"""
+            SELECT s.name, s.contact_name,
+                   COUNT(p.id),
+                   COALESCE(SUM(p.total_amount), 0),
+                   SUM(CASE WHEN LOWER(p.status) IN ({done}) THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN LOWER(p.status) = 'pending' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN LOWER(p.status) = 'cancelled' THEN 1 ELSE 0 END)
+            FROM suppliers s
+            LEFT JOIN purchases p ON p.supplier_id = s.id
+            GROUP BY s.id, s.name, s.contact_name
+            ORDER BY s.name
+        """, COMPLETED_STATUSES)
+
+        result_rows = []
+        for name, contact, orders, amount, completed, pending, cancelled in rows:
+            orders = int(orders or 0)
+            completed = int(completed or 0)
+            rate = completed / orders * 100 if orders else 0
+            result_rows.append((name, contact, orders, float(amount or 0), completed,
+                                int(pending or 0), int(cancelled or 0), rate))
+
+        summary = {
+            'Suppliers': len(result_rows),
+            'Total Orders': sum(r[2] for r in result_rows),
+            'Total Amount': f'₱{sum(r[3] for r in result_rows):,.2f}'
+        }
+        return ReportResult(
+            "Supplier Performance", 'SUPPLIER PERFORMANCE REPORT', 'All Purchase Orders',
+            ['SUPPLIER', 'CONTACT PERSON', 'TOTAL ORDERS', 'TOTAL AMOUNT', 'COMPLETED',
+             'PENDING', 'CANCELLED', 'COMPLETION RATE'],
+            ['text', 'text', 'int', 'money', 'int', 'int', 'int', 'percent'],
+            result_rows, summary
+        )
@@ -1,36 +1,29 @@
 """Request model for stock requests."""
 
-from models.database import get_conn, _paramstyle
+from models.database import get_conn, transaction, _paramstyle, bump_table_versions, DB_DRIVER
 from datetime import datetime
 
+_request_indexes_ready = False
+
+# Bulk approval fill policies, for when the selected requests for an item
+# add up to more than its stock. Requests are served oldest first.
+FILL_SKIP = 'skip'            # approve the ones that fit, leave the rest pending
+FILL_PARTIAL = 'partial'      # as FILL_SKIP, but the first one that doesn't fit gets what's left
+FILL_ALL_OR_NOTHING = 'all'   # approve nothing if any item is short
+FILL_POLICIES = (FILL_SKIP, FILL_PARTIAL, FILL_ALL_OR_NOTHING)
+
+# Requests per IN (...) list
+_IN_CHUNK = 500
+
 
 class RequestModel:
     """Model for managing stock requests."""
     
     @staticmethod
     def create_table():
-        """Create requests table if it doesn't exist."""
-        conn = get_conn()
-        cur = conn.cursor()
-        
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS requests (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                department VARCHAR(50) NOT NULL,
-                requested_by VARCHAR(100) NOT NULL,
-                item_name VARCHAR(255) NOT NULL,
-                quantity INT NOT NULL,
-                unit VARCHAR(50),
-                reason TEXT,
-                status VARCHAR(20) DEFAULT 'Pending',
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                notes TEXT
-            )
-        """)
-        
-        conn.commit()
-        conn.close()
+        """Create requests table if it doesn't exist (see models.migrations)."""
+        from models.migrations import migrate
+        migrate()
     
     @staticmethod
     def create_request(department, requested_by, item_name, quantity, unit, reason=None):
@@ -44,6 +37,7 @@ class RequestModel:
                 VALUES ({_paramstyle()}, {_paramstyle()}, {_paramstyle()}, {_paramstyle()}, {_paramstyle()}, {_paramstyle()})
             """, (department, requested_by, item_name, quantity, unit, reason))
             
+            bump_table_versions(cur, 'requests')
             conn.commit()
             request_id = cur.lastrowid
             conn.close()
@@ -53,89 +47,109 @@ class RequestModel:
             raise e
     
     @staticmethod
-    def get_requests_by_department(department, include_archived=False):
-        """Get all requests for a specific department."""
+    def ensure_indexes():
+        """Create the indexes query_requests() pages by (once per process)."""
+        global _request_indexes_ready
+        if _request_indexes_ready:
+            return
         conn = get_conn()
-        cur = conn.cursor()
+        try:
+            cur = conn.cursor()
+            if DB_DRIVER == 'mariadb':
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_department_created ON requests (department, created_at)")
+            else:
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_requests_created ON requests (created_at)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_requests_department_created ON requests (department, created_at)")
+            conn.commit()
+            _request_indexes_ready = True
+        except Exception as e:
+            print(f"[REQUESTS] Could not create request indexes: {e}")
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _row_to_request(row):
+        return {
+            'id': row[0],
+            'department': row[1],
+            'requested_by': row[2],
+            'item_name': row[3],
+            'quantity': row[4],
+            'unit': row[5],
+            'reason': row[6],
+            'status': row[7],
+            'created_at': row[8],
+            'updated_at': row[9],
+            'notes': row[10]
+        }
+    
+    @staticmethod
+    def query_requests(department=None, include_archived=False, offset=0, limit=None, status=None):
+        """Get requests newest first, optionally one department and one page at a time.
         
-        if include_archived:
-            query = f"""
+        Args:
+            department: Only this department's requests (None for all)
+            include_archived: Include requests with status 'Archived'
+            offset: Number of requests to skip
+            limit: Maximum number of requests returned (None for all)
+            status: Only requests with this status (e.g. 'Pending')
+        """
+        RequestModel.ensure_indexes()
+        param = _paramstyle()
+        clauses = []
+        params = []
+        if department is not None:
+            clauses.append(f"department = {param}")
+            params.append(department)
+        if not include_archived:
+            clauses.append("status != 'Archived'")
+        if status is not None:
+            clauses.append(f"status = {param}")
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        page = ""
+        if limit is not None:
+            page = f"LIMIT {int(limit)} OFFSET {int(offset)}"
+        
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            cur.execute(f"""
                 SELECT id, department, requested_by, item_name, quantity, unit, reason, status, created_at, updated_at, notes
                 FROM requests
-                WHERE department = {_paramstyle()}
-                ORDER BY created_at DESC
-            """
-        else:
-            query = f"""
+                {where}
+                ORDER BY created_at DESC, id DESC
+                {page}
+            """, tuple(params))
+            return [RequestModel._row_to_request(row) for row in cur.fetchall()]
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get_request(request_id):
+        """Get one request by id (None if it no longer exists)."""
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            cur.execute(f"""
                 SELECT id, department, requested_by, item_name, quantity, unit, reason, status, created_at, updated_at, notes
                 FROM requests
-                WHERE department = {_paramstyle()} AND status != 'Archived'
-                ORDER BY created_at DESC
-            """
-        
-        cur.execute(query, (department,))
-        rows = cur.fetchall()
-        
-        requests = []
-        for row in rows:
-            requests.append({
-                'id': row[0],
-                'department': row[1],
-                'requested_by': row[2],
-                'item_name': row[3],
-                'quantity': row[4],
-                'unit': row[5],
-                'reason': row[6],
-                'status': row[7],
-                'created_at': row[8],
-                'updated_at': row[9],
-                'notes': row[10]
-            })
-        
-        conn.close()
-        return requests
+                WHERE id = {_paramstyle()}
+            """, (request_id,))
+            row = cur.fetchone()
+            return RequestModel._row_to_request(row) if row else None
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get_requests_by_department(department, include_archived=False):
+        """Get all requests for a specific department."""
+        return RequestModel.query_requests(department=department, include_archived=include_archived)
     
     @staticmethod
     def get_all_requests(include_archived=False):
         """Get all requests (for Purchase Admin)."""
-        conn = get_conn()
-        cur = conn.cursor()
-        
-        if include_archived:
-            query = """
-                SELECT id, department, requested_by, item_name, quantity, unit, reason, status, created_at, updated_at, notes
-                FROM requests
-                ORDER BY created_at DESC
-            """
-        else:
-            query = """
-                SELECT id, department, requested_by, item_name, quantity, unit, reason, status, created_at, updated_at, notes
-                FROM requests
-                WHERE status != 'Archived'
-                ORDER BY created_at DESC
-            """
-        
-        cur.execute(query)
-        rows = cur.fetchall()
-        
-        requests = []
-        for row in rows:
-            requests.append({
-                'id': row[0],
-                'department': row[1],
-                'requested_by': row[2],
-                'item_name': row[3],
-                'quantity': row[4],
-                'unit': row[5],
-                'reason': row[6],
-                'status': row[7],
-                'created_at': row[8],
-                'updated_at': row[9],
-                'notes': row[10]
-            })
-        
-        conn.close()
-        return requests
+        return RequestModel.query_requests(include_archived=include_archived)
     
     @staticmethod
     def update_status(request_id, status, notes=None):
@@ -157,6 +171,7 @@ class RequestModel:
                     WHERE id = {_paramstyle()}
                 """, (status, request_id))
             
+            bump_table_versions(cur, 'requests')
             conn.commit()
             conn.close()
             return True
@@ -172,6 +187,7 @@ class RequestModel:
         
         try:
             cur.execute(f"DELETE FROM requests WHERE id = {_paramstyle()}", (request_id,))
+            bump_table_versions(cur, 'requests')
             conn.commit()
             conn.close()
             return True
@@ -197,6 +213,7 @@ class RequestModel:
                 WHERE id = {_paramstyle()}
             """, (note_text, request_id))
             
+            bump_table_versions(cur, 'requests')
             conn.commit()
             conn.close()
             return True
@@ -204,6 +221,181 @@ class RequestModel:
             conn.close()
             raise e
     
+    @staticmethod
+    def approve_and_distribute(request, quantity, user_name, notes=None):
+        """Approve a pending request and take the stock out of inventory, in one transaction.
+        
+        The item is found by name (ignoring case, via items.name_norm) and
+        the decrement is guarded in SQL, so two people approving against the
+        same stock can't oversell it. Nothing changes if any step fails.
+        
+        Args:
+            request: Request dict (id, item_name, department)
+            quantity: Units to distribute
+            user_name: Who approved it (recorded in the stock history)
+            notes: Optional note appended to the request's notes
+        
+        Returns:
+            The item dict the stock was taken from
+        
+        Raises:
+            ItemNotFoundError: no item has the requested name
+            InsufficientStockError: not enough stock (nothing was changed)
+            ValueError: the request is no longer pending
+        """
+        from models import inventory_history
+        from models.purchase import ItemModel, ItemNotFoundError
+        
+        # DDL must run before the write transaction opens
+        inventory_history.ensure_table()
+        with transaction() as conn:
+            cur = conn.cursor()
+            item = ItemModel.get_items_by_names([request['item_name']], cur).get(request['item_name'])
+            if item is None:
+                raise ItemNotFoundError(request['item_name'])
+            
+            note_text = f"Approved. Distributed: {quantity}"
+            if notes:
+                note_text += f". {notes}"
+            cur.execute(f"""
+                UPDATE requests
+                SET status = 'Approved', notes = {_paramstyle()}
+                WHERE id = {_paramstyle()} AND status = 'Pending'
+            """, (note_text, request['id']))
+            if cur.rowcount != 1:
+                raise ValueError(f"Request #{request['id']} is no longer pending")
+            
+            ItemModel.take_stock(
+                cur, [{'item_id': item['id'], 'item_name': item['name'], 'quantity': quantity}],
+                request['department'], user_name or 'System',
+                notes=f"Approved request #{request['id']}"
+            )
+            bump_table_versions(cur, 'requests')
+        return item
+    
+    @staticmethod
+    def bulk_approve(request_ids, user_name, policy=FILL_SKIP, notes=None):
+        """Approve many pending requests in one transaction.
+        
+        Requests for the same item (by name, ignoring case) are checked
+        against its stock together, oldest first, and the stock is taken
+        with one guarded UPDATE per item and one batched history write.
+        Each approved request gives its full quantity unless ``policy`` is
+        FILL_PARTIAL.
+        
+        Args:
+            request_ids: Ids of the requests to approve
+            user_name: Who approved them (recorded in the stock history)
+            policy: FILL_SKIP, FILL_PARTIAL or FILL_ALL_OR_NOTHING
+            notes: Optional note appended to each request's notes
+        
+        Returns:
+            {'approved': [{id, item_name, quantity, requested, unit}],
+             'skipped': [{id, item_name, requested, available, unit}],
+             'not_found': [{id, item_name}],
+             'not_pending': [id]}
+        
+        Raises:
+            InsufficientStockError: FILL_ALL_OR_NOTHING and some item is short (nothing was changed)
+            ValueError: unknown policy, or another user handled a request meanwhile (nothing was changed)
+        """
+        from models import inventory_history
+        from models.purchase import ItemModel, InsufficientStockError
+        
+        if policy not in FILL_POLICIES:
+            raise ValueError(f"Unknown fill policy: {policy}")
+        ids = sorted({int(i) for i in request_ids})
+        result = {'approved': [], 'skipped': [], 'not_found': [], 'not_pending': []}
+        if not ids:
+            return result
+        
+        param = _paramstyle()
+        lock = " FOR UPDATE" if DB_DRIVER == 'mariadb' else ""
+        # DDL must run before the write transaction opens
+        inventory_history.ensure_table()
+        with transaction() as conn:
+            cur = conn.cursor()
+            requests = []
+            for start in range(0, len(ids), _IN_CHUNK):
+                chunk = ids[start:start + _IN_CHUNK]
+                cur.execute(f"""
+                    SELECT id, department, requested_by, item_name, quantity, unit, reason, status, created_at, updated_at, notes
+                    FROM requests
+                    WHERE id IN ({', '.join([param] * len(chunk))}) AND status = 'Pending'
+                    {lock}
+                """, tuple(chunk))
+                requests.extend(RequestModel._row_to_request(row) for row in cur.fetchall())
+            pending = {r['id'] for r in requests}
+            result['not_pending'] = [i for i in ids if i not in pending]
+            requests.sort(key=lambda r: (str(r['created_at']), r['id']))
+            
+            items = ItemModel.get_items_by_names([r['item_name'] for r in requests], cur, for_update=True)
+            remaining = {item['id']: item['stock_qty'] or 0 for item in items.values()}
+            approved = []
+            short = {}
+            for request in requests:
+                item = items.get(request['item_name'])
+                if item is None:
+                    result['not_found'].append({'id': request['id'], 'item_name': request['item_name']})
+                    continue
+                requested = int(request['quantity'] or 0)
+                available = remaining[item['id']]
+                quantity = requested
+                if requested > available:
+                    if policy == FILL_PARTIAL and available > 0:
+                        quantity = available
+                    else:
+                        entry = short.setdefault(item['id'], {
+                            'item_id': item['id'], 'item_name': item['name'],
+                            'requested': 0, 'available': item['stock_qty'] or 0
+                        })
+                        entry['requested'] += requested
+                        result['skipped'].append({
+                            'id': request['id'], 'item_name': item['name'],
+                            'requested': requested, 'available': available, 'unit': request['unit']
+                        })
+                        continue
+                remaining[item['id']] = available - quantity
+                approved.append((request, item, quantity))
+            
+            if short and policy == FILL_ALL_OR_NOTHING:
+                # Report each short item's total demand across the selection
+                for request, item, quantity in approved:
+                    if item['id'] in short:
+                        short[item['id']]['requested'] += quantity
+                raise InsufficientStockError(list(short.values()))
+            if not approved:
+                return result
+            
+            updates = []
+            lines = []
+            for request, item, quantity in approved:
+                note_text = f"Approved. Distributed: {quantity}"
+                if quantity < int(request['quantity'] or 0):
+                    note_text += f" of {request['quantity']}"
+                if notes:
+                    note_text += f". {notes}"
+                updates.append((note_text, request['id']))
+                lines.append({
+                    'item_id': item['id'], 'item_name': item['name'], 'quantity': quantity,
+                    'department': request['department'], 'notes': f"Approved request #{request['id']}"
+                })
+                result['approved'].append({
+                    'id': request['id'], 'item_name': item['name'], 'quantity': quantity,
+                    'requested': int(request['quantity'] or 0), 'unit': request['unit']
+                })
+            cur.executemany(f"""
+                UPDATE requests
+                SET status = 'Approved', notes = {param}
+                WHERE id = {param} AND status = 'Pending'
+            """, updates)
+            if cur.rowcount != len(updates):
+                raise ValueError("Some requests were handled by someone else meanwhile; nothing was approved")
+            
+            ItemModel.take_stock(cur, lines, None, user_name or 'System')
+            bump_table_versions(cur, 'requests')
+        return result
+    
     @staticmethod
     def reject_request(request_id, reason=None):
         """Reject a request and update to Rejected status."""
@@ -221,9 +413,42 @@ class RequestModel:
                 WHERE id = {_paramstyle()}
             """, (note_text, request_id))
             
+            bump_table_versions(cur, 'requests')
             conn.commit()
             conn.close()
             return True
         except Exception as e:
             conn.close()
             raise e
+    
+    @staticmethod
+    def bulk_reject(request_ids, reason=None):
+        """Reject many pending requests in one transaction.
+        
+        Requests that are no longer pending are left as they are.
+        
+        Returns:
+            Number of requests rejected
+        """
+        ids = sorted({int(i) for i in request_ids})
+        if not ids:
+            return 0
+        note_text = "Rejected"
+        if reason:
+            note_text += f". Reason: {reason}"
+        
+        param = _paramstyle()
+        rejected = 0
+        with transaction() as conn:
+            cur = conn.cursor()
+            for start in range(0, len(ids), _IN_CHUNK):
+                chunk = ids[start:start + _IN_CHUNK]
+                cur.execute(f"""
+                    UPDATE requests
+                    SET status = 'Rejected', notes = {param}
+                    WHERE id IN ({', '.join([param] * len(chunk))}) AND status = 'Pending'
+                """, (note_text, *chunk))
+                rejected += cur.rowcount
+            if rejected:
+                bump_table_versions(cur, 'requests')
+        return rejected
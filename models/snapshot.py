@@ -0,0 +1,356 @@
+"""Columnar (Parquet / Arrow IPC) snapshots of the inventory tables.
+
+Meant for analytics re-imports: unlike the report CSVs, numbers stay
+numeric and dates stay timestamps, so ``pandas.read_parquet()`` gives back
+typed columns without any parsing.
+
+Each table in SNAPSHOT_TABLES is read in id order, BATCH_SIZE rows at a time,
+and written batch by batch, so memory stays flat however large the table is.
+Runs are incremental: the highest watermark value exported per table is
+kept in a state file next to the output, and the next run only exports rows
+past it. Tables with updated_at are re-exported when a row changes (the
+watermark is inclusive, so consumers should upsert on ``id``); append-only
+tables use ``id``. MariaDB maintains updated_at itself (ON UPDATE
+CURRENT_TIMESTAMP); on SQLite the triggers from migration 12 do.
+
+Every numeric column of a table must be typed in SNAPSHOT_TABLES: an export
+fails rather than write a new money or quantity column out as text.
+
+    from models.snapshot import export_snapshot
+    export_snapshot('exports/', fmt='parquet')            # incremental
+    export_snapshot('exports/', tables=['items'], full=True)
+
+pyarrow is optional and only imported when a snapshot is taken. Headless
+runs go through snapshot.py in the project root.
+"""
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+from .database import get_conn, _paramstyle, DB_DRIVER
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+BATCH_SIZE = 10000
+
+STATE_FILE = 'snapshot_state.json'
+
+# Column types per table (see hms_setup.sql and models.migrations). Other
+# text columns are exported as strings, unlisted numeric ones are refused;
+# 'watermark' is the column incremental runs track.
+SNAPSHOT_TABLES = {
+    'items': {
+        'watermark': 'updated_at',
+        'columns': {
+            'id': 'int', 'name': 'string', 'sku': 'string', 'unit': 'string',
+            'unit_cost': 'float', 'stock_qty': 'int', 'min_stock': 'int', 'category': 'string',
+            'created_at': 'timestamp', 'updated_at': 'timestamp',
+        },
+    },
+    'purchases': {
+        'watermark': 'updated_at',
+        'columns': {
+            'id': 'int', 'supplier_id': 'int', 'expected_date': 'date', 'total_amount': 'float',
+            'item_count': 'int', 'status': 'string', 'created_by': 'string',
+            'created_at': 'timestamp', 'updated_at': 'timestamp',
+        },
+    },
+    'purchase_items': {
+        # Receiving updates qty_added_to_inventory / in_inventory in place
+        'watermark': 'updated_at',
+        'columns': {
+            'id': 'int', 'purchase_id': 'int', 'item_name': 'string', 'item_id': 'int',
+            'quantity': 'int', 'price': 'float', 'unit_price': 'float', 'total': 'float',
+            'qty_added_to_inventory': 'int', 'in_inventory': 'int',
+            'created_at': 'timestamp', 'updated_at': 'timestamp',
+        },
+    },
+    'damages': {
+        'watermark': 'id',
+        'columns': {
+            'id': 'int', 'item_id': 'int', 'purchase_id': 'int', 'quantity': 'int', 'reason': 'string',
+            'category': 'string', 'status': 'string', 'created_by': 'string', 'created_at': 'timestamp',
+        },
+    },
+    'inventory_history': {
+        'watermark': 'id',
+        'columns': {
+            'id': 'int', 'event_key': 'string', 'item_name': 'string', 'movement_type': 'string',
+            'quantity': 'int', 'user_name': 'string', 'notes': 'string', 'department': 'string',
+            'created_at': 'timestamp',
+        },
+    },
+    'requests': {
+        'watermark': 'updated_at',
+        'columns': {
+            'id': 'int', 'department': 'string', 'requested_by': 'string', 'item_name': 'string',
+            'quantity': 'int', 'unit': 'string', 'reason': 'string', 'status': 'string',
+            'created_at': 'timestamp', 'updated_at': 'timestamp', 'notes': 'string',
+        },
+    },
+}
+
+
+# Declared column types that hold numbers
+_MARIADB_NUMERIC = {'tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint',
+                    'decimal', 'numeric', 'float', 'double', 'real', 'bit'}
+_SQLITE_NUMERIC = ('INT', 'REAL', 'FLOA', 'DOUB', 'DEC', 'NUM', 'BOOL')
+
+
+def unmapped_numeric_columns(table):
+    """Numeric columns of the live ``table`` that SNAPSHOT_TABLES doesn't type."""
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        if DB_DRIVER == 'mariadb':
+            cur.execute(
+                "SELECT COLUMN_NAME, DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,)
+            )
+            numeric = [r[0] for r in cur.fetchall() if str(r[1]).lower() in _MARIADB_NUMERIC]
+        else:
+            cur.execute(f"PRAGMA table_info({table})")
+            numeric = [r[1] for r in cur.fetchall()
+                       if any(t in str(r[2] or '').upper() for t in _SQLITE_NUMERIC)]
+    finally:
+        conn.close()
+    typed = SNAPSHOT_TABLES[table]['columns']
+    return [c for c in numeric if c not in typed]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Columnar export needs pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def _arrow_type(pa, kind):
+    return {
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'timestamp': pa.timestamp('s'),
+        'date': pa.date32(),
+        'string': pa.string(),
+    }[kind]
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return value.replace(microsecond=0, tzinfo=None)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    # SQLite keeps DATETIME columns as 'YYYY-MM-DD HH:MM:SS[.ffffff]' text
+    return datetime.fromisoformat(str(value)[:19])
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+_CONVERTERS = {
+    'int': int,
+    'float': lambda v: float(v) if not isinstance(v, float) else v,
+    'timestamp': _to_datetime,
+    'date': _to_date,
+    'string': lambda v: v if isinstance(v, str) else (v.decode() if isinstance(v, bytes) else str(v)),
+}
+
+
+def _convert(value, kind):
+    if value is None:
+        return None
+    if value == '' and kind != 'string':
+        return None
+    return _CONVERTERS[kind](value)
+
+
+def _watermark_value(value):
+    """JSON-safe form of a watermark (ids stay ints, timestamps become text)."""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, Decimal):
+        return int(value)
+    return _to_datetime(value).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def load_state(out_dir):
+    """Watermarks recorded by the previous run: {table: value}."""
+    path = os.path.join(out_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(out_dir, state):
+    path = os.path.join(out_dir, STATE_FILE)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _since_filter(watermark_col, since):
+    """Column and operator that select rows past ``since``.
+
+    An int is a recorded id watermark. A timestamp is compared inclusively
+    (rows written in the same second as the last run are exported again
+    rather than missed); on append-only tables it is matched on created_at.
+    """
+    if isinstance(since, int):
+        return 'id', '>'
+    return ('created_at' if watermark_col == 'id' else watermark_col), '>='
+
+
+def _batches(table, watermark_col, since, batch_size):
+    """Yield (column names, rows) batches of ``table`` in id order."""
+    param = _paramstyle()
+    last_id = None
+    while True:
+        where = []
+        params = []
+        if last_id is not None:
+            where.append(f"id > {param}")
+            params.append(last_id)
+        if since is not None:
+            column, op = _since_filter(watermark_col, since)
+            where.append(f"{column} {op} {param}")
+            params.append(since)
+        sql = f"SELECT * FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY id LIMIT {int(batch_size)}"
+
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            cur.execute(sql, tuple(params))
+            rows = [tuple(r) for r in cur.fetchall()]
+            columns = [d[0] for d in cur.description]
+        finally:
+            conn.close()
+
+        if not rows:
+            return
+        yield columns, rows
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1][columns.index('id')]
+
+
+def export_table(table, path, fmt='parquet', since=None, batch_size=BATCH_SIZE):
+    """Write the rows of ``table`` past ``since`` to ``path``.
+
+    Returns:
+        (rows written, new watermark or None when nothing was exported).
+        No file is created when there are no rows.
+    """
+    pa = _pyarrow()
+    spec = SNAPSHOT_TABLES[table]
+    unmapped = unmapped_numeric_columns(table)
+    if unmapped:
+        raise ValueError(f"{table}: numeric column(s) {', '.join(unmapped)} have no type in "
+                         f"SNAPSHOT_TABLES and would be exported as text")
+    watermark_col = spec['watermark']
+    tmp = path + '.tmp'
+    writer = None
+    schema = None
+    kinds = None
+    count = 0
+    watermark = None
+
+    try:
+        for columns, rows in _batches(table, watermark_col, since, batch_size):
+            if writer is None:
+                kinds = [spec['columns'].get(c, 'string') for c in columns]
+                schema = pa.schema([pa.field(c, _arrow_type(pa, k)) for c, k in zip(columns, kinds)])
+                if fmt == 'parquet':
+                    writer = pa.parquet.ParquetWriter(tmp, schema, compression='snappy')
+                else:
+                    writer = pa.ipc.new_file(tmp, schema)
+            arrays = [
+                pa.array([_convert(row[i], kind) for row in rows], type=schema.field(i).type)
+                for i, kind in enumerate(kinds)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            count += len(rows)
+
+            col = columns.index(watermark_col)
+            batch_max = max((r[col] for r in rows if r[col] is not None),
+                            key=_watermark_value, default=None)
+            if batch_max is not None:
+                batch_max = _watermark_value(batch_max)
+                watermark = batch_max if watermark is None else max(watermark, batch_max)
+    except Exception:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    if writer is None:
+        return 0, None
+    writer.close()
+    os.replace(tmp, path)
+    return count, watermark
+
+
+def export_snapshot(out_dir, fmt='parquet', tables=None, full=False, since=None):
+    """Export ``tables`` (default: all of SNAPSHOT_TABLES) into ``out_dir``.
+
+    Files are named ``<table>/<table>-<timestamp><ext>`` so every run adds
+    new files and never overwrites earlier ones.
+
+    Args:
+        fmt: 'parquet' or 'arrow' (Arrow IPC file)
+        full: Ignore recorded watermarks and export every row
+        since: Export rows written at or after this 'YYYY-MM-DD[ HH:MM:SS]'
+            for every table, instead of the recorded watermarks
+
+    Returns:
+        {table: {'rows': n, 'path': file or None, 'watermark': value}}
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported snapshot format: {fmt}")
+    tables = list(tables or SNAPSHOT_TABLES)
+    unknown = [t for t in tables if t not in SNAPSHOT_TABLES]
+    if unknown:
+        raise ValueError(f"Unknown snapshot table(s): {', '.join(unknown)}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    state = load_state(out_dir)
+    stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+    results = {}
+
+    for table in tables:
+        start = since if since is not None else (None if full else state.get(table))
+        if isinstance(start, int) and SNAPSHOT_TABLES[table]['watermark'] != 'id':
+            # Recorded before the table got an updated_at watermark: an id
+            # says nothing about rows changed since, so export it all once
+            start = None
+            state.pop(table, None)
+        table_dir = os.path.join(out_dir, table)
+        os.makedirs(table_dir, exist_ok=True)
+        path = os.path.join(table_dir, f"{table}-{stamp}{FORMATS[fmt]}")
+
+        count, watermark = export_table(table, path, fmt, since=start)
+        if watermark is not None:
+            # A full/explicit run never moves the recorded watermark backwards
+            previous = state.get(table)
+            state[table] = watermark if previous is None else max(previous, watermark)
+            save_state(out_dir, state)
+        results[table] = {
+            'rows': count,
+            'path': path if count else None,
+            'watermark': state.get(table),
+        }
+    return results
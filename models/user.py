@@ -1,73 +1,121 @@
-import mariadb
+import threading
+import time
+
+from models.database import get_conn, _paramstyle
+
+# Seconds a cached copy of the user directory stays valid
+DIRECTORY_TTL = 300
+
 
 class UserModel:
-    def __init__(self, db_config):
+    # Shared, process-wide user directory cache (id -> user dict)
+    _directory = None
+    _by_name = {}
+    _loaded_at = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self, db_config=None):
+        # db_config is accepted for backwards compatibility; connections
+        # come from the shared pool in models.database
         self.config = db_config
 
     def authenticate(self, email, password):
         conn = None
         try:
-            conn = mariadb.connect(**self.config)
+            conn = get_conn()
             cur = conn.cursor()
-            
-            # Simple query for demonstration. 
+
+            # Simple query for demonstration.
             # Note: Use password hashing (like bcrypt) for real applications.
-            query = "SELECT full_name, role, department FROM users WHERE email = ? AND password = ?"
+            query = f"SELECT full_name, role, department FROM users WHERE email = {_paramstyle()} AND password = {_paramstyle()}"
             cur.execute(query, (email, password))
-            
+
             user = cur.fetchone()
-            return user  # Returns (name, role, department) if found, else None
-            
-        except mariadb.Error as e:
+            return tuple(user) if user else None  # Returns (name, role, department) if found, else None
+
+        except Exception as e:
             print(f"Database error: {e}")
             return None
         finally:
             if conn:
                 conn.close()
 
+    @classmethod
+    def invalidate_cache(cls):
+        """Drop the cached user directory so the next lookup reloads it."""
+        with cls._lock:
+            cls._directory = None
+            cls._by_name = {}
+            cls._loaded_at = 0.0
+
+    @classmethod
+    def _load_directory(cls):
+        """Return the cached {id: user} directory, reloading it when stale."""
+        with cls._lock:
+            if cls._directory is not None and time.monotonic() - cls._loaded_at < DIRECTORY_TTL:
+                return cls._directory
+
+            conn = None
+            try:
+                conn = get_conn()
+                cur = conn.cursor()
+                cur.execute("SELECT id, full_name, email, role, department FROM users ORDER BY full_name")
+                directory = {}
+                for row in cur.fetchall():
+                    directory[row[0]] = {
+                        'id': row[0],
+                        'full_name': row[1],
+                        'email': row[2],
+                        'role': row[3],
+                        'department': row[4]
+                    }
+            except Exception as e:
+                print(f"Database error: {e}")
+                return {}
+            finally:
+                if conn:
+                    conn.close()
+
+            cls._directory = directory
+            cls._by_name = {u['full_name']: u for u in directory.values()}
+            cls._loaded_at = time.monotonic()
+            return directory
+
     def get_all_users(self):
-        """Fetch all users from the database."""
-        conn = None
-        try:
-            conn = mariadb.connect(**self.config)
-            cur = conn.cursor()
-            query = "SELECT id, full_name, email, role FROM users ORDER BY full_name"
-            cur.execute(query)
-            rows = cur.fetchall()
-            users = []
-            for row in rows:
-                users.append({
-                    'id': row[0],
-                    'full_name': row[1],
-                    'email': row[2],
-                    'role': row[3]
-                })
-            return users
-        except mariadb.Error as e:
-            print(f"Database error: {e}")
-            return []
-        finally:
-            if conn:
-                conn.close()
+        """Fetch all users from the (cached) user directory."""
+        return [dict(u) for u in self._load_directory().values()]
+
+    def get_user_by_id(self, user_id):
+        """Fetch a user by id from the (cached) user directory."""
+        user = self._load_directory().get(user_id)
+        return dict(user) if user else None
 
     def get_user_by_name(self, full_name):
         """Fetch a user by their full name."""
+        self._load_directory()
+        user = self._by_name.get(full_name)
+        if user:
+            return dict(user)
+
+        # Not cached yet (e.g. account created after the directory was loaded)
         conn = None
         try:
-            conn = mariadb.connect(**self.config)
+            conn = get_conn()
             cur = conn.cursor()
-            query = "SELECT id, full_name, email, role FROM users WHERE full_name = ?"
+            query = f"SELECT id, full_name, email, role, department FROM users WHERE full_name = {_paramstyle()}"
             cur.execute(query, (full_name,))
             row = cur.fetchone()
             if row:
+                self.invalidate_cache()
                 return {
                     'id': row[0],
                     'full_name': row[1],
                     'email': row[2],
-                    'role': row[3]
+                    'role': row[3],
+                    'department': row[4]
                 }
             return None
-        except mariadb.Error as e:
+        except Exception as e:
             print(f"Database error: {e}")
             return None
         finally:
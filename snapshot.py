@@ -0,0 +1,47 @@
+"""Headless columnar export of the HMS tables for analytics.
+
+Writes Parquet (or Arrow IPC) files with typed columns; see models/snapshot.py.
+Runs are incremental by default, so it can be scheduled (cron / Task
+Scheduler) against the same output directory:
+
+    python snapshot.py exports/                      # rows changed since last run
+    python snapshot.py exports/ --full               # everything
+    python snapshot.py exports/ --format arrow --tables items purchases
+    python snapshot.py exports/ --since 2024-01-01
+
+Needs pyarrow (pip install pyarrow); PyQt is not imported.
+"""
+import argparse
+import sys
+
+from models.snapshot import FORMATS, SNAPSHOT_TABLES, export_snapshot
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export HMS tables to Parquet / Arrow for analytics.")
+    parser.add_argument('out_dir', help="output directory (also holds the watermark state file)")
+    parser.add_argument('--format', dest='fmt', choices=sorted(FORMATS), default='parquet')
+    parser.add_argument('--tables', nargs='+', choices=list(SNAPSHOT_TABLES), metavar='TABLE',
+                        help=f"tables to export (default: all of {', '.join(SNAPSHOT_TABLES)})")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--full', action='store_true', help="ignore the recorded watermarks")
+    mode.add_argument('--since', help="export rows written at or after YYYY-MM-DD[ HH:MM:SS]")
+    args = parser.parse_args(argv)
+
+    try:
+        results = export_snapshot(args.out_dir, fmt=args.fmt, tables=args.tables,
+                                  full=args.full, since=args.since)
+    except Exception as e:
+        print(f"Snapshot failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    for table, info in results.items():
+        target = info['path'] or "(no new rows)"
+        print(f"{table:<18} {info['rows']:>8} rows  {target}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,20 +2,6 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QLabel, QFrame, QGraphicsDropShadowEffect, QStackedWidget)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont, QColor
-from views.purchase_view import PurchasePage
-from views.inventory import InventoryPage
-from views.reports import ReportsPage
-from views.messages import MessagesPage
-from views.trans_history import TransactionHistoryPage
-from views.requests import RequestsPage
-from views.dept_overview import DepartmentOverviewPage
-from controllers.purchase_controller import PurchaseController
-from controllers.inventory_controller import InventoryController
-from controllers.reports_controller import ReportsController
-from controllers.messages_controller import MessagesController
-from controllers.trans_history_controller import TransactionHistoryController
-from controllers.requests_controller import RequestsController
-from controllers.dept_overview_controller import DeptOverviewController
 from models import purchase as purchase_model
 
 class DashboardWindow(QMainWindow):
@@ -227,60 +213,33 @@ class DashboardWindow(QMainWindow):
         dash_page_layout.addLayout(kpi_grid_layout)
         dash_page_layout.addStretch()
 
-        # PAGE 2: TRANS HISTORY (Transaction History)
-        self.trans_history_page = TransactionHistoryPage()
-        
-        # PAGE 3: DEPT OVERVIEW (Department Overview)
-        self.dept_overview_page = DepartmentOverviewPage()
-        
-        # PAGE 4: PURCHASE (Initialized and added AFTER self.main_stack exists)
-        self.purchase_page = PurchasePage()
-        
-        # PAGE 5: INVENTORY
-        self.inventory_page = InventoryPage()
-        
-        # PAGE 6: REQUESTS (Department role)
-        self.requests_page = RequestsPage()
-        
-        # PAGE 7: REPORTS
-        self.reports_page = ReportsPage()
-        
-        # PAGE 7: MESSAGES
-        self.messages_page = MessagesPage()
-        
-        # 5. Logic & Controllers (Initialized now that views exist)
+        # 5. Logic (pages and their controllers are built on first visit,
+        # see _ensure_page; their modules - QtCharts included - are only
+        # imported then, so the login window doesn't wait for them)
         self.p_model = purchase_model.PurchaseModel()
         self.m_model = purchase_model.MessageModel()
-        self.purchase_ctrl = PurchaseController(self.purchase_page, self.p_model, self)
-        self.inventory_ctrl = InventoryController(self.inventory_page, self.p_model)
-        self.reports_ctrl = ReportsController(self.reports_page, self.p_model)
-        self.requests_ctrl = RequestsController(self.requests_page)
-        self.messages_ctrl = MessagesController(self.messages_page, self.m_model, self)
-        self.trans_history_ctrl = TransactionHistoryController(self.trans_history_page, self.p_model)
-        self.dept_overview_ctrl = DeptOverviewController(self.dept_overview_page)
+        self._pages = {}  # title -> (page, controller)
+        self.current_page = "DASHBOARD"
+        self.change_watcher = None  # created on first login
+        self._page_factories = {
+            "TRANS HISTORY": ("trans_history", self._create_trans_history_page),
+            "DEPT OVERVIEW": ("dept_overview", self._create_dept_overview_page),
+            "PURCHASE": ("purchase", self._create_purchase_page),
+            "INVENTORY": ("inventory", self._create_inventory_page),
+            "REQUESTS": ("requests", self._create_requests_page),
+            "REPORTS": ("reports", self._create_reports_page),
+            "MESSAGES": ("messages", self._create_messages_page),
+        }
 
-        # 6. Assemble Stack
-        self.main_stack.addWidget(self.dash_page)          # Index 0
-        self.main_stack.addWidget(self.trans_history_page) # Index 1
-        self.main_stack.addWidget(self.dept_overview_page) # Index 2
-        self.main_stack.addWidget(self.purchase_page)      # Index 3
-        self.main_stack.addWidget(self.inventory_page)     # Index 4
-        self.main_stack.addWidget(self.requests_page)      # Index 5
-        self.main_stack.addWidget(self.reports_page)       # Index 6
-        self.main_stack.addWidget(self.messages_page)      # Index 7
+        # 6. Assemble Stack (other pages are added as they are created)
+        self.main_stack.addWidget(self.dash_page)
 
         content_main_layout.addWidget(self.main_stack)
         self.main_layout.addWidget(content_container)
 
         # 7. Connect Navigation
-        self.nav_btns["DASHBOARD"].clicked.connect(lambda: self.switch_page(0, "DASHBOARD"))
-        self.nav_btns["TRANS HISTORY"].clicked.connect(lambda: self.switch_page(1, "TRANS HISTORY"))
-        self.nav_btns["DEPT OVERVIEW"].clicked.connect(lambda: self.switch_page(2, "DEPT OVERVIEW"))
-        self.nav_btns["PURCHASE"].clicked.connect(lambda: self.switch_page(3, "PURCHASE"))
-        self.nav_btns["INVENTORY"].clicked.connect(lambda: self.switch_page(4, "INVENTORY"))
-        self.nav_btns["REQUESTS"].clicked.connect(lambda: self.switch_page(5, "REQUESTS"))
-        self.nav_btns["REPORTS"].clicked.connect(lambda: self.switch_page(6, "REPORTS"))
-        self.nav_btns["MESSAGES"].clicked.connect(lambda: self.switch_page(7, "MESSAGES"))
+        for page_name, btn in self.nav_btns.items():
+            btn.clicked.connect(lambda _=False, name=page_name: self.switch_page(name))
         
         # Connect Logout
         self.logout_btn.clicked.connect(self.handle_logout)
@@ -305,30 +264,14 @@ class DashboardWindow(QMainWindow):
             else:
                 btn.setVisible(False)
         
-        # Update inventory page UI based on role
-        if user_role == "Department":
-            # Use the department from the database, or default to Housekeeping
-            department = user_department or self.DEPARTMENT_ASSIGNMENTS.get(user_role, "Housekeeping")
-            self.inventory_page.update_ui_for_role(user_role, department)
-            # Trigger refresh with department filter
-            self.inventory_ctrl.current_category_filter = department
-            self.inventory_ctrl.refresh_inventory()
-            
-            # Set user info for requests page
-            self.requests_ctrl.set_user_info(user_name, user_role, department)
-            
-            # Set user info for reports page
-            self.reports_ctrl.set_user_info(user_name, user_role, department)
-        else:
-            self.inventory_page.update_ui_for_role(user_role)
-            # Set user info for requests page (for Purchase Admin/Owner)
-            self.requests_ctrl.set_user_info(user_name, user_role, None)
-            
-            # Set user info for reports page
-            self.reports_ctrl.set_user_info(user_name, user_role, None)
+        # Pages built during an earlier session keep their widgets; give them
+        # the new user (pages built later are configured on creation)
+        for title in list(self._pages):
+            self._configure_page(title)
         
         # Switch to dashboard on login
-        self.switch_page(0, "DASHBOARD")
+        self.switch_page("DASHBOARD")
+        self._start_change_watcher()
     
     def add_notification(self, message, type="info"):
         """Add a notification to the sidebar."""
@@ -353,58 +296,38 @@ class DashboardWindow(QMainWindow):
         self.notifications_layout.insertWidget(self.notifications_layout.count() - 1, notification_frame)
     
     def refresh_dashboard_kpis(self):
-        """Refresh dashboard KPI values from database."""
-        try:
-            from models.purchase import DashboardModel
-            
-            # Use department-specific KPIs for Department role
-            if self.current_role == "Department":
-                # Get department assignment from user's department or default
-                department_filter = self.current_department or self.DEPARTMENT_ASSIGNMENTS.get(self.current_role, "Housekeeping")
-                kpis = DashboardModel.get_department_kpis(department_filter)
-                
-                # Update with formatted department values
-                self.inventory_value_label.setText(kpis['inventory_value'])
-                self.wastages_label.setText(str(kpis['wastages']))
-                self.inventory_items_label.setText(str(kpis['inventory_items']))
-                
-                # For department role, calculate low stocks in their department
-                try:
-                    from models.database import get_conn, _paramstyle
-                    conn = get_conn()
-                    cur = conn.cursor()
-                    cur.execute(f"SELECT COUNT(*) FROM items WHERE category = {_paramstyle()} AND stock_qty <= min_stock", (department_filter,))
-                    row = cur.fetchone()
-                    low_stocks = int(row[0] if row else 0)
-                    conn.close()
-                except Exception:
-                    low_stocks = 0
-                
-                self.low_stocks_label.setText(str(low_stocks))
-            else:
-                # For other roles (Owner, Purchase Admin), show all data
-                kpis = DashboardModel.get_all_kpis()
-                
-                # Update Inventory Value (format as currency)
-                inventory_value = kpis['inventory_value']
-                self.inventory_value_label.setText(f"₱ {inventory_value:,.2f}")
-                
-                # Update Wastages
-                wastages = kpis['wastages']
-                self.wastages_label.setText(str(wastages))
-                
-                # Update Inventory Items
-                inventory_items = kpis['inventory_items']
-                self.inventory_items_label.setText(str(inventory_items))
-                
-                # Update Low Stocks
-                low_stocks = kpis['low_stocks']
-                self.low_stocks_label.setText(str(low_stocks))
-            
-        except Exception as e:
-            print(f"Error refreshing dashboard KPIs: {e}")
-            import traceback
-            traceback.print_exc()
+        """Refresh dashboard KPI values from database (loaded in the background)."""
+        from models.purchase import DashboardModel
+        from controllers.query_executor import get_executor
+        
+        # Department role only sees its own department; other roles see everything
+        department_filter = None
+        if self.current_role == "Department":
+            department_filter = self.current_department or self.DEPARTMENT_ASSIGNMENTS.get(self.current_role, "Housekeeping")
+        
+        # Placeholders until the snapshot arrives
+        for label in (self.inventory_value_label, self.wastages_label,
+                      self.inventory_items_label, self.low_stocks_label):
+            label.setText("…")
+        
+        # One round trip for all four cards
+        get_executor().submit(
+            'dashboard.kpis', DashboardModel.get_kpi_snapshot, department_filter,
+            on_result=self._apply_dashboard_kpis,
+            on_error=self._dashboard_kpis_failed,
+            group='page'
+        )
+    
+    def _apply_dashboard_kpis(self, kpis):
+        self.inventory_value_label.setText(f"₱ {kpis['inventory_value']:,.2f}")
+        self.wastages_label.setText(str(kpis['wastages']))
+        self.inventory_items_label.setText(str(kpis['inventory_items']))
+        self.low_stocks_label.setText(str(kpis['low_stocks']))
+    
+    def _dashboard_kpis_failed(self, error, tb):
+        print(f"Error refreshing dashboard KPIs: {error}")
+        print(tb)
+        self._apply_dashboard_kpis({'inventory_value': 0.0, 'wastages': 0, 'inventory_items': 0, 'low_stocks': 0})
     
     def _create_kpi_card(self, value, title, kpi_type=None):
         """Create a KPI card widget and return both card and value label."""
@@ -624,6 +547,10 @@ class DashboardWindow(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
+            from controllers.query_executor import get_executor
+            if self.change_watcher is not None:
+                self.change_watcher.stop()
+            get_executor().cancel_group('page')
             self.current_user = None
             self.current_role = None
             # Signal to show login window
@@ -631,16 +558,149 @@ class DashboardWindow(QMainWindow):
                 self.on_logout()
             self.close()
 
-    def switch_page(self, index, title):
-        self.main_stack.setCurrentIndex(index)
+    def _user_department(self):
+        """Department the logged-in Department user is scoped to, else None."""
+        if self.current_role == "Department":
+            return self.current_department or self.DEPARTMENT_ASSIGNMENTS.get(self.current_role, "Housekeeping")
+        return None
+    
+    def _ensure_page(self, title):
+        """Return (page, controller) for ``title``, creating them on first use.
+        
+        The page is also exposed as self.<name>_page / self.<name>_ctrl.
+        """
+        if title in self._pages:
+            return self._pages[title]
+        name, factory = self._page_factories[title]
+        page, ctrl = factory()
+        self.main_stack.addWidget(page)
+        setattr(self, f"{name}_page", page)
+        setattr(self, f"{name}_ctrl", ctrl)
+        self._pages[title] = (page, ctrl)
+        self._configure_page(title)
+        return page, ctrl
+    
+    def _configure_page(self, title):
+        """Apply the logged-in user's role/department to an existing page."""
+        page, ctrl = self._pages[title]
+        department = self._user_department()
+        if title == "INVENTORY":
+            if department:
+                page.update_ui_for_role(self.current_role, department)
+                ctrl.current_category_filter = department
+            else:
+                page.update_ui_for_role(self.current_role)
+        elif title in ("REQUESTS", "REPORTS"):
+            ctrl.set_user_info(self.current_user, self.current_role, department)
+    
+    # Page factories - imports are local so each module loads on first visit
+    
+    def _create_trans_history_page(self):
+        from views.trans_history import TransactionHistoryPage
+        from controllers.trans_history_controller import TransactionHistoryController
+        page = TransactionHistoryPage()
+        return page, TransactionHistoryController(page, self.p_model)
+    
+    def _create_dept_overview_page(self):
+        from views.dept_overview import DepartmentOverviewPage
+        from controllers.dept_overview_controller import DeptOverviewController
+        page = DepartmentOverviewPage()
+        return page, DeptOverviewController(page)
+    
+    def _create_purchase_page(self):
+        from views.purchase_view import PurchasePage
+        from controllers.purchase_controller import PurchaseController
+        page = PurchasePage()
+        return page, PurchaseController(page, self.p_model, self)
+    
+    def _create_inventory_page(self):
+        from views.inventory import InventoryPage
+        from controllers.inventory_controller import InventoryController
+        page = InventoryPage()
+        return page, InventoryController(page, self.p_model)
+    
+    def _create_requests_page(self):
+        from views.requests import RequestsPage
+        from controllers.requests_controller import RequestsController
+        page = RequestsPage()
+        return page, RequestsController(page)
+    
+    def _create_reports_page(self):
+        from views.reports import ReportsPage  # pulls in QtCharts
+        from controllers.reports_controller import ReportsController
+        page = ReportsPage()
+        return page, ReportsController(page, self.p_model)
+    
+    def _create_messages_page(self):
+        from views.messages import MessagesPage
+        from controllers.messages_controller import MessagesController
+        page = MessagesPage()
+        return page, MessagesController(page, self.m_model, self)
+    
+    def _start_change_watcher(self):
+        """Refresh the visible page when its data changes (here or in another copy of the app)."""
+        if self.change_watcher is None:
+            from controllers.change_watcher import ChangeWatcher
+            self.change_watcher = ChangeWatcher(self)
+            self.change_watcher.items_changed.connect(self._on_items_changed)
+            self.change_watcher.damages_changed.connect(self._on_damages_changed)
+            self.change_watcher.purchases_changed.connect(self._on_purchases_changed)
+            self.change_watcher.requests_changed.connect(self._on_requests_changed)
+            self.change_watcher.messages_changed.connect(self._on_messages_changed)
+        self.change_watcher.start()
+    
+    def _on_items_changed(self):
+        if self.current_page == "DASHBOARD":
+            self.refresh_dashboard_kpis()
+        elif self.current_page == "INVENTORY":
+            self.inventory_ctrl.refresh_inventory()
+    
+    def _on_damages_changed(self):
+        if self.current_page == "DASHBOARD":
+            self.refresh_dashboard_kpis()
+    
+    def _on_purchases_changed(self):
+        if self.current_page == "PURCHASE":
+            self.purchase_ctrl.refresh_table()
+        elif self.current_page == "TRANS HISTORY":
+            self.trans_history_ctrl.refresh_transactions()
+    
+    def _on_requests_changed(self):
+        if self.current_page == "REQUESTS":
+            self.requests_ctrl.refresh_requests()
+    
+    def _on_messages_changed(self):
+        # Only fetches messages newer than those shown, so keep the
+        # unread count current even while on another page
+        if "MESSAGES" in self._pages and self.current_user:
+            # The dashboard is reused across logins; sync whoever is logged in now
+            self.messages_ctrl.current_user_id = self.messages_ctrl.get_current_user_id()
+            self.messages_ctrl.refresh_messages()
+    
+    def switch_page(self, title):
+        from controllers.query_executor import get_executor
+        
+        # Loads for the page we're leaving are no longer needed
+        get_executor().cancel_group('page')
+        
+        if title == "DASHBOARD":
+            self.main_stack.setCurrentWidget(self.dash_page)
+        else:
+            page, _ = self._ensure_page(title)
+            self.main_stack.setCurrentWidget(page)
+        self.current_page = title
         self.title_label.setText(title)
         
+        # Each refresh below only schedules a background load; the page shows
+        # placeholders/its previous content until the data arrives
+        
         # Refresh dashboard KPIs when switching to dashboard page
         if title == "DASHBOARD":
             self.refresh_dashboard_kpis()
         
         # Refresh transaction history when switching to trans history page
         elif title == "TRANS HISTORY":
+            self.trans_history_ctrl.load_periods()
             self.trans_history_ctrl.refresh_transactions()
         
         # Refresh department overview when switching to dept overview page
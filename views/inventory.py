@@ -1,9 +1,9 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFrame,
-    QTableWidget, QTableWidgetItem, QHeaderView, QComboBox, QDialog,
-    QLineEdit, QMessageBox, QSpinBox, QMainWindow, QScrollArea, QSizePolicy
+    QTableWidget, QTableWidgetItem, QTableView, QHeaderView, QComboBox, QDialog,
+    QLineEdit, QMessageBox, QSpinBox, QMainWindow, QScrollArea, QSizePolicy, QCheckBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QFont, QIcon, QPixmap, QPainter, QColor, QBrush
 
 # --- Shared Style Constants ---
@@ -522,9 +522,16 @@ class AddStockDialog(QDialog):
 class StockRequestsDialog(QDialog):
     """Dialog for viewing and managing stock requests."""
     
+    # Emitted with the number of checked requests
+    selection_changed = pyqtSignal(int)
+    
+    FILL_POLICY_LABELS = ["Skip what doesn't fit", "Fill partially", "All or nothing"]
+    
     def __init__(self, parent=None, controller=None):
         super().__init__(parent)
         self.controller = controller
+        # request id -> its card's checkbox
+        self.request_checks = {}
         self.setWindowTitle("Stock Requests")
         self.setFixedSize(950, 650)
         self.init_ui()
@@ -587,6 +594,83 @@ class StockRequestsDialog(QDialog):
         content_layout.setContentsMargins(24, 24, 24, 24)
         content_layout.setSpacing(16)
         
+        # Bulk actions for the checked requests
+        bulk_layout = QHBoxLayout()
+        bulk_layout.setSpacing(10)
+        
+        self.select_all_check = QCheckBox("Select all")
+        self.select_all_check.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.select_all_check.setStyleSheet(f"color: {STYLE_NAVY}; font-size: 13px; font-weight: 600;")
+        self.select_all_check.clicked.connect(self.set_all_checked)
+        bulk_layout.addWidget(self.select_all_check)
+        
+        self.selected_label = QLabel("0 selected")
+        self.selected_label.setStyleSheet("color: #6b7280; font-size: 12px; border: none;")
+        bulk_layout.addWidget(self.selected_label)
+        
+        bulk_layout.addStretch()
+        
+        policy_label = QLabel("When stock runs short:")
+        policy_label.setStyleSheet("color: #6b7280; font-size: 12px; border: none;")
+        bulk_layout.addWidget(policy_label)
+        
+        self.policy_combo = QComboBox()
+        self.policy_combo.addItems(self.FILL_POLICY_LABELS)
+        self.policy_combo.setFixedSize(170, 36)
+        self.policy_combo.setStyleSheet(f"""
+            QComboBox {{
+                background-color: white;
+                color: {STYLE_NAVY};
+                border: 1px solid {STYLE_BORDER};
+                border-radius: 6px;
+                padding: 6px 10px;
+                font-size: 12px;
+            }}
+            QComboBox QAbstractItemView {{
+                background-color: white;
+                color: {STYLE_NAVY};
+                selection-background-color: {STYLE_BLUE};
+            }}
+        """)
+        bulk_layout.addWidget(self.policy_combo)
+        
+        self.bulk_approve_btn = QPushButton("✓ Approve Selected")
+        self.bulk_approve_btn.setFixedSize(150, 36)
+        self.bulk_approve_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.bulk_approve_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #10b981;
+                color: white;
+                border: none;
+                border-radius: 6px;
+                font-size: 12px;
+                font-weight: 600;
+            }
+            QPushButton:hover { background-color: #059669; }
+            QPushButton:disabled { background-color: #a7f3d0; }
+        """)
+        bulk_layout.addWidget(self.bulk_approve_btn)
+        
+        self.bulk_reject_btn = QPushButton("✗ Reject Selected")
+        self.bulk_reject_btn.setFixedSize(140, 36)
+        self.bulk_reject_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.bulk_reject_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #ef4444;
+                color: white;
+                border: none;
+                border-radius: 6px;
+                font-size: 12px;
+                font-weight: 600;
+            }
+            QPushButton:hover { background-color: #dc2626; }
+            QPushButton:disabled { background-color: #fecaca; }
+        """)
+        bulk_layout.addWidget(self.bulk_reject_btn)
+        
+        content_layout.addLayout(bulk_layout)
+        self._update_selection()
+        
         # Scroll area for requests
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
@@ -657,6 +741,10 @@ class StockRequestsDialog(QDialog):
     
     def load_requests(self, requests):
         """Load and display requests."""
+        # Keep the checks of requests that are still pending
+        checked = set(self.selected_request_ids())
+        self.request_checks = {}
+        
         # Clear existing widgets
         while self.requests_layout.count() > 1:  # Keep the stretch
             item = self.requests_layout.takeAt(0)
@@ -691,6 +779,37 @@ class StockRequestsDialog(QDialog):
             for request in requests:
                 card = self.create_request_card(request)
                 self.requests_layout.insertWidget(self.requests_layout.count() - 1, card)
+                if request['id'] in checked:
+                    self.request_checks[request['id']].setChecked(True)
+        self._update_selection()
+    
+    def selected_request_ids(self):
+        """Ids of the checked requests, in display order."""
+        return [request_id for request_id, check in self.request_checks.items() if check.isChecked()]
+    
+    def fill_policy(self):
+        """Bulk approval fill policy chosen in the dropdown (see models.request)."""
+        from models.request import FILL_SKIP, FILL_PARTIAL, FILL_ALL_OR_NOTHING
+        
+        policies = dict(zip(self.FILL_POLICY_LABELS, (FILL_SKIP, FILL_PARTIAL, FILL_ALL_OR_NOTHING)))
+        return policies[self.policy_combo.currentText()]
+    
+    def set_all_checked(self, checked):
+        for check in self.request_checks.values():
+            check.blockSignals(True)
+            check.setChecked(checked)
+            check.blockSignals(False)
+        self._update_selection()
+    
+    def _update_selection(self):
+        count = len(self.selected_request_ids())
+        total = len(self.request_checks)
+        self.selected_label.setText(f"{count} selected")
+        self.select_all_check.setChecked(total > 0 and count == total)
+        self.select_all_check.setEnabled(total > 0)
+        self.bulk_approve_btn.setEnabled(count > 0)
+        self.bulk_reject_btn.setEnabled(count > 0)
+        self.selection_changed.emit(count)
     
     def create_request_card(self, request):
         """Create a card widget for a request."""
@@ -716,6 +835,14 @@ class StockRequestsDialog(QDialog):
         left_layout = QHBoxLayout()
         left_layout.setSpacing(16)
         
+        # Selection for bulk approve / reject
+        check = QCheckBox()
+        check.setCursor(Qt.CursorShape.PointingHandCursor)
+        check.setStyleSheet("border: none;")
+        check.toggled.connect(self._update_selection)
+        self.request_checks[request['id']] = check
+        left_layout.addWidget(check)
+        
         # Colored indicator bar
         indicator = QFrame()
         indicator.setFixedSize(4, 78)
@@ -854,6 +981,11 @@ class StockRequestsDialog(QDialog):
 class StockHistoryDialog(QDialog):
     """Dialog for viewing stock movement history."""
     
+    # Emitted with current_filters() whenever a filter changes
+    filters_changed = pyqtSignal(dict)
+    
+    PERIODS = {"All Time": None, "Today": 0, "Last 7 Days": 7, "Last 30 Days": 30}
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Stock History")
@@ -890,6 +1022,27 @@ class StockHistoryDialog(QDialog):
         
         header_layout.addStretch()
         
+        # Item search (prefix match on the item name)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search item...")
+        self.search_input.setFixedSize(180, 36)
+        self.search_input.setStyleSheet("""
+            QLineEdit {
+                background-color: rgba(255, 255, 255, 0.15);
+                color: white;
+                border: 1px solid rgba(255, 255, 255, 0.3);
+                border-radius: 6px;
+                padding: 6px 12px;
+                font-size: 12px;
+            }
+        """)
+        header_layout.addWidget(self.search_input)
+        
+        # Period dropdown
+        self.period_combo = QComboBox()
+        self.period_combo.addItems(list(self.PERIODS))
+        self.period_combo.setFixedSize(130, 36)
+        
         # Filter dropdown
         self.filter_combo = QComboBox()
         self.filter_combo.addItems(["All Movements", "Stock In", "Stock Out", "Adjustments"])
@@ -918,8 +1071,19 @@ class StockHistoryDialog(QDialog):
                 border: 1px solid {STYLE_BORDER};
             }}
         """)
+        self.period_combo.setStyleSheet(self.filter_combo.styleSheet())
+        header_layout.addWidget(self.period_combo)
         header_layout.addWidget(self.filter_combo)
         
+        # Typing waits for a pause before querying
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(300)
+        self._search_timer.timeout.connect(self._emit_filters)
+        self.search_input.textChanged.connect(lambda _: self._search_timer.start())
+        self.period_combo.currentTextChanged.connect(lambda _: self._emit_filters())
+        self.filter_combo.currentTextChanged.connect(lambda _: self._emit_filters())
+        
         layout.addWidget(header_frame)
         
         # Content area
@@ -928,34 +1092,43 @@ class StockHistoryDialog(QDialog):
         content_layout.setContentsMargins(24, 24, 24, 24)
         content_layout.setSpacing(16)
         
-        # Table for history
-        self.history_table = QTableWidget()
-        self.history_table.setColumnCount(6)
-        self.history_table.setHorizontalHeaderLabels(["Date & Time", "Item", "Type", "Quantity", "By User", "Notes"])
+        # Table for history: rows are paged in by the model as the table scrolls
+        from views.inventory_table import HistoryTableModel
+        
+        self.history_model = HistoryTableModel(self)
+        self.history_table = QTableView()
+        self.history_table.setModel(self.history_model)
         self.history_table.horizontalHeader().setStretchLastSection(True)
+        self.history_table.verticalHeader().setVisible(False)
+        self.history_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.history_table.verticalHeader().setDefaultSectionSize(45)
         self.history_table.setColumnWidth(0, 180)
         self.history_table.setColumnWidth(1, 200)
         self.history_table.setColumnWidth(2, 120)
         self.history_table.setColumnWidth(3, 100)
         self.history_table.setColumnWidth(4, 150)
-        self.history_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.history_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.history_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.history_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.history_table.setAlternatingRowColors(True)
+        self.history_table.setVerticalScrollMode(QTableView.ScrollMode.ScrollPerPixel)
+        self.history_table.verticalScrollBar().valueChanged.connect(self._on_scroll)
+        self.history_model.window_shifted.connect(self._on_window_shifted)
+        self.history_model.modelReset.connect(self._update_status)
         
         self.history_table.setStyleSheet(f"""
-            QTableWidget {{
+            QTableView {{
                 background-color: white;
                 border: 1px solid {STYLE_BORDER};
                 border-radius: 8px;
                 gridline-color: {STYLE_BORDER};
                 color: #111827;
             }}
-            QTableWidget::item {{
+            QTableView::item {{
                 padding: 10px 8px;
                 border: none;
                 color: #111827;
             }}
-            QTableWidget::item:selected {{
+            QTableView::item:selected {{
                 background-color: {STYLE_BLUE};
                 color: white;
             }}
@@ -969,7 +1142,7 @@ class StockHistoryDialog(QDialog):
                 font-size: 12px;
                 text-align: left;
             }}
-            QTableWidget::item:alternate {{
+            QTableView::item:alternate {{
                 background-color: #fafafa;
             }}
         """)
@@ -983,10 +1156,10 @@ class StockHistoryDialog(QDialog):
         footer_layout.setContentsMargins(24, 0, 24, 24)
         
         # Export button
-        export_btn = QPushButton("📥 Export")
-        export_btn.setFixedSize(100, 40)
-        export_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-        export_btn.setStyleSheet(f"""
+        self.export_btn = QPushButton("📥 Export")
+        self.export_btn.setFixedSize(100, 40)
+        self.export_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.export_btn.setStyleSheet(f"""
             QPushButton {{
                 background-color: {STYLE_BLUE};
                 color: white;
@@ -999,7 +1172,11 @@ class StockHistoryDialog(QDialog):
                 background-color: #003d82;
             }}
         """)
-        footer_layout.addWidget(export_btn)
+        footer_layout.addWidget(self.export_btn)
+        
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #6b7280; font-size: 12px; border: none; margin-left: 12px;")
+        footer_layout.addWidget(self.status_label)
         
         footer_layout.addStretch()
         
@@ -1027,55 +1204,46 @@ class StockHistoryDialog(QDialog):
         
         layout.addLayout(footer_layout)
     
+    def current_filters(self):
+        """Filters for inventory_history.list_history() from the header controls."""
+        from datetime import datetime, timedelta
+        from models.inventory_history import MOVEMENT_GROUPS
+        
+        filters = {}
+        search = self.search_input.text().strip()
+        if search:
+            filters['item'] = search
+        group = MOVEMENT_GROUPS.get(self.filter_combo.currentText())
+        if group:
+            filters['movement_types'] = group
+        days = self.PERIODS.get(self.period_combo.currentText())
+        if days is not None:
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            filters['start'] = today - timedelta(days=days)
+        return filters
+    
+    def _emit_filters(self):
+        self.filters_changed.emit(self.current_filters())
+    
+    def show_loading(self):
+        self.status_label.setText("Loading history...")
+    
+    def _update_status(self):
+        self.status_label.setText("" if self.history_model.rowCount() else "No movements found")
+    
+    def _on_scroll(self, value):
+        # Back at the top of the window after older rows pushed newer ones out
+        if value == self.history_table.verticalScrollBar().minimum() and self.history_model.can_fetch_newer():
+            self.history_model.fetch_newer()
+    
+    def _on_window_shifted(self, rows):
+        # Keep the same records on screen when rows are added/dropped above them
+        bar = self.history_table.verticalScrollBar()
+        bar.setValue(bar.value() + rows * self.history_table.verticalHeader().defaultSectionSize())
+    
     def load_history(self, history_data):
-        """Load history data into the table."""
-        self.history_table.setRowCount(len(history_data))
-        
-        for row_idx, record in enumerate(history_data):
-            # Set row height for better readability
-            self.history_table.setRowHeight(row_idx, 45)
-            
-            # Date & Time
-            date_item = QTableWidgetItem(record.get('timestamp', ''))
-            date_item.setForeground(QBrush(QColor("#111827")))
-            self.history_table.setItem(row_idx, 0, date_item)
-            
-            # Item
-            item_item = QTableWidgetItem(record.get('item_name', ''))
-            item_item.setForeground(QBrush(QColor("#111827")))
-            item_item.setFont(QFont("Arial", 11, QFont.Weight.Bold))
-            self.history_table.setItem(row_idx, 1, item_item)
-            
-            # Type (with color coding and badge style)
-            type_text = record.get('type', 'Unknown')
-            type_item = QTableWidgetItem(type_text)
-            type_item.setFont(QFont("Arial", 10, QFont.Weight.Bold))
-            if type_text == "Stock In":
-                type_item.setForeground(QBrush(QColor("#10b981")))
-            elif type_text == "Stock Out":
-                type_item.setForeground(QBrush(QColor("#ef4444")))
-            else:
-                type_item.setForeground(QBrush(QColor("#f59e0b")))
-            self.history_table.setItem(row_idx, 2, type_item)
-            
-            # Quantity
-            qty_item = QTableWidgetItem(str(record.get('quantity', 0)))
-            qty_item.setForeground(QBrush(QColor("#111827")))
-            qty_item.setFont(QFont("Arial", 11))
-            self.history_table.setItem(row_idx, 3, qty_item)
-            
-            # By User
-            user_item = QTableWidgetItem(record.get('user', 'System'))
-            user_item.setForeground(QBrush(QColor("#6b7280")))
-            self.history_table.setItem(row_idx, 4, user_item)
-            
-            # Notes
-            notes_item = QTableWidgetItem(record.get('notes', '-'))
-            notes_item.setForeground(QBrush(QColor("#6b7280")))
-            self.history_table.setItem(row_idx, 5, notes_item)
-            # Notes
-            notes_item = QTableWidgetItem(record.get('notes', '-'))
-            self.history_table.setItem(row_idx, 5, notes_item)
+        """Load a fixed list of history records into the table."""
+        self.history_model.set_source(None, rows=history_data)
 
 
 class InventoryPage(QWidget):
@@ -1208,14 +1376,20 @@ class InventoryPage(QWidget):
         container_layout = QVBoxLayout(table_container)
         container_layout.setContentsMargins(0, 0, 0, 0)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels([
-            "ITEM NAME", "UNIT", "STOCK LEVEL", "STATUS", "ACTIONS"
-        ])
+        # Model/view table: rows are fetched lazily and the action buttons
+        # are painted by a delegate instead of one widget per row
+        from views.inventory_table import InventoryTableModel, InventoryActionsDelegate, ACTIONS_COLUMN
+        self.table = QTableView()
+        self.table_model = InventoryTableModel(self.table)
+        self.table.setModel(self.table_model)
+        self.actions_delegate = InventoryActionsDelegate(self.table)
+        self.table.setItemDelegateForColumn(ACTIONS_COLUMN, self.actions_delegate)
+        self.table.setMouseTracking(True)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         
         self.table.setStyleSheet(f"""
-            QTableWidget {{
+            QTableView {{
                 background-color: white;
                 border: none;
                 font-size: 13px;
@@ -1233,7 +1407,7 @@ class InventoryPage(QWidget):
                 color: #4b5563;
                 text-transform: uppercase;
             }}
-            QTableWidget::item {{
+            QTableView::item {{
                 border-bottom: 1px solid #f3f4f6;
                 padding: 5px;
                 color: {STYLE_NAVY};
@@ -1247,6 +1421,9 @@ class InventoryPage(QWidget):
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)  # STOCK LEVEL
         header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)  # STATUS
         header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)  # ACTIONS
+        # One uniform row height instead of setRowHeight() per row
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(45)
         self.table.verticalHeader().setVisible(False)
         
         container_layout.addWidget(self.table)
@@ -1257,6 +1434,10 @@ class InventoryPage(QWidget):
         self.current_role = role
         self.current_department = department
         
+        # Department users can edit but not delete items
+        self.actions_delegate.show_delete = role != "Department"
+        self.table.viewport().update()
+        
         if role == "Department":
             # Hide action buttons for Department role
             self.actions_container.setVisible(False)
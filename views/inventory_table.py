@@ -0,0 +1,359 @@
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QRect, QEvent, pyqtSignal
+from PyQt6.QtGui import QColor, QBrush, QCursor, QPainter, QFont
+
+from views.inventory import create_edit_icon, create_more_icon
+from views.lazy_rows import LazyRowsMixin
+
+STYLE_BLUE = "#0056b3"
+
+# Role returning the full item dict for any cell of a row
+ItemRole = Qt.ItemDataRole.UserRole + 1
+
+COLUMNS = ["ITEM NAME", "UNIT", "STOCK LEVEL", "STATUS", "ACTIONS"]
+ACTIONS_COLUMN = 4
+
+
+def stock_status(stock_qty, min_stock):
+    """Return (label, colour) for an item's stock level."""
+    if stock_qty == 0:
+        return "OUT OF STOCK", "#ef4444"  # Red
+    if stock_qty <= min_stock:
+        return "LOW STOCK", "#f59e0b"  # Orange
+    return "IN STOCK", "#10b981"  # Green
+
+
+class InventoryTableModel(LazyRowsMixin, QAbstractTableModel):
+    """Lazily loaded inventory rows for a QTableView.
+
+    Rows come from a fetch callable ``fetch(offset, limit) -> list[dict]``
+    (normally ItemModel.query_items with the page's filters) one page at a
+    time as the view scrolls, so only what the user actually looks at is
+    queried and rendered. Paging and refreshes come from LazyRowsMixin.
+    """
+
+    COLUMN_COUNT = len(COLUMNS)
+
+    def __init__(self, parent=None, page_size=200):
+        super().__init__(parent)
+        self._init_lazy_rows(page_size, 'inventory.items.more')
+
+    def set_items(self, items):
+        """Show a fixed list of items (no lazy loading), diffing against the current rows."""
+        self.cancel_fetch()
+        self._fetch = None
+        self._source_key = None
+        self._exhausted = True
+        self._apply_diff(list(items))
+
+    # --- Qt model API ----------------------------------------------------
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self._rows[index.row()]
+        col = index.column()
+
+        if role == ItemRole:
+            return item
+
+        stock_qty = int(item.get('stock_qty') or 0)
+        min_stock = int(item.get('min_stock') or 0)
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                return item.get('name', '')
+            if col == 1:
+                return item.get('unit') or '-'
+            if col == 2:
+                return str(stock_qty)
+            if col == 3:
+                return stock_status(stock_qty, min_stock)[0]
+            return None
+
+        if role == Qt.ItemDataRole.ForegroundRole and col == 3:
+            return QBrush(QColor(stock_status(stock_qty, min_stock)[1]))
+
+        if role == Qt.ItemDataRole.UserRole:
+            if col == 0:
+                return item.get('id')
+            if col == 3:
+                return {'stock_qty': stock_qty, 'min_stock': min_stock}
+
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+
+HISTORY_COLUMNS = ["Date & Time", "Item", "Type", "Quantity", "By User", "Notes"]
+HISTORY_KEYS = ['timestamp', 'item_name', 'type', 'quantity', 'user', 'notes']
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """Sliding window over the inventory history for StockHistoryDialog.
+
+    Rows come from ``fetch(before=None, after=None, limit=...)`` which pages
+    by (created_at, id) cursor. Scrolling down appends older pages via
+    fetchMore(); once more than ``max_rows`` are held the newest rows are
+    dropped, and fetch_newer() brings them back when the user scrolls up
+    again, so memory stays bounded however far the history goes. Both run
+    on the query executor and apply their page when it arrives.
+
+    ``window_shifted`` is emitted with the number of rows inserted (>0) or
+    removed (<0) above the current ones so the view can keep its position.
+    """
+
+    window_shifted = pyqtSignal(int)
+
+    OLDER_KEY = 'inventory.history.older'
+    NEWER_KEY = 'inventory.history.newer'
+
+    def __init__(self, parent=None, page_size=100, max_rows=2000):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.max_rows = max(max_rows, 2 * page_size)
+        self._rows = []
+        self._fetch = None
+        self._more_older = False
+        self._more_newer = False
+        # Bumped when the rows are replaced, so late pages are dropped
+        self._generation = 0
+
+    def set_source(self, fetch, rows=None):
+        """Show history from ``fetch``; ``rows`` may carry the already loaded first page."""
+        self.cancel_fetches()
+        self.beginResetModel()
+        self._fetch = fetch
+        if rows is None:
+            rows = fetch(limit=self.page_size) if fetch else []
+        self._rows = list(rows)
+        self._more_older = fetch is not None and len(self._rows) >= self.page_size
+        self._more_newer = False
+        self.endResetModel()
+
+    def cancel_fetches(self):
+        """Drop older/newer pages still on their way."""
+        from controllers.query_executor import get_executor
+
+        self._generation += 1
+        get_executor().cancel(self.OLDER_KEY)
+        get_executor().cancel(self.NEWER_KEY)
+
+    @staticmethod
+    def _cursor(row):
+        return (row['created_at'], row['id'])
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._fetch is not None and self._more_older
+
+    def fetchMore(self, parent=QModelIndex()):
+        from controllers.query_executor import get_executor
+
+        if parent.isValid() or not self.canFetchMore() or not self._rows:
+            return
+        executor = get_executor()
+        if executor.is_pending(self.OLDER_KEY):
+            return
+        generation, cursor = self._generation, self._cursor(self._rows[-1])
+        executor.submit(
+            self.OLDER_KEY, self._fetch, before=cursor, limit=self.page_size,
+            on_result=lambda rows: self._append_older(generation, cursor, rows),
+            on_error=self._fetch_failed
+        )
+
+    def _append_older(self, generation, cursor, more):
+        if generation != self._generation or not self._rows or self._cursor(self._rows[-1]) != cursor:
+            return
+        self._more_older = len(more) >= self.page_size
+        if not more:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(more) - 1)
+        self._rows.extend(more)
+        self.endInsertRows()
+
+        excess = len(self._rows) - self.max_rows
+        if excess > 0:
+            self.beginRemoveRows(QModelIndex(), 0, excess - 1)
+            del self._rows[:excess]
+            self.endRemoveRows()
+            self._more_newer = True
+            self.window_shifted.emit(-excess)
+
+    def can_fetch_newer(self):
+        return self._fetch is not None and self._more_newer and bool(self._rows)
+
+    def fetch_newer(self):
+        """Load the page just above the window (after rows were dropped).
+
+        The rows are inserted at the top, with window_shifted, once they arrive.
+        """
+        from controllers.query_executor import get_executor
+
+        if not self.can_fetch_newer():
+            return
+        executor = get_executor()
+        if executor.is_pending(self.NEWER_KEY):
+            return
+        generation, cursor = self._generation, self._cursor(self._rows[0])
+        executor.submit(
+            self.NEWER_KEY, self._fetch, after=cursor, limit=self.page_size,
+            on_result=lambda rows: self._prepend_newer(generation, cursor, rows),
+            on_error=self._fetch_failed
+        )
+
+    def _prepend_newer(self, generation, cursor, newer):
+        if generation != self._generation or not self._rows or self._cursor(self._rows[0]) != cursor:
+            return
+        self._more_newer = len(newer) >= self.page_size
+        if not newer:
+            return
+
+        excess = len(self._rows) + len(newer) - self.max_rows
+        if excess > 0:
+            first = len(self._rows) - excess
+            self.beginRemoveRows(QModelIndex(), first, len(self._rows) - 1)
+            del self._rows[first:]
+            self.endRemoveRows()
+            self._more_older = True
+
+        self.beginInsertRows(QModelIndex(), 0, len(newer) - 1)
+        self._rows[:0] = newer
+        self.endInsertRows()
+        self.window_shifted.emit(len(newer))
+
+    def _fetch_failed(self, error, tb):
+        print(f"Error fetching inventory history: {error}")
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HISTORY_COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return HISTORY_COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self._rows[index.row()]
+        col = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = record.get(HISTORY_KEYS[col])
+            if col == 4:
+                return value or 'System'
+            if col == 5:
+                return value or '-'
+            return '' if value is None else str(value)
+
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if col == 2:
+                type_text = record.get('type')
+                if type_text == "Stock In":
+                    return QBrush(QColor("#10b981"))
+                if type_text == "Stock Out":
+                    return QBrush(QColor("#ef4444"))
+                return QBrush(QColor("#f59e0b"))
+            if col in (4, 5):
+                return QBrush(QColor("#6b7280"))
+            return QBrush(QColor("#111827"))
+
+        if role == Qt.ItemDataRole.FontRole:
+            if col == 1:
+                return QFont("Arial", 11, QFont.Weight.Bold)
+            if col == 2:
+                return QFont("Arial", 10, QFont.Weight.Bold)
+            if col == 3:
+                return QFont("Arial", 11)
+
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+
+class InventoryActionsDelegate(QStyledItemDelegate):
+    """Paints the edit/delete buttons of the ACTIONS column.
+
+    Nothing is instantiated per row: buttons are drawn on demand for visible
+    cells and clicks are mapped back to the row's item dict.
+    """
+
+    edit_requested = pyqtSignal(object)
+    delete_requested = pyqtSignal(object)
+
+    BUTTON_SIZE = 32
+    MARGIN = 2
+    SPACING = 6
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.show_delete = True
+        self._edit_icon = create_edit_icon(16)
+        self._delete_icon = create_more_icon(16)
+
+    def _button_rects(self, cell):
+        size = self.BUTTON_SIZE
+        top = cell.top() + (cell.height() - size) // 2
+        edit_rect = QRect(cell.left() + self.MARGIN, top, size, size)
+        delete_rect = QRect(edit_rect.right() + 1 + self.SPACING, top, size, size)
+        return edit_rect, (delete_rect if self.show_delete else None)
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        edit_rect, delete_rect = self._button_rects(option.rect)
+        cursor = None
+        if option.widget is not None and option.state & QStyle.StateFlag.State_MouseOver:
+            cursor = option.widget.viewport().mapFromGlobal(QCursor.pos())
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        buttons = [(edit_rect, STYLE_BLUE, "#003d82", self._edit_icon)]
+        if delete_rect is not None:
+            buttons.append((delete_rect, "#ef4444", "#dc2626", self._delete_icon))
+        for rect, colour, hover_colour, icon in buttons:
+            over = cursor is not None and rect.contains(cursor)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(hover_colour if over else colour))
+            painter.drawRoundedRect(rect, 4, 4)
+            icon.paint(painter, rect.adjusted(8, 8, -8, -8))
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        hint = super().sizeHint(option, index)
+        buttons = 2 if self.show_delete else 1
+        width = 2 * self.MARGIN + buttons * self.BUTTON_SIZE + (buttons - 1) * self.SPACING
+        hint.setWidth(max(hint.width(), width))
+        return hint
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            item = index.data(ItemRole)
+            edit_rect, delete_rect = self._button_rects(option.rect)
+            pos = event.position().toPoint()
+            if edit_rect.contains(pos):
+                self.edit_requested.emit(item)
+                return True
+            if delete_rect is not None and delete_rect.contains(pos):
+                self.delete_requested.emit(item)
+                return True
+        return super().editorEvent(event, model, option, index)
@@ -0,0 +1,202 @@
+from difflib import SequenceMatcher
+
+from PyQt6.QtCore import QModelIndex
+
+
+class LazyRowsMixin:
+    """Paged loading and in-place refreshes for a Qt item model of dict rows.
+
+    Rows come from a fetch callable ``fetch(offset, limit) -> list[dict]``
+    one page at a time as the view scrolls (canFetchMore / fetchMore), and
+    a refresh diffs the new rows against the loaded ones by ``id`` so only
+    rows that actually changed are inserted, removed or redrawn.
+
+    Further pages are fetched on the query executor under ``fetch_key`` and
+    appended when they arrive, so scrolling never waits on the database.
+    A page that arrives after the source changed or was refreshed is
+    dropped.
+
+    Mix it in ahead of the Qt model class and call ``_init_lazy_rows()``
+    from ``__init__``:
+
+        class InventoryTableModel(LazyRowsMixin, QAbstractTableModel):
+            COLUMN_COUNT = len(COLUMNS)
+
+            def __init__(self, parent=None, page_size=200):
+                super().__init__(parent)
+                self._init_lazy_rows(page_size, 'inventory.items.more')
+    """
+
+    # Columns a changed row spans (for dataChanged)
+    COLUMN_COUNT = 1
+
+    def _init_lazy_rows(self, page_size, fetch_key):
+        self.page_size = page_size
+        self.fetch_key = fetch_key
+        self._rows = []
+        self._fetch = None
+        self._source_key = None
+        self._exhausted = True
+        # Bumped whenever the loaded rows are replaced; a page fetched for
+        # an older generation no longer lines up and is dropped
+        self._generation = 0
+        self._fetching = False
+
+    # --- Loading ---------------------------------------------------------
+
+    def set_source(self, fetch, key=None, rows=None):
+        """Show rows from ``fetch``.
+
+        When ``key`` matches the current source (same filters), the loaded
+        rows are refreshed in place by diffing; otherwise the model resets.
+        ``rows`` may carry an already fetched first page (e.g. loaded in the
+        background with fetch(0, refresh_size(key))) so no query runs here.
+        """
+        if key is not None and key == self._source_key and self._fetch is not None:
+            self._fetch = fetch
+            self.refresh(rows)
+            return
+
+        self.cancel_fetch()
+        self.beginResetModel()
+        self._fetch = fetch
+        self._source_key = key
+        if rows is None:
+            rows = self._fetch(0, self.page_size) if fetch else []
+        self._rows = list(rows)
+        self._exhausted = len(self._rows) < self.page_size
+        self.endResetModel()
+
+    def refresh_size(self, key=None):
+        """Number of rows to fetch up front for ``set_source(..., key)``.
+
+        A refresh of the current source re-queries everything loaded so far
+        (at least one page); a new source starts with a single page.
+        """
+        if key is not None and key != self._source_key:
+            return self.page_size
+        return max(len(self._rows), self.page_size)
+
+    def is_current(self, key):
+        return self._fetch is not None and key == self._source_key
+
+    def refresh(self, rows=None):
+        """Re-query the rows that are currently loaded and apply only the differences."""
+        if self._fetch is None:
+            return
+        self.cancel_fetch()
+        wanted = self.refresh_size()
+        new_rows = self._fetch(0, wanted) if rows is None else list(rows)
+        self._exhausted = len(new_rows) < wanted
+        self._apply_diff(new_rows)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._fetch is not None and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        from controllers.query_executor import get_executor
+
+        if parent.isValid() or self._fetch is None or self._exhausted:
+            return
+        executor = get_executor()
+        # The view asks again while a page is on its way; a fetch cancelled
+        # elsewhere (e.g. cancel_group) never reports back, so check the executor
+        if self._fetching and executor.is_pending(self.fetch_key):
+            return
+        self._fetching = True
+        generation, offset = self._generation, len(self._rows)
+        executor.submit(
+            self.fetch_key, self._fetch, offset, self.page_size,
+            on_result=lambda rows: self._append_page(generation, offset, rows),
+            on_error=self._fetch_failed
+        )
+
+    def cancel_fetch(self):
+        """Drop the page being fetched (if any); called when the rows are replaced."""
+        from controllers.query_executor import get_executor
+
+        self._generation += 1
+        if self._fetching:
+            self._fetching = False
+            get_executor().cancel(self.fetch_key)
+
+    def _append_page(self, generation, offset, more):
+        if generation != self._generation or offset != len(self._rows):
+            return
+        self._fetching = False
+        self._exhausted = len(more) < self.page_size
+        if not more:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(more) - 1)
+        self._rows.extend(more)
+        self.endInsertRows()
+
+    def _fetch_failed(self, error, tb):
+        # Left not exhausted: scrolling again retries
+        self._fetching = False
+        print(f"[{self.fetch_key}] Could not load more rows: {error}")
+
+    def _apply_diff(self, new_rows):
+        old_ids = [r.get('id') for r in self._rows]
+        new_ids = [r.get('id') for r in new_rows]
+        opcodes = SequenceMatcher(None, old_ids, new_ids, autojunk=False).get_opcodes()
+
+        # Walk backwards so earlier row positions stay valid while we edit
+        for tag, i1, i2, j1, j2 in reversed(opcodes):
+            if tag == 'equal':
+                for k in range(i2 - i1):
+                    if self._rows[i1 + k] != new_rows[j1 + k]:
+                        self._rows[i1 + k] = new_rows[j1 + k]
+                        self._row_changed(i1 + k)
+                continue
+            if i2 > i1:
+                self.beginRemoveRows(QModelIndex(), i1, i2 - 1)
+                del self._rows[i1:i2]
+                self.endRemoveRows()
+            if j2 > j1:
+                self.beginInsertRows(QModelIndex(), i1, i1 + (j2 - j1) - 1)
+                self._rows[i1:i1] = new_rows[j1:j2]
+                self.endInsertRows()
+
+    # --- Single-row updates ----------------------------------------------
+
+    def _row_changed(self, row):
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.COLUMN_COUNT - 1))
+
+    def _row_of(self, row_id):
+        for row, record in enumerate(self._rows):
+            if record.get('id') == row_id:
+                return row
+        return None
+
+    def update_row(self, row_id, record):
+        """Redraw one row with fresh data (``record`` None removes it)."""
+        row = self._row_of(row_id)
+        if row is None:
+            return
+        if record is None:
+            self.remove_row(row_id)
+            return
+        self._rows[row] = record
+        self._row_changed(row)
+
+    def remove_row(self, row_id):
+        row = self._row_of(row_id)
+        if row is None:
+            return
+        # Offsets of a page already on its way would skip a row
+        self.cancel_fetch()
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self.endRemoveRows()
+
+    def row_at(self, row):
+        if 0 <= row < len(self._rows):
+            return self._rows[row]
+        return None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
@@ -234,13 +234,14 @@ class ComposeMessageDialog(QDialog):
 class MessageItem(QFrame):
     """Gmail-style message item - simple one-line preview."""
     
-    def __init__(self, message_id, sender_id, recipient_id, current_user_id, sender_name, sender_role, recipient_name, recipient_role, category, subject, body, is_read, created_at, on_delete, parent=None):
+    def __init__(self, message_id, sender_id, recipient_id, current_user_id, sender_name, sender_role, recipient_name, recipient_role, category, subject, body, is_read, created_at, on_delete, parent=None, on_open=None):
         super().__init__(parent)
         self.message_id = message_id
         self.sender_id = sender_id
         self.recipient_id = recipient_id
         self.current_user_id = current_user_id
         self.on_delete = on_delete
+        self.on_open = on_open
         self.is_read = is_read
         self.is_sent = (sender_id == current_user_id)
         
@@ -378,6 +379,9 @@ class MessageItem(QFrame):
             self
         )
         dialog.exec()
+        # After the dialog closes: the handler may replace this widget
+        if self.on_open:
+            self.on_open(self.message_id)
 
 
 class MessageDetailsDialog(QDialog):
@@ -538,6 +542,8 @@ class MessagesPage(QWidget):
     def __init__(self):
         super().__init__()
         self.messages = []
+        # Raw message dicts by id, so single items can be rebuilt
+        self.message_data = {}
         self.init_ui()
 
     def init_ui(self):
@@ -571,6 +577,10 @@ class MessagesPage(QWidget):
         
         actions_layout.addWidget(self.btn_compose)
         actions_layout.addStretch()
+        
+        self.unread_label = QLabel("")
+        self.unread_label.setStyleSheet(f"QLabel {{ color: {STYLE_BLUE}; font-weight: 700; font-size: 13px; }}")
+        actions_layout.addWidget(self.unread_label)
         self.layout.addLayout(actions_layout)
 
         # Messages List Container
@@ -653,11 +663,33 @@ class MessagesPage(QWidget):
         self.messages_list_layout.insertWidget(self.messages_list_layout.count() - 1, message_item)
         self.messages.append(message_item)
     
+    def _create_item(self, msg):
+        """Build a MessageItem from a message dict (as returned by MessageModel)."""
+        self.message_data[msg.get('id')] = msg
+        return MessageItem(
+            msg.get('id'),
+            msg.get('sender_id'),
+            msg.get('recipient_id'),
+            msg.get('current_user_id'),
+            msg.get('sender_name'),
+            msg.get('sender_role'),
+            msg.get('recipient_name'),
+            msg.get('recipient_role'),
+            msg.get('category'),
+            msg.get('title'),
+            msg.get('body'),
+            msg.get('is_read'),
+            msg.get('created_at'),
+            self.delete_message,
+            on_open=self.message_opened
+        )
+
     def clear_messages(self):
         """Clear all messages from the list."""
         for message in self.messages:
             message.deleteLater()
         self.messages.clear()
+        self.message_data.clear()
         # Show empty state when no messages
         # self.empty_state.setVisible(True)
     
@@ -666,22 +698,60 @@ class MessagesPage(QWidget):
         # This will be connected to controller
         pass
     
+    def message_opened(self, message_id):
+        """Called when a message is opened."""
+        # This will be connected to controller
+        pass
+    
     def populate_messages(self, messages_data):
-        """Populate the messages list with data."""
+        """Populate the messages list with data (newest first)."""
         self.clear_messages()
         for msg in messages_data:
-            self.add_message(
-                msg.get('id'),
-                msg.get('sender_id'),
-                msg.get('recipient_id'),
-                msg.get('current_user_id'),
-                msg.get('sender_name'),
-                msg.get('sender_role'),
-                msg.get('recipient_name'),
-                msg.get('recipient_role'),
-                msg.get('category'),
-                msg.get('title'),
-                msg.get('body'),
-                msg.get('is_read'),
-                msg.get('created_at')
-            )
+            message_item = self._create_item(msg)
+            self.messages_list_layout.insertWidget(self.messages_list_layout.count() - 1, message_item)
+            self.messages.append(message_item)
+    
+    def prepend_messages(self, messages_data):
+        """Add newer messages (newest first) above the ones already shown."""
+        for msg in reversed(messages_data):
+            if msg.get('id') in self.message_data:
+                continue
+            message_item = self._create_item(msg)
+            self.messages_list_layout.insertWidget(0, message_item)
+            self.messages.insert(0, message_item)
+    
+    def remove_message(self, message_id):
+        """Remove one message from the list without reloading the rest."""
+        for message in self.messages:
+            if message.message_id == message_id:
+                self.messages.remove(message)
+                self.message_data.pop(message_id, None)
+                message.deleteLater()
+                return
+    
+    def mark_message_read(self, message_id):
+        """Redraw one message as read."""
+        msg = self.message_data.get(message_id)
+        if msg is None or msg.get('is_read'):
+            return
+        msg['is_read'] = 1
+        for index, message in enumerate(self.messages):
+            if message.message_id == message_id:
+                message_item = self._create_item(msg)
+                self.messages_list_layout.replaceWidget(message, message_item)
+                self.messages[index] = message_item
+                message.deleteLater()
+                return
+    
+    def sync_states(self, states):
+        """Drop loaded messages missing from ``states`` ({id: is_read}) and
+        redraw the ones that have been read since."""
+        for message_id in list(self.message_data):
+            if message_id not in states:
+                self.remove_message(message_id)
+            elif states[message_id]:
+                self.mark_message_read(message_id)
+    
+    def set_unread_count(self, count):
+        """Show how many received messages are unread."""
+        self.unread_label.setText(f"{count} unread" if count else "")
@@ -1,10 +1,13 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QPushButton,
-    QScrollArea, QDialog, QLineEdit, QTextEdit, QSpinBox, QComboBox, QMessageBox
+    QScrollArea, QDialog, QLineEdit, QTextEdit, QSpinBox, QComboBox, QMessageBox,
+    QListView
 )
 from PyQt6.QtGui import QFont
 from PyQt6.QtCore import Qt
 
+from views.requests_list import RequestListModel, RequestCardDelegate, REQUEST_LIST_STYLE
+
 # Style constants
 STYLE_NAVY = "#111827"
 STYLE_BLUE = "#0056b3"
@@ -416,36 +419,29 @@ class RequestsPage(QWidget):
         self.actions_layout = actions_layout
         self.layout.addLayout(actions_layout)
         
-        # Requests List (Scroll Area)
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setStyleSheet(f"""
-            QScrollArea {{
-                background-color: #f9fafb;
-                border: 1px solid {STYLE_BORDER};
-                border-radius: 2px;
-            }}
-            QScrollBar:vertical {{
-                background-color: #f9fafb;
-                width: 12px;
-                border-radius: 6px;
-            }}
-            QScrollBar::handle:vertical {{
-                background-color: {STYLE_BORDER};
-                border-radius: 6px;
-                min-height: 20px;
-            }}
-            QScrollBar::handle:vertical:hover {{
-                background-color: #9ca3af;
-            }}
-        """)
-        
-        self.requests_container = QWidget()
-        self.requests_container.setStyleSheet("background-color: #f9fafb;")
-        self.requests_layout = QVBoxLayout(self.requests_container)
-        self.requests_layout.setContentsMargins(20, 20, 20, 20)
-        self.requests_layout.setSpacing(14)
-        self.requests_layout.addStretch()
-        
-        scroll_area.setWidget(self.requests_container)
-        self.layout.addWidget(scroll_area)
+        # Requests List: cards are painted by RequestCardDelegate and
+        # loaded a page at a time by RequestListModel as the list scrolls
+        self.placeholder_label = QLabel("")
+        self.placeholder_label.setStyleSheet("color: #6b7280; font-size: 14px; border: none;")
+        self.placeholder_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.placeholder_label.hide()
+        self.layout.addWidget(self.placeholder_label)
+        
+        self.request_model = RequestListModel(self)
+        self.request_delegate = RequestCardDelegate(self)
+        self.request_list = QListView()
+        self.request_list.setModel(self.request_model)
+        self.request_list.setItemDelegate(self.request_delegate)
+        self.request_list.setUniformItemSizes(True)
+        self.request_list.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.request_list.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.request_list.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
+        self.request_list.setMouseTracking(True)
+        self.request_list.viewport().setAttribute(Qt.WidgetAttribute.WA_Hover)
+        self.request_list.setStyleSheet(REQUEST_LIST_STYLE)
+        self.layout.addWidget(self.request_list)
+    
+    def show_placeholder(self, text):
+        """Show a message (e.g. "Loading requests...") above the list; None hides it."""
+        self.placeholder_label.setText(text or "")
+        self.placeholder_label.setVisible(bool(text))
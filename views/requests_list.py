@@ -0,0 +1,211 @@
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, QEvent, pyqtSignal
+from PyQt6.QtGui import QColor, QCursor, QPainter, QFont, QPen
+
+from views.lazy_rows import LazyRowsMixin
+
+STYLE_NAVY = "#111827"
+STYLE_BLUE = "#0056b3"
+STYLE_BORDER = "#d1d5db"
+
+# Role returning the full request dict of a row
+RequestRole = Qt.ItemDataRole.UserRole + 1
+
+# Shared by the QListView showing the cards (cards themselves are painted)
+REQUEST_LIST_STYLE = f"""
+    QListView {{
+        background-color: #f9fafb;
+        border: 1px solid {STYLE_BORDER};
+        border-radius: 2px;
+        padding: 13px 20px;
+        outline: none;
+    }}
+    QScrollBar:vertical {{
+        background-color: #f9fafb;
+        width: 12px;
+        border-radius: 6px;
+    }}
+    QScrollBar::handle:vertical {{
+        background-color: {STYLE_BORDER};
+        border-radius: 6px;
+        min-height: 20px;
+    }}
+    QScrollBar::handle:vertical:hover {{
+        background-color: #9ca3af;
+    }}
+"""
+
+
+def status_color(status):
+    if status == "Approved":
+        return "#10b981"
+    if status == "Pending":
+        return "#f59e0b"
+    return "#6b7280"
+
+
+class RequestListModel(LazyRowsMixin, QAbstractListModel):
+    """Lazily loaded stock requests for a QListView.
+
+    Rows come from a fetch callable ``fetch(offset, limit) -> list[dict]``
+    (normally RequestModel.query_requests for the user's department) one
+    page at a time as the list scrolls; see LazyRowsMixin.
+    """
+
+    def __init__(self, parent=None, page_size=100):
+        super().__init__(parent)
+        self._init_lazy_rows(page_size, 'requests.list.more')
+
+    # --- Qt model API ----------------------------------------------------
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        request = self._rows[index.row()]
+        if role == RequestRole:
+            return request
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{request['item_name']} - {request['quantity']} {request['unit']}"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return request.get('reason') or None
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled
+
+
+class RequestCardDelegate(QStyledItemDelegate):
+    """Paints each request as a card with its action buttons.
+
+    No widgets are created per request: only visible cards are painted and
+    button clicks are mapped back to the row's request dict. Pending
+    requests get APPROVE / REJECT when ``can_approve`` is set (Purchase
+    Admin / Owner); every other card gets a delete button.
+    """
+
+    approve_requested = pyqtSignal(object)
+    reject_requested = pyqtSignal(object)
+    delete_requested = pyqtSignal(object)
+
+    CARD_HEIGHT = 85
+    SPACING = 14
+    PADDING_X = 16
+    PADDING_Y = 12
+    BUTTON_HEIGHT = 42
+    BUTTON_SPACING = 16
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.can_approve = False
+        self._title_font = QFont("Arial", 13, QFont.Weight.Bold)
+        self._details_font = QFont()
+        self._details_font.setPixelSize(12)
+        self._status_font = QFont()
+        self._status_font.setPixelSize(11)
+        self._status_bold = QFont(self._status_font)
+        self._status_bold.setBold(True)
+        self._button_font = QFont()
+        self._button_font.setPixelSize(12)
+        self._button_font.setBold(True)
+        self._icon_font = QFont()
+        self._icon_font.setPixelSize(18)
+
+    def _card_rect(self, rect):
+        return rect.adjusted(0, self.SPACING // 2, 0, -(self.SPACING - self.SPACING // 2))
+
+    def _buttons(self, card, request):
+        """[(name, rect, label, colour, hover colour)] for a card, right to left."""
+        top = card.top() + (card.height() - self.BUTTON_HEIGHT) // 2
+        right = card.right() - self.PADDING_X
+        if self.can_approve and request.get('status') == 'Pending':
+            specs = [('reject', 90, "✗ REJECT", "#ef4444", "#dc2626"),
+                     ('approve', 100, "✓ APPROVE", "#10b981", "#059669")]
+        else:
+            specs = [('delete', 42, "🗑", "#ef4444", "#dc2626")]
+        buttons = []
+        for name, width, label, colour, hover in specs:
+            rect = QRect(right - width + 1, top, width, self.BUTTON_HEIGHT)
+            buttons.append((name, rect, label, colour, hover))
+            right = rect.left() - self.BUTTON_SPACING
+        return buttons
+
+    def paint(self, painter, option, index):
+        request = index.data(RequestRole)
+        if request is None:
+            return
+        card = self._card_rect(option.rect)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        cursor = None
+        if hovered and option.widget is not None:
+            cursor = option.widget.viewport().mapFromGlobal(QCursor.pos())
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # Card
+        painter.setPen(QPen(QColor(STYLE_BLUE if hovered else STYLE_BORDER), 1))
+        painter.setBrush(QColor("white"))
+        painter.drawRoundedRect(card.adjusted(0, 0, -1, -1), 6, 6)
+
+        # Buttons
+        buttons = self._buttons(card, request)
+        for name, rect, label, colour, hover in buttons:
+            over = cursor is not None and rect.contains(cursor)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(hover if over else colour))
+            painter.drawRoundedRect(rect, 6, 6)
+            painter.setPen(QColor("white"))
+            painter.setFont(self._icon_font if name == 'delete' else self._button_font)
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, label)
+
+        # Text: item, department/requester, status/date
+        text_left = card.left() + self.PADDING_X
+        text_right = buttons[-1][1].left() - self.BUTTON_SPACING
+        line = (card.height() - 2 * self.PADDING_Y) // 3
+        y = card.top() + self.PADDING_Y
+        width = max(0, text_right - text_left)
+        elide = Qt.TextElideMode.ElideRight
+        align = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+
+        painter.setFont(self._title_font)
+        painter.setPen(QColor(STYLE_NAVY))
+        title = f"{request['item_name']} - {request['quantity']} {request['unit']}"
+        painter.drawText(QRect(text_left, y, width, line), align,
+                         painter.fontMetrics().elidedText(title, elide, width))
+
+        painter.setFont(self._details_font)
+        painter.setPen(QColor("#6b7280"))
+        details = f"{request['department']} • Requested by {request['requested_by']}"
+        painter.drawText(QRect(text_left, y + line, width, line), align,
+                         painter.fontMetrics().elidedText(details, elide, width))
+
+        created_at = request['created_at']
+        created_at = created_at.strftime("%b %d, %Y") if hasattr(created_at, 'strftime') else str(created_at)
+        status = str(request['status'])
+        parts = [("Status: ", self._status_font, "#6b7280"),
+                 (status, self._status_bold, status_color(status)),
+                 (f" • {created_at}", self._status_font, "#6b7280")]
+        x = text_left
+        for text, font, colour in parts:
+            painter.setFont(font)
+            painter.setPen(QColor(colour))
+            advance = painter.fontMetrics().horizontalAdvance(text)
+            painter.drawText(QRect(x, y + 2 * line, max(0, text_right - x), line), align, text)
+            x += advance
+
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.CARD_HEIGHT + self.SPACING)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            request = index.data(RequestRole)
+            pos = event.position().toPoint()
+            for name, rect, *_ in self._buttons(self._card_rect(option.rect), request):
+                if rect.contains(pos):
+                    getattr(self, f"{name}_requested").emit(request)
+                    return True
+        return super().editorEvent(event, model, option, index)